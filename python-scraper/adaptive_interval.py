@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Per-keyword adaptive scrape interval
+- Tracks an EWMA of new tweets per minute for each keyword
+- The next interval aims for TARGET_TWEETS_PER_CYCLE new tweets, clamped to [min, max]
+- A cycle that used every batch without reaching already-saved tweets shortens the interval at once
+- Keywords with no new tweets back off to the max interval
+"""
+
+import os
+import time
+
+ADAPTIVE_MIN_MINUTES = float(os.environ.get("SCRAPER_MIN_INTERVAL_MINUTES", 1))
+ADAPTIVE_MAX_MINUTES = float(os.environ.get("SCRAPER_MAX_INTERVAL_MINUTES", 30))
+# Roughly half of one cycle's capacity (20 batches x 5 tweets), leaving room for bursts
+TARGET_TWEETS_PER_CYCLE = float(os.environ.get("SCRAPER_TARGET_TWEETS_PER_CYCLE", 50))
+EWMA_ALPHA = 0.3
+
+
+class IntervalController:
+    """Chooses the wait before a keyword's next cycle from its observed tweet velocity"""
+
+    def __init__(self, initial_minutes=5, min_minutes=ADAPTIVE_MIN_MINUTES, max_minutes=ADAPTIVE_MAX_MINUTES,
+                 target=TARGET_TWEETS_PER_CYCLE, alpha=EWMA_ALPHA):
+        self.min_minutes = min_minutes
+        self.max_minutes = max(max_minutes, min_minutes)
+        self.target = target
+        self.alpha = alpha
+        self.rate = None  # EWMA of new tweets per minute
+        self.interval = self._clamp(initial_minutes)
+        self.last_cycle_at = None
+
+    def _clamp(self, minutes):
+        return min(self.max_minutes, max(self.min_minutes, minutes))
+
+    def observe(self, new_tweets, overflowed=False, now=None):
+        """
+        Record one finished cycle. overflowed means the cycle ran out of batches before
+        reaching tweets saved earlier, so new_tweets undercounts the real volume.
+        Returns the interval (minutes) to wait before the next cycle.
+        """
+        now = now or time.time()
+        if self.last_cycle_at is not None:
+            elapsed = max((now - self.last_cycle_at) / 60, 1 / 60)
+            sample = new_tweets / elapsed
+            self.rate = sample if self.rate is None else self.alpha * sample + (1 - self.alpha) * self.rate
+        self.last_cycle_at = now
+
+        if self.rate is not None:
+            ideal = self.target / self.rate if self.rate > 0 else self.max_minutes
+        else:
+            ideal = self.interval  # first cycle only drains the backlog; no velocity yet
+        if overflowed:
+            ideal = min(ideal, self.interval / 2)
+        self.interval = self._clamp(ideal)
+        return self.interval
+
+    def state(self):
+        return {'rate': self.rate, 'interval': self.interval}
+
+    def restore(self, state):
+        """Reuse the velocity learned before a restart (the clock restarts with this process)"""
+        if not state:
+            return self
+        self.rate = state.get('rate')
+        if state.get('interval') is not None:
+            self.interval = self._clamp(state['interval'])
+        return self
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Time-windowed historical backfill planning
+- A date range is split into since:/until: windows (UTC) that can be searched independently
+- A window that still has results after its batch budget is subdivided: only the
+  unread part (older than the oldest tweet seen) is queued again, in halves
+- Windows are plain [since, until] ISO strings so they checkpoint as JSON
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+
+BACKFILL_WINDOW_HOURS = float(os.environ.get("SCRAPER_BACKFILL_WINDOW_HOURS", 24))
+BACKFILL_MIN_WINDOW_MINUTES = float(os.environ.get("SCRAPER_BACKFILL_MIN_WINDOW_MINUTES", 10))
+BACKFILL_MAX_BATCHES = int(os.environ.get("SCRAPER_BACKFILL_MAX_BATCHES", 40))
+
+WINDOW_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+def parse_time(value):
+    """UTC datetime from 'YYYY-MM-DD', a window bound, or a tweet's ISO timestamp"""
+    value = value.strip().replace("Z", "+00:00")
+    if len(value) == 10:
+        return datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    parsed = datetime.fromisoformat(value)
+    return parsed.replace(tzinfo=timezone.utc) if parsed.tzinfo is None else parsed.astimezone(timezone.utc)
+
+
+def format_time(moment):
+    return moment.astimezone(timezone.utc).strftime(WINDOW_FORMAT)
+
+
+def plan_windows(since, until, window_hours=BACKFILL_WINDOW_HOURS):
+    """Newest-first [since, until) windows covering the range"""
+    start, end = parse_time(since), parse_time(until)
+    step = timedelta(hours=window_hours)
+    windows = []
+    while end > start:
+        window_start = max(start, end - step)
+        windows.append([format_time(window_start), format_time(end)])
+        end = window_start
+    return windows
+
+
+def window_operators(since, until):
+    """Search operators for one window, e.g. since:2024-05-01_00:00:00_UTC"""
+    def operator(name, value):
+        return f"{name}:{parse_time(value).strftime('%Y-%m-%d_%H:%M:%S')}_UTC"
+    return f"{operator('since', since)} {operator('until', until)}"
+
+
+def backfill_query(keyword, handle, since, until):
+    keyword = f"({keyword})" if " " in keyword.strip() else keyword.strip()
+    query = f"{keyword} {window_operators(since, until)}"
+    if handle:
+        query += f" from:{handle.strip().lstrip('@')}"
+    return query
+
+
+def split_window(since, until, oldest_seen=None, min_minutes=BACKFILL_MIN_WINDOW_MINUTES):
+    """
+    Windows still to read after a window ran out of batches. Live results come newest
+    first, so everything after oldest_seen was read; the rest is halved. Returns []
+    once the unread part is at or below min_minutes (it is accepted as truncated).
+    """
+    start, end = parse_time(since), parse_time(until)
+    if oldest_seen:
+        try:
+            end = min(end, parse_time(oldest_seen))
+        except ValueError:
+            pass
+    span = end - start
+    if span <= timedelta(minutes=min_minutes):
+        return []
+    middle = start + span / 2
+    # Newest half first, matching the order windows are planned in
+    return [[format_time(middle), format_time(end)], [format_time(start), format_time(middle)]]
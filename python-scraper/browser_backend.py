@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Pluggable browser backends for the scraper
+- A backend starts Chrome and returns a driver object; the scraper only uses the
+  Selenium WebDriver subset listed below, so any backend providing it plugs in:
+  get, current_url, execute_script, execute_cdp_cmd, find_element(s) by CSS selector
+  (elements: text, get_attribute, is_displayed, is_enabled, clear, send_keys, click,
+  find_element(s)), get_cookies, switch_to.window / switch_to.new_window,
+  current_window_handle, close, quit, session_id, set_page_load_timeout, implicitly_wait
+  Optional: open_pages(urls) -> window handles, opening and loading several tabs at once
+- 'selenium' (default): chromedriver via Selenium / webdriver-manager
+- 'cdp': Chrome DevTools Protocol over one websocket from an asyncio loop (cdp_backend),
+  no chromedriver at all
+Pick one with SCRAPER_BROWSER_BACKEND.
+"""
+
+import os
+
+BROWSER_BACKEND = os.environ.get("SCRAPER_BROWSER_BACKEND", "selenium").strip().lower()
+
+# Flags shared by every backend (each backend adds its own remote-debugging setup)
+CHROME_FLAGS = [
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--window-size=1920,1080",
+    "--disable-extensions",
+    "--mute-audio",
+    "--hide-scrollbars",
+    "--disable-background-networking",
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-client-side-phishing-detection",
+    # Additional flags for macOS compatibility
+    "--disable-web-security",
+    "--disable-features=VizDisplayCompositor",
+    "--disable-ipc-flooding-protection",
+    "--disable-hang-monitor",
+    "--disable-prompt-on-repost",
+    "--disable-sync",
+    "--disable-translate",
+    "--disable-logging",
+    "--disable-default-apps",
+    "--disable-component-extensions-with-background-pages",
+]
+
+# Try common chrome paths (including macOS)
+CHROME_PATHS = [
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",  # macOS Chrome
+    "/usr/bin/google-chrome-stable",
+    "/usr/bin/google-chrome",
+    "/snap/bin/chromium",
+    "/usr/bin/chromium-browser",
+    "/usr/bin/chromium"
+]
+
+
+def find_chrome_binary():
+    for path in CHROME_PATHS:
+        if os.path.exists(path):
+            print(f"🔧 Using Chrome at: {path}")
+            return path
+    return None
+
+
+class SeleniumBackend:
+    """Chrome driven through chromedriver (Selenium)"""
+
+    name = "selenium"
+
+    def start(self, headless=True):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        chrome_options = Options()
+        for flag in CHROME_FLAGS:
+            chrome_options.add_argument(flag)
+        chrome_options.add_argument("--remote-debugging-port=9222")
+        if headless:
+            # modern headless flag
+            chrome_options.add_argument("--headless=new")
+        binary = find_chrome_binary()
+        if binary:
+            chrome_options.binary_location = binary
+
+        # Clear corrupted wdm cache optional
+        wdm_cache = os.path.expanduser("~/.wdm")
+        if os.path.exists(wdm_cache):
+            # don't aggressively delete on every start in prod; helpful here
+            import shutil
+            shutil.rmtree(wdm_cache, ignore_errors=True)
+
+        print("🔧 Using WebDriver Manager to install/locate chromedriver...")
+        # Add chromedriver log path for debugging
+        try:
+            driver_path = ChromeDriverManager().install()
+        except Exception as e:
+            print(f"⚠️ WebDriver Manager failed: {e}")
+            # Fallback: try to use system chromedriver
+            driver_path = "/usr/local/bin/chromedriver"
+            if not os.path.exists(driver_path):
+                driver_path = "/opt/homebrew/bin/chromedriver"
+            if not os.path.exists(driver_path):
+                raise Exception("No chromedriver found")
+            print(f"🔧 Using system chromedriver: {driver_path}")
+
+        # Fix: WebDriver Manager sometimes returns wrong file, find the actual chromedriver
+        if "THIRD_PARTY_NOTICES" in driver_path:
+            actual_driver_path = driver_path.replace("THIRD_PARTY_NOTICES.chromedriver", "chromedriver")
+            if os.path.exists(actual_driver_path):
+                driver_path = actual_driver_path
+                print(f"🔧 Fixed driver path to: {driver_path}")
+
+        # Fix permissions for chromedriver
+        try:
+            os.chmod(driver_path, 0o755)
+            print(f"🔧 Fixed chromedriver permissions")
+        except Exception as e:
+            print(f"⚠️ Could not fix permissions: {e}")
+
+        service = Service(driver_path, log_path="/tmp/chromedriver.log")
+        return webdriver.Chrome(service=service, options=chrome_options)
+
+
+class CdpBackend:
+    """Chrome driven directly over the DevTools protocol (see cdp_backend)"""
+
+    name = "cdp"
+
+    def start(self, headless=True):
+        from cdp_backend import CdpDriver
+
+        binary = find_chrome_binary()
+        if not binary:
+            raise Exception("No Chrome binary found")
+        flags = CHROME_FLAGS + (["--headless=new"] if headless else [])
+        return CdpDriver.launch(binary, flags)
+
+
+BACKENDS = {backend.name: backend for backend in (SeleniumBackend, CdpBackend)}
+
+
+def get_backend(name=BROWSER_BACKEND):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown browser backend {name!r} (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""
+Chrome DevTools Protocol browser backend (SCRAPER_BROWSER_BACKEND=cdp)
+- Launches Chrome with --remote-debugging-port=0 and talks to it over one websocket
+  from an asyncio event loop: no chromedriver, no HTTP hop per command
+- Every tab is a flattened CDP session on that one socket, so commands for many tabs
+  are in flight at once (CdpBrowser / CdpPage, for async callers)
+- CdpDriver runs the same loop in a background thread behind the Selenium subset the
+  scraper uses (see browser_backend), so the existing scrape modes run unchanged
+- CdpDriver.open_pages hands tab mode's first searches to CdpBrowser.open_pages, so
+  they load in parallel tabs
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+
+import websockets
+from selenium.common.exceptions import (JavascriptException, NoSuchElementException, NoSuchWindowException,
+                                        TimeoutException, WebDriverException)
+from selenium.webdriver.common.by import By
+
+CDP_LAUNCH_TIMEOUT_SECONDS = float(os.environ.get("SCRAPER_CDP_LAUNCH_TIMEOUT_SECONDS", 30))
+CDP_COMMAND_TIMEOUT_SECONDS = float(os.environ.get("SCRAPER_CDP_COMMAND_TIMEOUT_SECONDS", 60))
+
+# Remote objects handed out for lookups; released together whenever the tab navigates
+OBJECT_GROUP = "scraper"
+
+# Rebuilds execute_script arguments: element references travel as separate CDP arguments
+CALL_WITH_NODES_JS = """
+function(shape, ...refs) {
+    const build = (s) => ('node' in s) ? refs[s.node] : ('list' in s) ? s.list.map(build) : s.value;
+    return (%s).apply(%s, shape.map(build));
+}
+"""
+
+TEXT_JS = "function() { return (this.innerText || this.textContent || '').trim(); }"
+ATTRIBUTE_JS = """
+function(name) {
+    const value = this[name];
+    if (value !== undefined && value !== null && typeof value !== 'object' && typeof value !== 'function') {
+        return String(value);
+    }
+    return this.getAttribute(name);
+}
+"""
+DISPLAYED_JS = "function() { return !!(this.offsetParent || this.getClientRects().length); }"
+ENABLED_JS = "function() { return !this.disabled; }"
+# Goes through the prototype's value setter so React-controlled inputs see the change
+CLEAR_JS = """
+function() {
+    const setter = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(this), 'value');
+    if (setter && setter.set) { setter.set.call(this, ''); } else { this.value = ''; }
+    this.dispatchEvent(new Event('input', {bubbles: true}));
+}
+"""
+FOCUS_JS = "function() { this.focus(); }"
+CLICK_JS = "function() { this.scrollIntoView({block: 'center'}); this.click(); }"
+QUERY_ALL_JS = "function(selector) { return Array.from(this.querySelectorAll(selector)); }"
+
+
+class CdpError(WebDriverException):
+    """A DevTools command answered with an error"""
+
+
+def unwrap(result, by_value=True):
+    """Value (or remote object) of a Runtime.evaluate / callFunctionOn result; page exceptions are raised"""
+    details = result.get('exceptionDetails')
+    if details:
+        raise JavascriptException((details.get('exception') or {}).get('description') or details.get('text'))
+    remote = result.get('result', {})
+    return remote.get('value') if by_value else remote
+
+
+class CdpConnection:
+    """One websocket to the browser; replies are matched to commands by id, events go to waiters"""
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self._ids = itertools.count(1)
+        self._replies = {}
+        self._waiters = {}  # (session id, event method) -> [futures]
+        self._reader = asyncio.ensure_future(self._read())
+
+    @classmethod
+    async def connect(cls, url):
+        return cls(await websockets.connect(url, max_size=None, ping_interval=None))
+
+    async def send(self, method, params=None, session_id=None, timeout=CDP_COMMAND_TIMEOUT_SECONDS):
+        message_id = next(self._ids)
+        message = {'id': message_id, 'method': method, 'params': params or {}}
+        if session_id:
+            message['sessionId'] = session_id
+        reply = asyncio.get_running_loop().create_future()
+        self._replies[message_id] = reply
+        try:
+            await self.websocket.send(json.dumps(message))
+            return await asyncio.wait_for(reply, timeout)
+        finally:
+            self._replies.pop(message_id, None)
+
+    def wait_for(self, method, session_id=None):
+        """Future resolved with the params of the next `method` event on the session"""
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault((session_id, method), []).append(future)
+        return future
+
+    async def _read(self):
+        try:
+            async for raw in self.websocket:
+                message = json.loads(raw)
+                if 'id' in message:
+                    reply = self._replies.get(message['id'])
+                    if reply is None or reply.done():
+                        continue
+                    if 'error' in message:
+                        reply.set_exception(CdpError(message['error'].get('message', str(message['error']))))
+                    else:
+                        reply.set_result(message.get('result', {}))
+                else:
+                    for future in self._waiters.pop((message.get('sessionId'), message.get('method')), []):
+                        if not future.done():
+                            future.set_result(message.get('params', {}))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            for reply in self._replies.values():
+                if not reply.done():
+                    reply.set_exception(CdpError("DevTools connection closed"))
+            for futures in self._waiters.values():
+                for future in futures:
+                    future.cancel()
+
+    async def close(self):
+        self._reader.cancel()
+        await self.websocket.close()
+
+
+class CdpNode:
+    """A DOM element held as a remote object of its tab"""
+
+    __slots__ = ('page', 'object_id')
+
+    def __init__(self, page, object_id):
+        self.page = page
+        self.object_id = object_id
+
+    async def call(self, function, *args):
+        return await self.page.call(function, args, this=self)
+
+    async def query_all(self, selector):
+        return await self.page.query_all(selector, root=self)
+
+
+class CdpPage:
+    """One tab: a flattened session on the browser connection"""
+
+    def __init__(self, connection, target_id, session_id):
+        self.connection = connection
+        self.target_id = target_id
+        self.session_id = session_id
+
+    async def send(self, method, params=None, timeout=CDP_COMMAND_TIMEOUT_SECONDS):
+        return await self.connection.send(method, params, self.session_id, timeout)
+
+    async def navigate(self, url, timeout=CDP_COMMAND_TIMEOUT_SECONDS):
+        """Load url and wait for its load event"""
+        loaded = self.connection.wait_for('Page.loadEventFired', self.session_id)
+        await self.send('Runtime.releaseObjectGroup', {'objectGroup': OBJECT_GROUP})
+        result = await self.send('Page.navigate', {'url': url})
+        if result.get('errorText') or not result.get('loaderId'):
+            loaded.cancel()
+            if result.get('errorText'):
+                raise WebDriverException(f"Navigation to {url} failed: {result['errorText']}")
+            return  # same-document navigation: there is no load event
+        try:
+            await asyncio.wait_for(loaded, timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutException(f"Timed out after {timeout:g}s loading {url}")
+
+    async def evaluate(self, expression, by_value=True):
+        result = await self.send('Runtime.evaluate', {'expression': expression, 'returnByValue': by_value,
+                                                      'awaitPromise': True, 'objectGroup': OBJECT_GROUP})
+        return unwrap(result, by_value)
+
+    async def call(self, function, args=(), this=None, by_value=True):
+        """
+        function(...args) in the tab, with `this` bound to a CdpNode (default: window).
+        args may hold CdpNodes, also inside lists, like Selenium's execute_script.
+        """
+        refs = []
+
+        def encode(value):
+            if isinstance(value, CdpNode):
+                refs.append(value)
+                return {'node': len(refs) - 1}
+            if isinstance(value, (list, tuple)):
+                return {'list': [encode(item) for item in value]}
+            return {'value': value}
+
+        shape = [encode(arg) for arg in args]
+        if this is None and not refs:
+            return await self.evaluate(f"({function}).apply(window, {json.dumps(list(args))})", by_value)
+        result = await self.send('Runtime.callFunctionOn', {
+            'objectId': (this or refs[0]).object_id,
+            'functionDeclaration': CALL_WITH_NODES_JS % (function, "this" if this else "window"),
+            'arguments': [{'value': shape}] + [{'objectId': ref.object_id} for ref in refs],
+            'returnByValue': by_value,
+            'awaitPromise': True,
+            'objectGroup': OBJECT_GROUP,
+        })
+        return unwrap(result, by_value)
+
+    async def query_all(self, selector, root=None):
+        """CdpNodes matching a CSS selector under root (default: the document), in document order"""
+        if root is None:
+            array = await self.evaluate(f"Array.from(document.querySelectorAll({json.dumps(selector)}))", by_value=False)
+        else:
+            array = await self.call(QUERY_ALL_JS, (selector,), this=root, by_value=False)
+        properties = await self.send('Runtime.getProperties', {'objectId': array['objectId'], 'ownProperties': True})
+        await self.send('Runtime.releaseObject', {'objectId': array['objectId']})
+        indexed = sorted((int(p['name']), p['value']['objectId']) for p in properties.get('result', [])
+                         if p['name'].isdigit() and p.get('value', {}).get('objectId'))
+        return [CdpNode(self, object_id) for _, object_id in indexed]
+
+
+class CdpBrowser:
+    """A Chrome process and its DevTools connection"""
+
+    def __init__(self, process, profile_dir, connection):
+        self.process = process
+        self.profile_dir = profile_dir
+        self.connection = connection
+        self.pages = []
+
+    @classmethod
+    async def launch(cls, binary, flags, timeout=CDP_LAUNCH_TIMEOUT_SECONDS):
+        profile_dir = tempfile.mkdtemp(prefix="scraper-cdp-")
+        process = subprocess.Popen(
+            [binary, *flags, "--remote-debugging-port=0", f"--user-data-dir={profile_dir}", "about:blank"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        # Chrome writes the chosen port and the browser endpoint path here once it listens
+        port_file = os.path.join(profile_dir, "DevToolsActivePort")
+        deadline = time.monotonic() + timeout
+        while True:
+            if process.poll() is not None:
+                shutil.rmtree(profile_dir, ignore_errors=True)
+                raise WebDriverException(f"Chrome exited with code {process.returncode} during startup")
+            if os.path.exists(port_file):
+                with open(port_file, 'r', encoding='utf-8') as f:
+                    lines = f.read().split()
+                if len(lines) >= 2:
+                    break
+            if time.monotonic() > deadline:
+                process.kill()
+                shutil.rmtree(profile_dir, ignore_errors=True)
+                raise TimeoutException("Chrome did not open its DevTools port")
+            await asyncio.sleep(0.1)
+
+        connection = await CdpConnection.connect(f"ws://127.0.0.1:{lines[0]}{lines[1]}")
+        browser = cls(process, profile_dir, connection)
+        targets = await connection.send('Target.getTargets')
+        pages = [t for t in targets.get('targetInfos', []) if t.get('type') == 'page']
+        if pages:
+            await browser.attach(pages[0]['targetId'])
+        else:
+            await browser.new_page()
+        print(f"🔌 Connected to Chrome DevTools on port {lines[0]}")
+        return browser
+
+    async def attach(self, target_id):
+        session = await self.connection.send('Target.attachToTarget', {'targetId': target_id, 'flatten': True})
+        page = CdpPage(self.connection, target_id, session['sessionId'])
+        await page.send('Page.enable')
+        self.pages.append(page)
+        return page
+
+    async def new_page(self, url="about:blank"):
+        target = await self.connection.send('Target.createTarget', {'url': url})
+        return await self.attach(target['targetId'])
+
+    async def open_pages(self, urls, timeout=CDP_COMMAND_TIMEOUT_SECONDS):
+        """One new tab per URL, all loading at once; returns the tabs (a failed load is left as is)"""
+        pages = await asyncio.gather(*(self.new_page() for _ in urls))
+        await asyncio.gather(*(page.navigate(url, timeout) for page, url in zip(pages, urls)), return_exceptions=True)
+        return pages
+
+    async def close_page(self, page):
+        await self.connection.send('Target.closeTarget', {'targetId': page.target_id})
+        self.pages.remove(page)
+
+    async def close(self):
+        try:
+            await self.connection.send('Browser.close', timeout=5)
+        except Exception:
+            pass
+        try:
+            await self.connection.close()
+        except Exception:
+            pass
+        for _ in range(50):
+            if self.process.poll() is not None:
+                break
+            await asyncio.sleep(0.1)
+        else:
+            self.process.kill()
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+
+class CdpElement:
+    """Selenium WebElement look-alike over a CdpNode"""
+
+    def __init__(self, driver, node):
+        self._driver = driver
+        self.node = node
+
+    def _call(self, function, *args):
+        return self._driver._run(self.node.call(function, *args))
+
+    @property
+    def text(self):
+        return self._call(TEXT_JS) or ""
+
+    def get_attribute(self, name):
+        return self._call(ATTRIBUTE_JS, name)
+
+    def is_displayed(self):
+        return bool(self._call(DISPLAYED_JS))
+
+    def is_enabled(self):
+        return bool(self._call(ENABLED_JS))
+
+    def clear(self):
+        self._call(CLEAR_JS)
+
+    def send_keys(self, *values):
+        self._call(FOCUS_JS)
+        self._driver._run(self.node.page.send('Input.insertText', {'text': "".join(str(v) for v in values)}))
+
+    def click(self):
+        self._call(CLICK_JS)
+
+    def find_elements(self, by=By.CSS_SELECTOR, value=None):
+        return self._driver._find(by, value, root=self.node)
+
+    def find_element(self, by=By.CSS_SELECTOR, value=None):
+        return self._driver._first(by, value, root=self.node)
+
+
+class CdpSwitchTo:
+    def __init__(self, driver):
+        self._driver = driver
+
+    def window(self, window_handle):
+        for page in self._driver._browser.pages:
+            if page.target_id == window_handle:
+                self._driver._page = page
+                return
+        raise NoSuchWindowException(f"No tab {window_handle}")
+
+    def new_window(self, type_hint=None):
+        self._driver._page = self._driver._run(self._driver._browser.new_page())
+
+
+class CdpDriver:
+    """
+    The WebDriver subset the scraper uses, on top of CdpBrowser. Commands run on the
+    backend's event loop thread; like Selenium, one "current tab" is addressed at a time.
+    Element lookups never wait (the implicit wait is always zero).
+    """
+
+    def __init__(self, loop, thread, browser):
+        self._loop = loop
+        self._thread = thread
+        self._browser = browser
+        self._page = browser.pages[0]
+        self.session_id = uuid.uuid4().hex
+        self.page_load_timeout = CDP_COMMAND_TIMEOUT_SECONDS
+        self.switch_to = CdpSwitchTo(self)
+
+    @classmethod
+    def launch(cls, binary, flags):
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, name="cdp-backend", daemon=True)
+        thread.start()
+        try:
+            browser = asyncio.run_coroutine_threadsafe(CdpBrowser.launch(binary, flags), loop).result()
+        except Exception:
+            loop.call_soon_threadsafe(loop.stop)
+            raise
+        return cls(loop, thread, browser)
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def _find(self, by, value, root=None):
+        if by != By.CSS_SELECTOR:
+            raise WebDriverException(f"The CDP backend only supports CSS selectors, not {by!r}")
+        nodes = self._run(self._page.query_all(value) if root is None else root.query_all(value))
+        return [CdpElement(self, node) for node in nodes]
+
+    def _first(self, by, value, root=None):
+        elements = self._find(by, value, root)
+        if not elements:
+            raise NoSuchElementException(f"No element matches {value!r}")
+        return elements[0]
+
+    # Navigation and scripts
+
+    def get(self, url):
+        self._run(self._page.navigate(url, self.page_load_timeout))
+
+    @property
+    def current_url(self):
+        return self._run(self._page.evaluate("location.href"))
+
+    def execute_script(self, script, *args):
+        args = [arg.node if isinstance(arg, CdpElement) else
+                [a.node if isinstance(a, CdpElement) else a for a in arg] if isinstance(arg, (list, tuple)) else arg
+                for arg in args]
+        return self._run(self._page.call(f"function() {{\n{script}\n}}", args))
+
+    def open_pages(self, urls):
+        """Open one tab per URL, loading them all at once; returns their window handles (current tab unchanged)"""
+        pages = self._run(self._browser.open_pages(urls, self.page_load_timeout))
+        return [page.target_id for page in pages]
+
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        return self._run(self._page.send(cmd, cmd_args))
+
+    def find_elements(self, by=By.CSS_SELECTOR, value=None):
+        return self._find(by, value)
+
+    def find_element(self, by=By.CSS_SELECTOR, value=None):
+        return self._first(by, value)
+
+    def get_cookies(self):
+        cookies = self._run(self._page.send('Network.getCookies')).get('cookies', [])
+        result = []
+        for cookie in cookies:
+            converted = {key: cookie[key] for key in ('name', 'value', 'domain', 'path', 'secure', 'httpOnly')
+                         if key in cookie}
+            if cookie.get('expires', -1) > 0:
+                converted['expiry'] = int(cookie['expires'])
+            if cookie.get('sameSite'):
+                converted['sameSite'] = cookie['sameSite']
+            result.append(converted)
+        return result
+
+    # Tabs
+
+    @property
+    def current_window_handle(self):
+        if self._page is None:
+            raise NoSuchWindowException("The current tab was closed")
+        return self._page.target_id
+
+    @property
+    def window_handles(self):
+        return [page.target_id for page in self._browser.pages]
+
+    def close(self):
+        page, self._page = self._page, None
+        if page is not None:
+            self._run(self._browser.close_page(page))
+
+    def quit(self):
+        try:
+            self._run(self._browser.close())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+    # Timeouts
+
+    def set_page_load_timeout(self, seconds):
+        self.page_load_timeout = seconds
+
+    def implicitly_wait(self, seconds):
+        pass
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Push-based change feed for newly persisted tweets
+- persist_tweets() publishes every stored tweet with a monotonically increasing seq
+- Subscribers receive NDJSON events over their socket, each with its own cursor
+- Per-subscriber queues are bounded; a subscriber that falls behind is switched to
+  replay-from-cursor (ring buffer, or the SQLite store when enabled) instead of
+  making the scraper wait
+- Repeats of already-stored tweets go out as live-only 'duplicates' events (replays read
+  the updated count from the SQLite store)
+"""
+
+import itertools
+import json
+import queue
+import threading
+import time
+from collections import deque
+
+RING_BUFFER_SIZE = 5000
+SUBSCRIBER_QUEUE_SIZE = 1000
+HEARTBEAT_SECONDS = 15
+REPLAY_PAGE_SIZE = 500
+
+
+class Subscriber:
+    def __init__(self, subscriber_id, keywords, cursor):
+        self.id = subscriber_id
+        self.keywords = set(keywords) if keywords else None
+        self.cursor = cursor
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.lagging = False
+        self.closed = False
+
+    def wants(self, event):
+        return self.keywords is None or event['keyword'] in self.keywords
+
+
+class ChangeFeed:
+    def __init__(self, store=None):
+        self.store = None
+        self._ring = deque(maxlen=RING_BUFFER_SIZE)
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._last_seq = 0
+        self.attach_store(store)
+
+    @property
+    def last_seq(self):
+        return self._last_seq
+
+    def publish(self, rows):
+        """Fan newly persisted rows out to subscribers. Rows from the SQLite store already carry a seq."""
+        with self._lock:
+            events = []
+            for row in rows:
+                if 'seq' not in row:
+                    row = dict(row, seq=self._last_seq + 1)
+                self._last_seq = max(self._last_seq, row['seq'])
+                self._ring.append(row)
+                events.append(row)
+            subscribers = list(self._subscribers.values())
+        for sub in subscribers:
+            if sub.lagging:
+                continue
+            for event in events:
+                if not sub.wants(event):
+                    continue
+                try:
+                    sub.queue.put_nowait(event)
+                except queue.Full:
+                    # Stop queueing; the subscriber will catch up from its cursor
+                    sub.lagging = True
+                    print(f"🐢 Subscriber {sub.id} fell behind at cursor {sub.cursor}; switching to replay")
+                    break
+
+    def publish_counts(self, keyword, counts):
+        """Tell live subscribers that stored tweets gained duplicates; counts is [(tweet_id, duplicate_count)]"""
+        event = {'type': 'duplicates', 'keyword': keyword, 'counts': dict(counts)}
+        with self._lock:
+            subscribers = list(self._subscribers.values())
+        for sub in subscribers:
+            if sub.lagging or not sub.wants(event):
+                continue
+            try:
+                sub.queue.put_nowait(event)
+            except queue.Full:
+                sub.lagging = True
+
+    def subscribe(self, keywords=None, cursor=None):
+        with self._lock:
+            sub = Subscriber(next(self._ids), keywords, self._last_seq if cursor is None else cursor)
+            self._subscribers[sub.id] = sub
+        return sub
+
+    def unsubscribe(self, sub):
+        sub.closed = True
+        with self._lock:
+            self._subscribers.pop(sub.id, None)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def attach_store(self, store):
+        """Replay from the SQLite store; seqs continue from the newest stored row"""
+        self.store = store
+        if store:
+            with self._lock:
+                self._last_seq = max(self._last_seq, store.max_seq())
+
+    def ring_since(self, cursor, keywords=None):
+        """
+        In-memory events after cursor. Returns (events, complete); complete is False
+        when the ring no longer reaches back to the cursor.
+        """
+        with self._lock:
+            ring = list(self._ring)
+        complete = not ring or ring[0]['seq'] <= cursor + 1
+        return [e for e in ring if e['seq'] > cursor and (keywords is None or e['keyword'] in keywords)], complete
+
+    def stream(self, sub, send_line, is_active):
+        """
+        Deliver events to one subscriber until it disconnects or is_active() turns False.
+        send_line(dict) writes one NDJSON line and raises on a broken connection.
+        """
+        try:
+            self._replay(sub, send_line)
+            last_sent = time.time()
+            while is_active() and not sub.closed:
+                if sub.lagging:
+                    # Drop whatever is queued and resume from the cursor
+                    while not sub.queue.empty():
+                        try:
+                            sub.queue.get_nowait()
+                        except queue.Empty:
+                            break
+                    sub.lagging = False
+                    self._replay(sub, send_line)
+                    continue
+                try:
+                    event = sub.queue.get(timeout=1)
+                except queue.Empty:
+                    if time.time() - last_sent >= HEARTBEAT_SECONDS:
+                        send_line({'type': 'heartbeat', 'cursor': sub.cursor})
+                        last_sent = time.time()
+                    continue
+                if event.get('type') == 'duplicates':
+                    send_line(event)
+                    last_sent = time.time()
+                    continue
+                if event['seq'] <= sub.cursor:
+                    continue
+                send_line({'type': 'tweet', 'seq': event['seq'], 'tweet': event})
+                sub.cursor = event['seq']
+                last_sent = time.time()
+        finally:
+            self.unsubscribe(sub)
+
+    def _replay(self, sub, send_line):
+        """Send everything after the subscriber's cursor, one store page at a time"""
+        if self.store:
+            keywords = sorted(sub.keywords) if sub.keywords else None
+            while True:
+                page = self.store.fetch_all_since(sub.cursor, limit=REPLAY_PAGE_SIZE, keywords=keywords)
+                for event in page:
+                    send_line({'type': 'tweet', 'seq': event['seq'], 'tweet': event})
+                    sub.cursor = event['seq']
+                if len(page) < REPLAY_PAGE_SIZE:
+                    return
+        events, complete = self.ring_since(sub.cursor, sub.keywords)
+        if not complete:
+            send_line({'type': 'gap', 'cursor': sub.cursor, 'message': 'Cursor is older than the in-memory buffer; some tweets were skipped'})
+        for event in events:
+            if event['seq'] <= sub.cursor:
+                continue
+            send_line({'type': 'tweet', 'seq': event['seq'], 'tweet': event})
+            sub.cursor = event['seq']
+
+
+def encode_line(message):
+    return (json.dumps(message, ensure_ascii=False) + "\n").encode('utf-8')
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate tweet collapsing
+- Exact duplicates: hashed set over normalized text (O(1) per tweet)
+- Near duplicates (retweets, copy-paste campaigns with a changed mention/link/emoji):
+  MinHash signatures over word shingles, bucketed with LSH bands
+- Duplicates are folded into the first record; each collapser keeps its own counts (one
+  collapser per keyword), so a tweet shared by several keywords is counted per keyword
+- collapse() stamps new records with their count and reports repeats of records from
+  earlier batches, so the caller can update counts it already persisted
+"""
+
+import hashlib
+import random
+import re
+import threading
+from collections import deque
+
+from keyword_matcher import normalize_text
+
+# Signature = BANDS * ROWS MinHash values; two texts land in a shared bucket
+# with high probability once their Jaccard similarity passes ~(1/BANDS)^(1/ROWS)
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+SIMILARITY_THRESHOLD = 0.8
+SHINGLE_SIZE = 3
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(1729)
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME)) for _ in range(NUM_PERMUTATIONS)]
+
+_URL_RE = re.compile(r"https?://\S+|\bt\.co/\S+")
+_MENTION_RE = re.compile(r"(^|\s)(rt\s+)?@\w+:?", re.IGNORECASE)
+
+
+def normalize_for_dedup(text):
+    """Drop links, mentions and the RT prefix, then apply the shared keyword normalization"""
+    text = _URL_RE.sub(" ", text or "")
+    text = _MENTION_RE.sub(" ", text)
+    return normalize_text(text)
+
+
+def shingles(normalized):
+    words = normalized.split()
+    if len(words) < SHINGLE_SIZE:
+        return {normalized} if normalized else set()
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def _hash64(value):
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def minhash(normalized):
+    """MinHash signature of the text's word shingles"""
+    hashes = [_hash64(s) for s in shingles(normalized)]
+    if not hashes:
+        return None
+    return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def estimated_similarity(sig_a, sig_b):
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERMUTATIONS
+
+
+class NearDuplicateCollapser:
+    """
+    Remembers the last max_records distinct tweets and folds repeats into them.
+    add() returns (record, is_new): record is the representative tweet dict.
+    Counts live in the collapser, not on the (possibly shared) tweet records.
+    """
+
+    def __init__(self, threshold=SIMILARITY_THRESHOLD, max_records=20000):
+        self.threshold = threshold
+        self.max_records = max_records
+        self._exact = {}       # text digest -> record id
+        self._buckets = {}     # (band, band hash) -> set of record ids
+        self._records = {}     # record id -> [record, digest, signature, duplicate count]
+        self._order = deque()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def _bands(self, signature):
+        for band in range(LSH_BANDS):
+            yield (band, hash(signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]))
+
+    def _find(self, digest, signature):
+        record_id = self._exact.get(digest)
+        if record_id is not None or signature is None:
+            return record_id
+        seen = set()
+        for key in self._bands(signature):
+            for candidate in self._buckets.get(key, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                other = self._records[candidate][2]
+                if other is not None and estimated_similarity(signature, other) >= self.threshold:
+                    return candidate
+        return None
+
+    def _evict(self):
+        while len(self._order) > self.max_records:
+            record_id = self._order.popleft()
+            _, digest, signature, _ = self._records.pop(record_id)
+            if self._exact.get(digest) == record_id:
+                del self._exact[digest]
+            if signature is not None:
+                for key in self._bands(signature):
+                    bucket = self._buckets.get(key)
+                    if bucket:
+                        bucket.discard(record_id)
+                        if not bucket:
+                            del self._buckets[key]
+
+    def _add(self, tweet):
+        """(record id, is_new) for tweet; the caller holds the lock"""
+        normalized = normalize_for_dedup(tweet.get('text', ''))
+        digest = hashlib.sha1(normalized.encode('utf-8')).digest()
+        signature = minhash(normalized)
+        record_id = self._find(digest, signature)
+        if record_id is not None:
+            self._records[record_id][3] += 1
+            return record_id, False
+
+        record_id = self._next_id
+        self._next_id += 1
+        self._records[record_id] = [tweet, digest, signature, 1]
+        self._exact[digest] = record_id
+        if signature is not None:
+            for key in self._bands(signature):
+                self._buckets.setdefault(key, set()).add(record_id)
+        self._order.append(record_id)
+        self._evict()
+        return record_id, True
+
+    def add(self, tweet):
+        with self._lock:
+            record_id, is_new = self._add(tweet)
+            return self._records[record_id][0] if record_id in self._records else tweet, is_new
+
+    def collapse(self, tweets):
+        """
+        Fold a batch in. Returns (fresh, recounted): fresh are the new distinct tweets, stamped
+        with this collapser's 'duplicate_count' (in-batch repeats included); recounted are
+        (tweet, duplicate_count) pairs for tweets from earlier batches that were repeated again.
+        """
+        with self._lock:
+            fresh_ids, repeated_ids = [], []
+            for tweet in tweets:
+                record_id, is_new = self._add(tweet)
+                (fresh_ids if is_new else repeated_ids).append(record_id)
+            fresh = []
+            for record_id in fresh_ids:
+                entry = self._records.get(record_id)
+                if entry:
+                    entry[0]['duplicate_count'] = entry[3]
+                    fresh.append(entry[0])
+            new = set(fresh_ids)
+            recounted = [(self._records[record_id][0], self._records[record_id][3])
+                         for record_id in dict.fromkeys(repeated_ids)
+                         if record_id not in new and record_id in self._records]
+        return fresh, recounted
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+District table and query planning for geo-partitioned scraping
+- Reads the Node district table (src/data/mpDistricts.js): id, coordinates, alias keywords
+- Alias searches for all districts are packed into a few OR queries; results are
+  attributed back to districts by whole-word alias matching
+- One geocode: search per district catches geotagged tweets that name no alias
+- Districts are filed under their own namespace (district:<id>), never under the plain
+  keyword that shares their name, so outputs, dedup state, high-water marks and stop
+  requests of the two stay separate
+"""
+
+import json
+import os
+import re
+
+from keyword_matcher import KeywordMatcher, normalize_text
+from query_planner import MAX_QUERY_LENGTH, format_keyword, pack_terms, build_clause
+
+DISTRICTS_PATH = os.environ.get(
+    "SCRAPER_DISTRICTS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "data", "mpDistricts.js"),
+)
+GEO_RADIUS_KM = float(os.environ.get("SCRAPER_GEO_RADIUS_KM", 25))
+DISTRICT_PREFIX = "district:"
+
+
+def district_key(district_id):
+    """Keyword under which a district's tweets are filed"""
+    return DISTRICT_PREFIX + district_id
+
+
+def district_id_of(key):
+    """District ID from a district key (bare IDs from older checkpoints pass through)"""
+    return key[len(DISTRICT_PREFIX):] if key.startswith(DISTRICT_PREFIX) else key
+
+
+def load_districts(path=DISTRICTS_PATH):
+    """[{'name', 'id', 'lat', 'lng', 'aliases'}] from the JS object literal exported by the table"""
+    with open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    body = source[source.index('{'):source.rindex('}') + 1]
+    body = re.sub(r"^\s*//.*$", "", body, flags=re.MULTILINE)
+    body = re.sub(r",(\s*[}\]])", r"\1", body)
+    districts = []
+    for name, data in json.loads(body).items():
+        coordinates = data.get('coordinates') or {}
+        districts.append({
+            'name': name,
+            'id': data.get('id') or normalize_text(name).replace(" ", "_"),
+            'lat': coordinates.get('lat'),
+            'lng': coordinates.get('lng'),
+            'aliases': list(dict.fromkeys(data.get('keywords') or [name])),
+        })
+    return districts
+
+
+class DistrictIndex:
+    """Maps tweet text to the IDs of every district whose alias it mentions"""
+
+    def __init__(self, districts):
+        self.ids_by_alias = {}
+        for district in districts:
+            for alias in district['aliases']:
+                self.ids_by_alias.setdefault(alias, []).append(district['id'])
+        self.matcher = KeywordMatcher.from_keywords(list(self.ids_by_alias))
+
+    def ids_in(self, text):
+        ids = []
+        for alias in self.matcher.match(text):
+            for district_id in self.ids_by_alias[alias]:
+                if district_id not in ids:
+                    ids.append(district_id)
+        return ids
+
+
+def search_aliases(aliases):
+    """
+    Aliases worth searching: "bhopal city" is dropped when "bhopal" is also an alias,
+    since every tweet it finds is already found by the shorter one
+    """
+    word_sets = [(alias, set(normalize_text(alias).split())) for alias in aliases]
+    kept = []
+    for alias, words in word_sets:
+        if not words:
+            continue
+        if any(other != alias and other_words and other_words < words for other, other_words in word_sets):
+            continue
+        kept.append(alias)
+    return kept
+
+
+def geocode_operator(district, radius_km=GEO_RADIUS_KM):
+    return f"geocode:{district['lat']},{district['lng']},{radius_km:g}km"
+
+
+def plan_district_queries(districts, radius_km=GEO_RADIUS_KM, use_geocode=True, max_length=MAX_QUERY_LENGTH):
+    """
+    Searches for one cycle over every district.
+    Returns plans shaped like query_planner's ({'query', 'keywords', 'handles'}) where
+    'keywords' are district keys, plus 'geo' (the district ID a geocode: search belongs to).
+    """
+    plans = []
+    aliases = {}
+    for district in districts:
+        for alias in search_aliases(district['aliases']):
+            aliases.setdefault(format_keyword(alias), set()).add(district['id'])
+    order = {district['id']: i for i, district in enumerate(districts)}
+    for group in pack_terms(list(aliases), max_length):
+        ids = sorted({i for term in group for i in aliases[term]}, key=order.get)
+        plans.append({'query': build_clause(group), 'keywords': [district_key(i) for i in ids], 'handles': [],
+                      'strict': True, 'geo': None})
+
+    if use_geocode:
+        for district in districts:
+            if district['lat'] is None or district['lng'] is None:
+                continue
+            plans.append({'query': geocode_operator(district, radius_km), 'keywords': [district_key(district['id'])],
+                          'handles': [], 'strict': True, 'geo': district['id']})
+    return plans
+
+
+def districts_for(plan, index, text):
+    """District IDs a tweet from this plan belongs to: every alias it names, plus the geocode: district"""
+    ids = index.ids_in(text)
+    if plan.get('geo') and plan['geo'] not in ids:
+        ids.insert(0, plan['geo'])
+    return ids
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Keeps long scroll sessions flat
+- Articles already extracted are marked (data-scraped) and their subtrees emptied in
+  one execute_script, keeping the box height so the scroll position does not jump;
+  images and videos inside them are released with the nodes
+- Article lookups exclude marked nodes, so each scroll returns only the new articles
+  instead of a list that grows with every scroll
+- A finished search pass leaves its tab on about:blank, so live-search polling and
+  auto-inserted tweets stop growing the page while the job waits for its next cycle
+Disable emptying (marking stays) with SCRAPER_PRUNE_DOM=0.
+"""
+
+import os
+
+PRUNE_DOM = os.environ.get("SCRAPER_PRUNE_DOM", "1").lower() not in ("0", "false", "no")
+
+SCRAPED_ATTRIBUTE = "data-scraped"
+UNSCRAPED = f":not([{SCRAPED_ATTRIBUTE}])"
+
+PRUNE_JS = """
+const [elements, empty] = arguments;
+for (const el of elements) {
+    if (!el || !el.isConnected || el.hasAttribute('data-scraped')) continue;
+    el.setAttribute('data-scraped', '1');
+    if (empty) {
+        el.style.minHeight = el.offsetHeight + 'px';
+        el.replaceChildren();
+    }
+}
+return elements.length;
+"""
+
+
+def prune_articles(driver, elements, empty=PRUNE_DOM):
+    """Mark (and empty) extracted article elements in one round trip"""
+    if not elements:
+        return
+    try:
+        driver.execute_script(PRUNE_JS, list(elements), empty)
+    except Exception as e:
+        print(f"⚠️ Could not prune extracted tweets: {e}")
+
+
+def release_page(driver):
+    """Park the current tab on about:blank between search passes"""
+    try:
+        driver.get("about:blank")
+    except Exception as e:
+        print(f"⚠️ Could not release search page: {e}")
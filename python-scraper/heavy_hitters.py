@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Streaming heavy-hitter stats per keyword
+- Hashtags, mentions and authors of every persisted tweet are counted in rolling
+  time buckets (SCRAPER_STATS_BUCKET_MINUTES wide, SCRAPER_STATS_WINDOW_HOURS kept)
+- Each bucket holds a Count-Min Sketch per dimension for frequency estimates and a
+  Space-Saving summary for its top-K candidates, so memory per keyword is fixed
+- Only the last SCRAPER_STATS_FINE_HOURS keep fine buckets; older ones are merged
+  into SCRAPER_STATS_COARSE_MINUTES buckets, so a 24 h window holds ~35 buckets
+  instead of 288 (a few hundred KB per keyword, also in district mode)
+- A "top N in the last M minutes" query merges at most the retained buckets and
+  never touches the Markdown or SQLite archive
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+from array import array
+from datetime import datetime
+
+STATS_BUCKET_SECONDS = float(os.environ.get("SCRAPER_STATS_BUCKET_MINUTES", 5)) * 60
+STATS_WINDOW_SECONDS = float(os.environ.get("SCRAPER_STATS_WINDOW_HOURS", 24)) * 3600
+STATS_FINE_SECONDS = float(os.environ.get("SCRAPER_STATS_FINE_HOURS", 1)) * 3600
+STATS_COARSE_SECONDS = float(os.environ.get("SCRAPER_STATS_COARSE_MINUTES", 60)) * 60
+CMS_WIDTH = int(os.environ.get("SCRAPER_STATS_CMS_WIDTH", 256))  # a bucket sees hundreds of items, not millions
+CMS_DEPTH = 4
+TOP_K = 128
+
+DIMENSIONS = ('hashtags', 'mentions', 'authors')
+
+_HASHTAG_RE = re.compile(r"#([^\s#@.,!?;:\"'()\[\]{}<>|/\\]+)")
+_MENTION_RE = re.compile(r"(?<!\w)@(\w{1,15})", re.ASCII)
+
+
+def tweet_items(tweet):
+    """{dimension: [items]} for one tweet (a Tweet record or a persisted row)"""
+    text = tweet.get('text') or ''
+    author = tweet.get('author') or ''
+    handles = _MENTION_RE.findall(author)
+    if handles:
+        authors = [handles[0].casefold()]
+    else:
+        authors = [author.split('\n')[0].strip()] if author.strip() else []
+    return {
+        'hashtags': list(dict.fromkeys(tag.casefold() for tag in _HASHTAG_RE.findall(text))),
+        'mentions': list(dict.fromkeys(m.casefold() for m in _MENTION_RE.findall(text))),
+        'authors': authors,
+    }
+
+
+class CountMinSketch:
+    """Fixed-size frequency estimator; estimates never undercount"""
+
+    __slots__ = ('width', 'depth', 'rows')
+
+    def __init__(self, width=CMS_WIDTH, depth=CMS_DEPTH):
+        self.width = width
+        self.depth = depth
+        self.rows = [array('I', bytes(4 * width)) for _ in range(depth)]
+
+    def _indexes(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=4 * self.depth).digest()
+        return [int.from_bytes(digest[4 * i:4 * i + 4], 'little') % self.width for i in range(self.depth)]
+
+    def add(self, item, count=1):
+        for row, index in zip(self.rows, self._indexes(item)):
+            row[index] += count
+
+    def estimate(self, item):
+        return min(row[index] for row, index in zip(self.rows, self._indexes(item)))
+
+    def merge(self, other):
+        """Add other's counts (same width and depth) into this sketch"""
+        for row, other_row in zip(self.rows, other.rows):
+            for index, count in enumerate(other_row):
+                if count:
+                    row[index] += count
+
+
+class SpaceSaving:
+    """Top-K candidates with bounded memory (Metwally et al.)"""
+
+    __slots__ = ('k', 'counts')
+
+    def __init__(self, k=TOP_K):
+        self.k = k
+        self.counts = {}
+
+    def add(self, item, count=1):
+        if item in self.counts or len(self.counts) < self.k:
+            self.counts[item] = self.counts.get(item, 0) + count
+            return
+        # Replace the current minimum; the newcomer inherits its count as overestimate
+        victim = min(self.counts, key=self.counts.get)
+        self.counts[item] = self.counts.pop(victim) + count
+
+    def merge(self, other):
+        """Sum both summaries and keep the k largest counts"""
+        for item, count in other.counts.items():
+            self.counts[item] = self.counts.get(item, 0) + count
+        if len(self.counts) > self.k:
+            kept = sorted(self.counts.items(), key=lambda pair: -pair[1])[:self.k]
+            self.counts = dict(kept)
+
+
+class Bucket:
+    __slots__ = ('tweets', 'sketches', 'top')
+
+    def __init__(self):
+        self.tweets = 0
+        self.sketches = {dim: CountMinSketch() for dim in DIMENSIONS}
+        self.top = {dim: SpaceSaving() for dim in DIMENSIONS}
+
+    def merge(self, other):
+        self.tweets += other.tweets
+        for dim in DIMENSIONS:
+            self.sketches[dim].merge(other.sketches[dim])
+            self.top[dim].merge(other.top[dim])
+
+
+def tweet_epoch(tweet, now):
+    """When the tweet was posted (falls back to now); rows carry 'tweet_time', records 'timestamp'"""
+    stamp = tweet.get('tweet_time') or tweet.get('timestamp')
+    if not stamp:
+        return now
+    try:
+        return min(now, datetime.fromisoformat(stamp.replace('Z', '+00:00')).timestamp())
+    except (ValueError, AttributeError):
+        return now
+
+
+class HeavyHitterStats:
+    """Rolling per-keyword sketches fed from persist_tweets() and read by the 'stats' action"""
+
+    def __init__(self, bucket_seconds=STATS_BUCKET_SECONDS, window_seconds=STATS_WINDOW_SECONDS,
+                 fine_seconds=STATS_FINE_SECONDS, coarse_seconds=STATS_COARSE_SECONDS):
+        self.bucket_seconds = bucket_seconds
+        self.bucket_count = max(1, int(window_seconds // bucket_seconds))
+        self.fine_count = max(1, min(self.bucket_count, int(fine_seconds // bucket_seconds)))
+        self.coarse_ratio = max(1, int(coarse_seconds // bucket_seconds))  # fine buckets per coarse bucket
+        self._buckets = {}  # keyword -> {bucket number: Bucket}, the last fine_count buckets
+        self._coarse = {}  # keyword -> {bucket number // coarse_ratio: Bucket}, older buckets merged
+        self._lock = threading.Lock()
+
+    def add_tweets(self, keyword, tweets, now=None):
+        now = now or time.time()
+        current = int(now // self.bucket_seconds)
+        oldest = current - self.bucket_count + 1
+        fine_oldest = current - self.fine_count + 1
+        with self._lock:
+            buckets = self._buckets.setdefault(keyword, {})
+            coarse = self._coarse.setdefault(keyword, {})
+            for tweet in tweets:
+                number = int(tweet_epoch(tweet, now) // self.bucket_seconds)
+                if number < oldest:
+                    continue  # backfilled history is outside the rolling window
+                if number < fine_oldest:
+                    bucket = coarse.get(number // self.coarse_ratio)
+                    if bucket is None:
+                        bucket = coarse[number // self.coarse_ratio] = Bucket()
+                else:
+                    bucket = buckets.get(number)
+                    if bucket is None:
+                        bucket = buckets[number] = Bucket()
+                bucket.tweets += 1
+                for dim, items in tweet_items(tweet).items():
+                    for item in items:
+                        bucket.sketches[dim].add(item)
+                        bucket.top[dim].add(item)
+            self._age(buckets, coarse, oldest, fine_oldest)
+
+    def _age(self, buckets, coarse, oldest, fine_oldest):
+        """Merge fine buckets that left the fine span into coarse ones; drop coarse ones past the window"""
+        for number in sorted(n for n in buckets if n < fine_oldest):
+            bucket = buckets.pop(number)
+            if number < oldest:
+                continue
+            target = coarse.get(number // self.coarse_ratio)
+            if target is None:
+                coarse[number // self.coarse_ratio] = bucket
+            else:
+                target.merge(bucket)
+        for number in [n for n in coarse if (n + 1) * self.coarse_ratio <= oldest]:
+            del coarse[number]
+
+    def top(self, keyword, window_minutes=60, limit=10, dimensions=DIMENSIONS, now=None):
+        """
+        Top items per dimension over the last window_minutes, with Count-Min estimates.
+        Past the fine span the window widens to whole coarse buckets; window_minutes reports the span used.
+        """
+        now = now or time.time()
+        current = int(now // self.bucket_seconds)
+        span = max(1, min(self.bucket_count, int(-(-window_minutes * 60 // self.bucket_seconds))))
+        start = current - span + 1
+        with self._lock:
+            buckets = self._buckets.get(keyword, {})
+            coarse = self._coarse.get(keyword, {})
+            window = [buckets[n] for n in range(start, current + 1) if n in buckets]
+            # Coarse buckets only hold numbers before the fine span, so a window inside it needs none
+            older = [n for n in coarse if (n + 1) * self.coarse_ratio > start] \
+                if start < current - self.fine_count + 1 else []
+            window += [coarse[n] for n in older]
+            if older:
+                span = max(span, current - min(older) * self.coarse_ratio + 1)
+            result = {'keyword': keyword, 'window_minutes': span * self.bucket_seconds / 60,
+                      'tweets': sum(b.tweets for b in window)}
+            for dim in dimensions:
+                candidates = set()
+                for bucket in window:
+                    candidates.update(bucket.top[dim].counts)
+                scored = [(sum(b.sketches[dim].estimate(item) for b in window), item) for item in candidates]
+                scored.sort(key=lambda pair: (-pair[0], pair[1]))
+                result[dim] = [{'item': item, 'count': count} for count, item in scored[:limit]]
+        return result
+
+    def keywords(self):
+        with self._lock:
+            return sorted(k for k in set(self._buckets) | set(self._coarse)
+                          if self._buckets.get(k) or self._coarse.get(k))
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Browser-free elements over recorded HTML (for replaying payloads offline)
+- parse_html() turns an article's outerHTML into a small element tree
+- Elements answer the WebDriver calls the extractor makes: find_element(s) by CSS
+  selector, .text and get_attribute (URLs resolved against the page they came from)
+- Selector support covers what the scraper uses: tag, #id, .class, [attr], [attr=v],
+  [attr*=v], [attr^=v], [attr$=v], the descendant combinator and "a, b" lists
+"""
+
+import re
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+from selenium.common.exceptions import InvalidSelectorException, NoSuchElementException
+from selenium.webdriver.common.by import By
+
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source',
+             'track', 'wbr'}
+BLOCK_TAGS = {'address', 'article', 'aside', 'blockquote', 'dd', 'div', 'dl', 'dt', 'fieldset', 'figcaption',
+              'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li', 'main', 'nav',
+              'ol', 'p', 'pre', 'section', 'table', 'tr', 'ul'}
+SKIPPED_TAGS = {'script', 'style', 'template', 'noscript'}
+URL_ATTRIBUTES = {'href', 'src', 'poster'}
+
+_SELECTOR_TOKEN_RE = re.compile(
+    r"""(?P<tag>\*|[a-zA-Z][\w-]*)
+      | \#(?P<id>[\w-]+)
+      | \.(?P<cls>[\w-]+)
+      | \[\s*(?P<attr>[\w-]+)\s*(?:(?P<op>[*^$]?=)\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[^\]\s]+))\s*)?\]""",
+    re.VERBOSE,
+)
+
+
+class HtmlElement:
+    """One parsed element; the WebDriver element subset used by tweet_extractor"""
+
+    __slots__ = ('tag_name', 'attrs', 'children', 'parent', 'base_url')
+
+    def __init__(self, tag_name, attrs, parent=None, base_url=None):
+        self.tag_name = tag_name
+        self.attrs = attrs
+        self.children = []  # HtmlElements and text strings
+        self.parent = parent
+        self.base_url = base_url
+
+    def iter_descendants(self):
+        for child in self.children:
+            if isinstance(child, HtmlElement):
+                yield child
+                yield from child.iter_descendants()
+
+    def find_elements(self, by=By.CSS_SELECTOR, value=None):
+        if by != By.CSS_SELECTOR:
+            raise InvalidSelectorException(f"Only CSS selectors are supported offline, not {by!r}")
+        selectors = parse_selector_list(value)
+        return [el for el in self.iter_descendants() if any(matches(el, selector) for selector in selectors)]
+
+    def find_element(self, by=By.CSS_SELECTOR, value=None):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"No element matches {value!r}")
+        return elements[0]
+
+    def get_attribute(self, name):
+        value = self.attrs.get(name)
+        if value and name in URL_ATTRIBUTES and self.base_url:
+            return urljoin(self.base_url, value)
+        return value
+
+    @property
+    def text(self):
+        """Approximates the rendered text: block elements and <br> break lines, whitespace collapses"""
+        lines = [[]]
+
+        def walk(element):
+            for child in element.children:
+                if isinstance(child, str):
+                    lines[-1].append(child)
+                elif child.tag_name == 'br':
+                    lines.append([])
+                elif child.tag_name not in SKIPPED_TAGS:
+                    block = child.tag_name in BLOCK_TAGS
+                    if block:
+                        lines.append([])
+                    walk(child)
+                    if block:
+                        lines.append([])
+
+        walk(self)
+        text = (" ".join("".join(parts).split()) for parts in lines)
+        return "\n".join(line for line in text if line)
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self, base_url):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.root = HtmlElement('#document', {}, base_url=base_url)
+        self.current = self.root
+
+    def handle_starttag(self, tag, attrs):
+        element = HtmlElement(tag, {name: value if value is not None else "" for name, value in attrs},
+                              parent=self.current, base_url=self.base_url)
+        self.current.children.append(element)
+        if tag not in VOID_TAGS:
+            self.current = element
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.current = self.current.parent
+
+    def handle_endtag(self, tag):
+        # Close up to the matching open tag; stray end tags are ignored
+        element = self.current
+        while element is not self.root and element.tag_name != tag:
+            element = element.parent
+        if element is not self.root:
+            self.current = element.parent
+
+    def handle_data(self, data):
+        self.current.children.append(data)
+
+
+def parse_html(html, base_url=None):
+    """The first element of an outerHTML fragment (or a #document holder if there are several)"""
+    builder = _TreeBuilder(base_url)
+    builder.feed(html)
+    builder.close()
+    elements = [child for child in builder.root.children if isinstance(child, HtmlElement)]
+    if len(elements) == 1:
+        elements[0].parent = None
+        return elements[0]
+    return builder.root
+
+
+def split_selector_list(selector):
+    """Split "a, b" at top-level commas (commas inside [...] or quotes belong to the selector)"""
+    parts, current, depth, quote = [], [], 0, None
+    for char in selector:
+        if quote:
+            quote = None if char == quote else quote
+        elif char in "\"'":
+            quote = char
+        elif char == '[':
+            depth += 1
+        elif char == ']':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append("".join(current))
+            current = []
+            continue
+        current.append(char)
+    parts.append("".join(current))
+    return [part.strip() for part in parts if part.strip()]
+
+
+def parse_compound_chain(selector):
+    """Compound selectors left to right (joined by descendant combinators), each a list of conditions"""
+    chain, conditions, position = [], [], 0
+    while position < len(selector):
+        start = position
+        while position < len(selector) and selector[position].isspace():
+            position += 1
+        if position > start and conditions:
+            chain.append(conditions)
+            conditions = []
+        if position == len(selector):
+            break
+        match = _SELECTOR_TOKEN_RE.match(selector, position)
+        if not match:
+            raise InvalidSelectorException(f"Unsupported selector {selector!r}")
+        if match.group('tag'):
+            if match.group('tag') != '*':
+                conditions.append(('tag', match.group('tag').lower()))
+        elif match.group('id'):
+            conditions.append(('=', 'id', match.group('id')))
+        elif match.group('cls'):
+            conditions.append(('class', match.group('cls')))
+        else:
+            value = next((v for v in (match.group('dq'), match.group('sq'), match.group('bare')) if v is not None), None)
+            conditions.append((match.group('op') or 'has', match.group('attr'), value))
+        position = match.end()
+    if conditions:
+        chain.append(conditions)
+    if not chain:
+        raise InvalidSelectorException(f"Empty selector {selector!r}")
+    return chain
+
+
+_selector_cache = {}
+
+
+def parse_selector_list(selector):
+    if selector not in _selector_cache:
+        _selector_cache[selector] = [parse_compound_chain(part) for part in split_selector_list(selector)]
+    return _selector_cache[selector]
+
+
+def matches_compound(element, conditions):
+    for condition in conditions:
+        kind = condition[0]
+        if kind == 'tag':
+            if element.tag_name != condition[1]:
+                return False
+        elif kind == 'class':
+            if condition[1] not in element.attrs.get('class', '').split():
+                return False
+        else:
+            value = element.attrs.get(condition[1])
+            if value is None:
+                return False
+            expected = condition[2]
+            if kind == '=' and value != expected:
+                return False
+            if kind == '*=' and (not expected or expected not in value):
+                return False
+            if kind == '^=' and (not expected or not value.startswith(expected)):
+                return False
+            if kind == '$=' and (not expected or not value.endswith(expected)):
+                return False
+    return True
+
+
+def matches(element, chain):
+    """Right-to-left match of a descendant chain against element and its ancestors"""
+    if not matches_compound(element, chain[-1]):
+        return False
+    for conditions in reversed(chain[:-1]):
+        element = element.parent
+        while element is not None and not matches_compound(element, conditions):
+            element = element.parent
+        if element is None:
+            return False
+    return True
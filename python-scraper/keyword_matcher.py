@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Local keyword-to-tweet matcher
+- Aho-Corasick automaton over every tracked keyword (scraper_keywords.txt minus blocked_keywords.txt)
+- Case and hashtag/punctuation folding so "#Bhopal" and "BHOPAL" match "bhopal"; Devanagari
+  spelling variants (nukta, chandrabindu) fold together, but there is no transliteration,
+  so "भोपाल" only matches a keyword written in Devanagari
+- Tags a tweet with all matching keywords in one linear pass over its text
+- Rebuilt only when one of the keyword files changes (checked once per batch, not per tweet)
+"""
+
+import os
+import threading
+import unicodedata
+from collections import deque
+
+KEYWORDS_CONFIG_PATH = os.path.join(os.path.dirname(__file__), "scraper_keywords.txt")
+BLOCKED_KEYWORDS_PATH = os.path.join(os.path.dirname(__file__), "blocked_keywords.txt")
+
+# Zero-width joiners/spaces and BOM show up in copy-pasted Hindi text
+_IGNORED_CHARS = dict.fromkeys(map(ord, "\u200b\u200c\u200d\u2060\ufeff"))
+# Devanagari spelling variants that should compare equal
+_DEVANAGARI_FOLD = str.maketrans({
+    "\u093c": None,      # nukta: ज़ -> ज
+    "\u0901": "\u0902",  # chandrabindu -> anusvara
+})
+
+
+def normalize_text(text):
+    """NFKC + casefold, fold Devanagari variants, turn punctuation/#/@ into single spaces"""
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    text = text.translate(_IGNORED_CHARS).translate(_DEVANAGARI_FOLD)
+    chars = [c if unicodedata.category(c)[0] in "LMN" else " " for c in text]
+    return " ".join("".join(chars).split())
+
+
+def read_keyword_file(path):
+    """Non-comment, non-empty lines of a keyword file"""
+    keywords = []
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    keywords.append(line)
+    return keywords
+
+
+class AhoCorasick:
+    """Multi-pattern string matcher; search() is linear in the text length"""
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for pattern in patterns:
+            self._add(pattern)
+        self._link()
+
+    def _add(self, pattern):
+        state = 0
+        for char in pattern:
+            nxt = self.goto[state].get(char)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][char] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            state = nxt
+        self.output[state].append(pattern)
+
+    def _link(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(char, 0)
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+    def search(self, text):
+        """Yield (end_index, pattern) for every occurrence in text"""
+        state = 0
+        for i, char in enumerate(text):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for pattern in self.output[state]:
+                yield i, pattern
+
+
+class KeywordMatcher:
+    """
+    Matches tweet text against tracked keywords. A multi-word keyword matches when
+    all of its words occur as whole words, mirroring Twitter's implicit AND.
+    """
+
+    def __init__(self, keywords_path=KEYWORDS_CONFIG_PATH, blocked_path=BLOCKED_KEYWORDS_PATH):
+        self.keywords_path = keywords_path
+        self.blocked_path = blocked_path
+        self._signature = None
+        self._lock = threading.Lock()
+        self._build([])
+
+    @classmethod
+    def from_keywords(cls, keywords):
+        """Matcher over an explicit keyword list (not backed by files)"""
+        matcher = cls(keywords_path=None, blocked_path=None)
+        matcher._build(keywords)
+        return matcher
+
+    def _file_signature(self):
+        signature = []
+        for path in (self.keywords_path, self.blocked_path):
+            try:
+                st = os.stat(path)
+                signature.append((st.st_mtime_ns, st.st_size))
+            except (OSError, TypeError):
+                signature.append(None)
+        return tuple(signature)
+
+    def _build(self, keywords):
+        ordered = []
+        words_by_keyword = {}
+        words_to_keywords = {}
+        for keyword in keywords:
+            words = tuple(dict.fromkeys(normalize_text(keyword).split()))
+            if not words or keyword in words_by_keyword:
+                continue
+            ordered.append(keyword)
+            words_by_keyword[keyword] = set(words)
+            for word in words:
+                words_to_keywords.setdefault(word, []).append(keyword)
+        # Swap in one assignment so concurrent match() calls never see a half-built state
+        self._state = (ordered, words_by_keyword, words_to_keywords, AhoCorasick(words_to_keywords))
+
+    @property
+    def keywords(self):
+        return self._state[0]
+
+    def refresh(self):
+        """Recompile from the keyword files if either changed since the last build"""
+        if self.keywords_path is None:
+            return False
+        signature = self._file_signature()
+        if signature == self._signature:
+            return False
+        with self._lock:
+            if signature == self._signature:
+                return False
+            blocked = {normalize_text(k) for k in read_keyword_file(self.blocked_path)}
+            tracked = [k for k in read_keyword_file(self.keywords_path) if normalize_text(k) not in blocked]
+            self._build(tracked)
+            self._signature = signature
+        print(f"🔤 Keyword matcher compiled for {len(self.keywords)} keywords")
+        return True
+
+    def match(self, text):
+        """All tracked keywords present in text, in tracking order (call refresh() once per batch first)"""
+        keywords, words_by_keyword, words_to_keywords, automaton = self._state
+        normalized = f" {normalize_text(text)} "
+        found = set()
+        for end, word in automaton.search(normalized):
+            # Whole words only: the match must sit between spaces
+            if normalized[end + 1] == " " and normalized[end - len(word)] == " ":
+                found.add(word)
+        if not found:
+            return []
+        candidates = {k for word in found for k in words_to_keywords[word]}
+        return [k for k in keywords if k in candidates and words_by_keyword[k] <= found]
+
+    def tag(self, tweets):
+        """Attach 'matched_keywords' to each tweet dict and return the list"""
+        self.refresh()
+        for tweet in tweets:
+            tweet['matched_keywords'] = self.match(tweet.get('text', ''))
+        return tweets
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Local lexicon pre-scoring of scraped tweets (before the paid LLM sentiment calls)
+- Hindi + English polarity lexicon plus every antiNationalKeywords category from the
+  Node table (src/data/antiNationalKeywords.js), weighted by its severityLevels
+- A batch is tokenized once into one flat array of lexicon indexes; polarity sums,
+  hit counts and worst severity per tweet come from NumPy gathers and bincount
+- Each tweet gets a score, a confidence and a triage verdict: 'local' when at least
+  PRESCORE_MIN_HITS lexicon hits agree, 'llm' when it is ambiguous or the lexicon knows
+  no word of it, 'risk' when a high-severity phrase hit
+Disable with SCRAPER_PRESCORE=0.
+"""
+
+import json
+import os
+import re
+
+import numpy as np
+
+from keyword_matcher import normalize_text
+from tweet_record import PreScore
+
+PRESCORE_ENABLED = os.environ.get("SCRAPER_PRESCORE", "1").lower() not in ("0", "false", "no")
+RISK_KEYWORDS_PATH = os.environ.get(
+    "SCRAPER_RISK_KEYWORDS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "data", "antiNationalKeywords.js"),
+)
+PRESCORE_MIN_CONFIDENCE = float(os.environ.get("SCRAPER_PRESCORE_MIN_CONFIDENCE", 0.6))
+PRESCORE_RISK_WEIGHT = float(os.environ.get("SCRAPER_PRESCORE_RISK_WEIGHT", 6))
+PRESCORE_MIN_HITS = int(os.environ.get("SCRAPER_PRESCORE_MIN_HITS", 2))  # fewer hits always go to the LLM
+LABEL_THRESHOLD = 0.2
+RISK_VALENCE = -1.0
+
+SENTIMENT_LEXICON = {
+    # English
+    "good": 1, "great": 1.5, "excellent": 2, "amazing": 1.5, "awesome": 1.5, "best": 1.5, "love": 1.5,
+    "happy": 1, "proud": 1.5, "thank": 1, "thanks": 1, "congratulations": 1.5, "congrats": 1.5,
+    "welcome": 1, "success": 1, "successful": 1, "win": 1, "won": 1, "beautiful": 1, "support": 0.5,
+    "development": 0.5, "progress": 1, "improve": 0.5, "improved": 1, "safe": 0.5, "peace": 1,
+    "peaceful": 1, "celebrate": 1, "celebration": 1, "hope": 0.5, "inspiring": 1.5, "blessed": 1,
+    "bad": -1, "worst": -2, "terrible": -1.5, "horrible": -1.5, "awful": -1.5, "hate": -1.5,
+    "angry": -1, "sad": -1, "shame": -1.5, "shameful": -1.5, "corrupt": -1.5, "corruption": -1.5,
+    "fail": -1, "failed": -1, "failure": -1, "scam": -1.5, "fraud": -1.5, "loot": -1.5, "crime": -1,
+    "accident": -1, "dead": -1, "death": -1, "injured": -1, "protest": -0.5, "problem": -0.5,
+    "dirty": -1, "unsafe": -1, "disgusting": -2, "pathetic": -1.5, "useless": -1.5, "lies": -1,
+    "liar": -1.5, "fake": -1, "harassment": -1.5, "negligence": -1.5, "poor": -0.5,
+    # Romanized Hindi
+    "accha": 1, "achha": 1, "badhai": 1.5, "shandar": 1.5, "dhanyavad": 1, "shukriya": 1,
+    "zindabad": 1, "vikas": 0.5, "garv": 1.5, "khush": 1, "sundar": 1, "jeet": 1, "jai": 0.5,
+    "bura": -1, "bekar": -1.5, "ghatiya": -1.5, "bhrashtachar": -1.5, "ghotala": -1.5, "sharm": -1.5,
+    "sharmnak": -2, "murdabad": -1.5, "dhokha": -1.5, "jhooth": -1, "pareshan": -1, "gussa": -1,
+    "hadsa": -1, "maut": -1, "lapravahi": -1.5, "gundagardi": -1.5,
+    # Devanagari
+    "अच्छा": 1, "अच्छी": 1, "बधाई": 1.5, "शानदार": 1.5, "धन्यवाद": 1, "शुक्रिया": 1, "ज़िंदाबाद": 1,
+    "जिंदाबाद": 1, "विकास": 0.5, "गर्व": 1.5, "खुश": 1, "खुशी": 1, "सुंदर": 1, "जीत": 1, "सफल": 1,
+    "सफलता": 1, "शांति": 1, "सम्मान": 1, "प्रगति": 1,
+    "बुरा": -1, "बुरी": -1, "बेकार": -1.5, "घटिया": -1.5, "भ्रष्टाचार": -1.5, "घोटाला": -1.5,
+    "शर्म": -1.5, "शर्मनाक": -2, "मुर्दाबाद": -1.5, "धोखा": -1.5, "झूठ": -1, "परेशान": -1,
+    "गुस्सा": -1, "हादसा": -1, "मौत": -1, "लापरवाही": -1.5, "गुंडागर्दी": -1.5, "अपराध": -1,
+    "नाराज": -1, "विफल": -1, "दुखद": -1.5,
+}
+
+NEGATIONS = {"not", "no", "never", "dont", "don't", "isnt", "nahi", "nahin", "na", "mat", "नहीं", "ना", "मत", "न"}
+
+
+def load_risk_lexicon(path=RISK_KEYWORDS_PATH):
+    """
+    ({category: [phrases]}, {category: (level, weight)}) from the Node keyword table.
+    Categories missing from severityLevels get the lowest level.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    keywords_src, _, severity_src = source.partition("const severityLevels")
+    body = keywords_src[keywords_src.index('{'):keywords_src.rindex('}') + 1]
+    body = re.sub(r"^\s*//.*$", "", body, flags=re.MULTILINE)
+    body = re.sub(r",(\s*[}\]])", r"\1", body)
+    categories = json.loads(body)
+
+    levels = []
+    for level, block in re.findall(r'"([A-Z_]+)"\s*:\s*\{(.*?)\}', severity_src, flags=re.DOTALL):
+        weight = re.search(r'"weight"\s*:\s*([\d.]+)', block)
+        if weight:
+            levels.append((level, float(weight.group(1)), re.findall(r"antiNationalKeywords\.(\w+)", block)))
+    lowest = min(levels, key=lambda item: item[1])[:2] if levels else ("LOW", 1.0)
+    severity = {category: lowest for category in categories}
+    for level, weight, members in sorted(levels, key=lambda item: item[1]):
+        for category in members:
+            severity[category] = (level, weight)
+    return categories, severity
+
+
+class LexiconScorer:
+    """Batch scorer over one vocabulary; index 0 is the 'no term' slot with zero weights"""
+
+    def __init__(self, sentiment=SENTIMENT_LEXICON, risk_categories=None, severity=None):
+        risk_categories = risk_categories or {}
+        severity = severity or {}
+        self.categories = list(risk_categories)
+        self.levels = {}
+        self.vocab = {}
+        valence, risk, category = [0.0], [0.0], [-1]
+
+        def slot(term):
+            term = normalize_text(term)
+            if not term:
+                return None
+            if term not in self.vocab:
+                self.vocab[term] = len(valence)
+                valence.append(0.0)
+                risk.append(0.0)
+                category.append(-1)
+            return self.vocab[term]
+
+        for term, value in sentiment.items():
+            index = slot(term)
+            if index is not None:
+                valence[index] = float(value)
+        for number, (name, phrases) in enumerate(risk_categories.items()):
+            level, weight = severity.get(name, ("LOW", 1.0))
+            self.levels[weight] = level
+            for phrase in phrases:
+                index = slot(phrase)
+                if index is None or weight <= risk[index]:
+                    continue
+                valence[index] = min(valence[index], RISK_VALENCE)
+                risk[index] = weight
+                category[index] = number
+
+        self.valence = np.array(valence, dtype=np.float32)
+        self.risk = np.array(risk, dtype=np.float32)
+        self.category = np.array(category, dtype=np.int16)
+        # Longest phrase starting at each first word, so most words cost one set lookup
+        self.phrase_words = {}
+        for term in self.vocab:
+            words = term.split()
+            self.phrase_words[words[0]] = max(self.phrase_words.get(words[0], 1), len(words))
+        self.negations = {normalize_text(word) for word in NEGATIONS}
+
+    def token_indexes(self, text):
+        """(lexicon indexes, +1/-1 signs) for one text, longest phrase first, negation flips the next hit"""
+        words = normalize_text(text).split()
+        indexes, signs = [], []
+        negated = False
+        i = 0
+        while i < len(words):
+            longest = self.phrase_words.get(words[i], 0)
+            for n in range(min(longest, len(words) - i), 0, -1):
+                index = self.vocab.get(" ".join(words[i:i + n]) if n > 1 else words[i])
+                if index:
+                    indexes.append(index)
+                    signs.append(-1 if negated else 1)
+                    negated = False
+                    i += n
+                    break
+            else:
+                negated = words[i] in self.negations
+                i += 1
+        return indexes, signs
+
+    def score(self, texts):
+        """One PreScore per text"""
+        count = len(texts)
+        if not count:
+            return []
+        flat, signs, lengths = [], [], np.zeros(count, dtype=np.int64)
+        for i, text in enumerate(texts):
+            indexes, text_signs = self.token_indexes(text)
+            flat.extend(indexes)
+            signs.extend(text_signs)
+            lengths[i] = len(indexes)
+        flat = np.array(flat, dtype=np.int64)
+        owner = np.repeat(np.arange(count), lengths)
+        values = self.valence[flat] * np.array(signs, dtype=np.float32)
+
+        positive = np.bincount(owner, weights=np.clip(values, 0, None), minlength=count)
+        negative = np.bincount(owner, weights=np.clip(-values, 0, None), minlength=count)
+        hits = np.bincount(owner, weights=(values != 0), minlength=count)
+        worst = np.zeros(count, dtype=np.float32)
+        np.maximum.at(worst, owner, self.risk[flat])
+
+        total = positive + negative
+        scores = np.divide(positive - negative, total + 1.0)
+        agreement = np.divide(np.abs(positive - negative), total, out=np.ones(count), where=total > 0)
+        # No hit says nothing about the tweet, so it gets no confidence at all
+        confidence = np.where(hits > 0, agreement * (1 - np.exp(-hits)), 0.0)
+
+        risk_mask = self.risk[flat] > 0
+        matched = {}
+        for i, number in zip(owner[risk_mask].tolist(), self.category[flat[risk_mask]].tolist()):
+            names = matched.setdefault(i, [])
+            if self.categories[number] not in names:
+                names.append(self.categories[number])
+
+        results = []
+        for i in range(count):
+            score = round(float(scores[i]), 3)
+            if score > LABEL_THRESHOLD:
+                label = "positive"
+            elif score < -LABEL_THRESHOLD:
+                label = "negative"
+            else:
+                label = "neutral"
+            risk_weight = float(worst[i])
+            if risk_weight >= PRESCORE_RISK_WEIGHT:
+                triage = "risk"
+            elif hits[i] < PRESCORE_MIN_HITS or confidence[i] < PRESCORE_MIN_CONFIDENCE:
+                triage = "llm"
+            else:
+                triage = "local"
+            results.append(PreScore(score, label, round(float(confidence[i]), 3), triage,
+                                    self.levels.get(risk_weight), matched.get(i, [])))
+        return results
+
+    def score_tweets(self, tweets):
+        """Attach a PreScore to each tweet in place; returns {triage: count}"""
+        counts = {}
+        for tweet, prescore in zip(tweets, self.score([t.get('text') or '' for t in tweets])):
+            tweet['prescore'] = prescore
+            counts[prescore.triage] = counts.get(prescore.triage, 0) + 1
+        return counts
+
+
+def open_default_scorer():
+    """LexiconScorer with the Node risk categories, or None when pre-scoring is disabled"""
+    if not PRESCORE_ENABLED:
+        return None
+    try:
+        categories, severity = load_risk_lexicon()
+    except Exception as e:
+        print(f"⚠️ Could not read risk keywords from {RISK_KEYWORDS_PATH}: {e} (scoring polarity only)")
+        categories, severity = {}, {}
+    scorer = LexiconScorer(risk_categories=categories, severity=severity)
+    print(f"🧮 Lexicon pre-scoring enabled ({len(scorer.vocab)} terms, {len(categories)} risk categories)")
+    return scorer
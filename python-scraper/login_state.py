@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Login state detection for the Twitter login flow
+- One small execute_script probe per tick classifies the page as username step,
+  password step, challenge, captcha, logged in, or still loading; nothing
+  serializes the DOM (page_source) or reads .text element by element
+- Buttons are clicked by label inside the page in one round trip
+- The logged-in verdict is cached per browser session, so re-validating a session
+  (e.g. right after cookies were restored) skips navigation until it goes stale
+  or a page is redirected to the login flow
+"""
+
+import os
+import threading
+import time
+
+from selector_cache import find_grouped
+
+LOGIN_VERDICT_TTL_SECONDS = float(os.environ.get("SCRAPER_LOGIN_VERDICT_TTL_SECONDS", 900))
+
+LOGGED_IN = "logged_in"
+USERNAME = "username"
+PASSWORD = "password"
+CHALLENGE = "challenge"
+CAPTCHA = "captcha"
+LOADING = "loading"
+
+# Checked in this order: a challenge or captcha page may still carry a text input
+LOGIN_PROBE_JS = """
+const visible = (selector) => Array.from(document.querySelectorAll(selector)).some(
+    (el) => el.offsetParent !== null && !el.disabled);
+if (document.querySelector('[data-testid="SideNav_AccountSwitcher_Button"], [data-testid="AppTabBar_Home_Link"]')) {
+    return 'logged_in';
+}
+if (location.pathname.includes('challenge') || document.querySelector('input[name="challenge_response"]')) {
+    return 'challenge';
+}
+if (document.querySelector('iframe[src*="captcha"], iframe[src*="arkose"], iframe#arkose_iframe')) {
+    return 'captcha';
+}
+if (visible('input[name="password"], input[type="password"], input[autocomplete="current-password"]')) {
+    return 'password';
+}
+if (visible('input[name="text"], input[autocomplete="username"], input[aria-label="Phone, email, or username"]')) {
+    return 'username';
+}
+return 'loading';
+"""
+
+CLICK_BUTTON_JS = """
+const words = arguments[0];
+for (const button of document.querySelectorAll('div[role="button"], button')) {
+    if (button.offsetParent === null || button.disabled || button.getAttribute('aria-disabled') === 'true') continue;
+    const label = (button.innerText || '').trim().toLowerCase();
+    if (label && words.some((word) => label.includes(word))) {
+        button.click();
+        return label;
+    }
+}
+return null;
+"""
+
+USERNAME_SELECTORS = [
+    'input[name="text"]',
+    'input[type="text"][autocomplete="username"]',
+    'input[aria-label="Phone, email, or username"]',
+    'input[placeholder*="phone"]',
+    'input[placeholder*="email"]',
+    'input[placeholder*="username"]',
+]
+PASSWORD_SELECTORS = [
+    'input[name="password"]',
+    'input[type="password"]',
+    'input[autocomplete="current-password"]',
+    'input[aria-label="Password"]',
+]
+LOGIN_STEP_RETRY_SECONDS = 5  # refill a step only if the page is still on it this long after
+
+_verdicts = {}  # browser session id -> time the session was last seen logged in
+_verdicts_lock = threading.Lock()
+
+
+def probe_login_state(driver):
+    """Current login state of the loaded page (one round trip)"""
+    try:
+        return driver.execute_script(LOGIN_PROBE_JS) or LOADING
+    except Exception:
+        return LOADING
+
+
+def settled_login_state(driver):
+    """The probed state, or False while the page is still loading (for WebDriverWait)"""
+    state = probe_login_state(driver)
+    return state if state != LOADING else False
+
+
+def fill_login_input(driver, selectors, value):
+    """Type value into the first visible, enabled input matching selectors (one lookup)"""
+    for element in find_grouped(driver, selectors):
+        try:
+            if element.is_displayed() and element.is_enabled():
+                element.clear()
+                element.send_keys(value)
+                return True
+        except Exception:
+            continue
+    return False
+
+
+def click_button(driver, words):
+    """Click the first visible button whose label contains one of words; returns its label or None"""
+    try:
+        return driver.execute_script(CLICK_BUTTON_JS, list(words))
+    except Exception:
+        return None
+
+
+def remember_logged_in(driver):
+    with _verdicts_lock:
+        _verdicts[driver.session_id] = time.time()
+
+
+def forget_login(driver):
+    """Drop the cached verdict, e.g. after a search was redirected to the login flow"""
+    with _verdicts_lock:
+        _verdicts.pop(driver.session_id, None)
+
+
+def redirected_to_login(driver):
+    """True when Twitter bounced the current page to its login flow (the session expired)"""
+    try:
+        return "/login" in driver.current_url
+    except Exception:
+        return False
+
+
+def cached_logged_in(driver, ttl=LOGIN_VERDICT_TTL_SECONDS):
+    """True when this browser session was verified as logged in within ttl seconds"""
+    with _verdicts_lock:
+        checked_at = _verdicts.get(driver.session_id)
+    return checked_at is not None and time.time() - checked_at < ttl
@@ -2,11 +2,15 @@
 """
 Script to manage Python scraper keywords
 Usage: python manage_scraper_keywords.py [add|remove|list|clear] [keyword]
+remove/clear also stop the keyword on a running scraper_server.py over its persistent
+connection; add only updates the file (scraping starts with a 'scrape' request).
 """
 
 import sys
 import os
 
+from scraper_client import get_client, ReplyTimeout, SCRAPER_HOST, SCRAPER_PORT
+
 KEYWORDS_FILE = "scraper_keywords.txt"
 
 def read_keywords():
@@ -35,6 +39,17 @@ def write_keywords(keywords):
         else:
             f.write("# No active keywords - scraper will be stopped\n")
 
+def notify_server(action, **fields):
+    """Send a request to the running scraper server; None if it isn't reachable"""
+    try:
+        response = get_client().call(action, **fields)
+    except (OSError, ReplyTimeout) as e:
+        print(f"⚠️ Scraper server at {SCRAPER_HOST}:{SCRAPER_PORT} not reachable, only the file was updated ({e})")
+        return None
+    if not response.get('success'):
+        print(f"❌ Server refused {action} request: {response.get('error')}")
+    return response
+
 def add_keyword(keyword):
     """Add a keyword to the list"""
     keywords = read_keywords()
@@ -49,6 +64,7 @@ def remove_keyword(keyword):
         keywords.remove(keyword)
         write_keywords(keywords)
         print(f"✅ Removed keyword: {keyword}")
+        stop_on_server([keyword])
     else:
         print(f"❌ Keyword not found: {keyword}")
 
@@ -62,10 +78,18 @@ def list_keywords():
     else:
         print("📋 No active keywords")
 
+def stop_on_server(keywords):
+    response = notify_server('stop', keywords=sorted(keywords))
+    for entry in (response or {}).get('stopped', []):
+        print(f"🛑 Stopped scraping for keyword: {entry['keyword']} ({entry['tweets_saved']} tweets saved)")
+
 def clear_keywords():
     """Clear all keywords"""
+    keywords = read_keywords()
     write_keywords(set())
     print("✅ Cleared all keywords")
+    if keywords:
+        stop_on_server(keywords)
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Opt-in parallel media downloader with a content-addressed cache
+- Bounded thread pool sharing one pooled requests.Session
+- Files stored once under objects/<sha256[:2]>/<sha256>, so the same image seen
+  under several keywords or media keys takes disk space once
+- media_key -> sha256 index persisted in index.json
+- LRU eviction by total size
+Enable with SCRAPER_FETCH_MEDIA=1.
+"""
+
+import hashlib
+import json
+import os
+import pathlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+FETCH_MEDIA = os.environ.get("SCRAPER_FETCH_MEDIA", "").lower() in ("1", "true", "yes")
+MEDIA_CACHE_DIR = os.environ.get("SCRAPER_MEDIA_CACHE_DIR", os.path.join(os.path.dirname(__file__), "media_cache"))
+MEDIA_CACHE_MAX_BYTES = int(float(os.environ.get("SCRAPER_MEDIA_CACHE_MAX_MB", 1024)) * 1024 * 1024)
+MEDIA_FETCH_WORKERS = int(os.environ.get("SCRAPER_MEDIA_FETCH_WORKERS", 8))
+MAX_OBJECT_BYTES = 50 * 1024 * 1024
+
+
+class MediaCache:
+    """Content-addressed on-disk cache with LRU size eviction"""
+
+    def __init__(self, root=MEDIA_CACHE_DIR, max_bytes=MEDIA_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.objects_dir = os.path.join(root, "objects")
+        self.index_path = os.path.join(root, "index.json")
+        self._lock = threading.Lock()
+        self._lru = OrderedDict()  # sha256 -> size, least recently used first
+        self._keys = {}            # media_key -> sha256
+        self.total_bytes = 0
+        pathlib.Path(self.objects_dir).mkdir(parents=True, exist_ok=True)
+        self._load()
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def _load(self):
+        found = []
+        for path in pathlib.Path(self.objects_dir).glob("*/*"):
+            if path.name.endswith(".tmp"):
+                continue
+            st = path.stat()
+            found.append((st.st_atime, path.name, st.st_size))
+        for _, digest, size in sorted(found):
+            self._lru[digest] = size
+            self.total_bytes += size
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    self._keys = {k: d for k, d in json.load(f).items() if d in self._lru}
+            except Exception as e:
+                print(f"⚠️ Media cache index unreadable, starting empty: {e}")
+
+    def save_index(self):
+        with self._lock:
+            keys = dict(self._keys)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(keys, f)
+        os.replace(tmp_path, self.index_path)
+
+    def lookup(self, media_key):
+        """Path of the cached file for media_key (marks it recently used), or None"""
+        with self._lock:
+            digest = self._keys.get(media_key)
+            if digest is None or digest not in self._lru:
+                return None
+            self._lru.move_to_end(digest)
+        return self._object_path(digest)
+
+    def put(self, media_key, data):
+        """Store bytes under their SHA-256 and map media_key to it. Returns the digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        with self._lock:
+            exists = digest in self._lru
+        if not exists:
+            pathlib.Path(path).parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        with self._lock:
+            if digest not in self._lru:
+                self._lru[digest] = len(data)
+                self.total_bytes += len(data)
+            self._lru.move_to_end(digest)
+            self._keys[media_key] = digest
+            evicted = self._evict()
+        for victim in evicted:
+            try:
+                os.remove(self._object_path(victim))
+            except OSError:
+                pass
+        return digest
+
+    def _evict(self):
+        evicted = []
+        while self.total_bytes > self.max_bytes and len(self._lru) > 1:
+            digest, size = self._lru.popitem(last=False)
+            self.total_bytes -= size
+            evicted.append(digest)
+        if evicted:
+            gone = set(evicted)
+            self._keys = {k: d for k, d in self._keys.items() if d not in gone}
+        return evicted
+
+
+class MediaFetcher:
+    """Downloads tweet media into a MediaCache on a bounded worker pool"""
+
+    def __init__(self, cache, workers=MEDIA_FETCH_WORKERS, session=None, timeout=20):
+        self.cache = cache
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        if session is None:
+            adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=2)
+            self.session.mount("https://", adapter)
+            self.session.mount("http://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="media-fetch")
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self.fetched = 0
+        self.failed = 0
+        self._last_index_save = time.time()
+
+    def submit(self, media_key, url):
+        """Queue one download unless it is cached or already in flight. Returns a Future or None."""
+        if not url or not media_key or self.cache.lookup(media_key):
+            return None
+        with self._lock:
+            if media_key in self._in_flight:
+                return None
+            self._in_flight.add(media_key)
+        return self._executor.submit(self._fetch, media_key, url)
+
+    def submit_tweets(self, tweets):
+        """Queue images and video posters for a batch of tweets"""
+        futures = []
+        for tweet in tweets:
+            media = tweet.get('media') or {}
+            for img in media.get('images', []):
+                futures.append(self.submit(img.get('media_key') or img['url'], img['url']))
+            for vid in media.get('videos', []):
+                if vid.get('type') == 'video' and vid.get('poster'):
+                    futures.append(self.submit(f"poster:{vid.get('media_key') or vid['poster']}", vid['poster']))
+        return [f for f in futures if f is not None]
+
+    def _fetch(self, media_key, url):
+        try:
+            with self.session.get(url, timeout=self.timeout, stream=True) as response:
+                response.raise_for_status()
+                chunks = []
+                size = 0
+                for chunk in response.iter_content(64 * 1024):
+                    size += len(chunk)
+                    if size > MAX_OBJECT_BYTES:
+                        raise ValueError(f"object larger than {MAX_OBJECT_BYTES} bytes")
+                    chunks.append(chunk)
+            digest = self.cache.put(media_key, b"".join(chunks))
+            with self._lock:
+                self.fetched += 1
+            if time.time() - self._last_index_save > 30:
+                self._last_index_save = time.time()
+                self.cache.save_index()
+            return digest
+        except Exception as e:
+            with self._lock:
+                self.failed += 1
+            print(f"⚠️ Media fetch failed for {url}: {e}")
+            return None
+        finally:
+            with self._lock:
+                self._in_flight.discard(media_key)
+
+    def shutdown(self, wait=False):
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+        try:
+            self.cache.save_index()
+        except Exception:
+            pass
+
+
+def open_default_fetcher():
+    """MediaFetcher for the configured cache, or None unless SCRAPER_FETCH_MEDIA is set"""
+    if not FETCH_MEDIA:
+        return None
+    try:
+        fetcher = MediaFetcher(MediaCache())
+        print(f"🖼️ Media fetcher enabled ({MEDIA_FETCH_WORKERS} workers, cache {MEDIA_CACHE_DIR})")
+        return fetcher
+    except Exception as e:
+        print(f"❌ Could not start media fetcher: {e}")
+        return None
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Media URL normalization for scraped tweets
+- pbs.twimg.com image URLs are reduced to their media key and rebuilt with one
+  configured size variant, so "name=small" and "name=900x900" copies dedup to one record
+- Video posters resolve to the stable numeric media ID; blob: video sources are
+  replaced by the canonical poster URL
+- Dedup per tweet uses sets keyed by media key (O(1) per element)
+- Results are slotted Media/MediaSet records (see tweet_record)
+"""
+
+import os
+import re
+from urllib.parse import urlparse, parse_qs
+
+from tweet_record import Media, MediaSet
+
+# Size variant requested for every image: thumb, small, medium, large, orig, 4096x4096
+MEDIA_IMAGE_SIZE = os.environ.get("SCRAPER_MEDIA_IMAGE_SIZE", "large")
+
+_MEDIA_PATH_RE = re.compile(r"^/media/([A-Za-z0-9_-]+)(?:\.(\w+))?")
+_VIDEO_THUMB_RE = re.compile(r"^/(ext_tw_video_thumb|amplify_video_thumb)/(\d+)/")
+_GIF_THUMB_RE = re.compile(r"^/tweet_video_thumb/([A-Za-z0-9_-]+)(?:\.(\w+))?")
+_VIDEO_SRC_RE = re.compile(r"^/(?:ext_tw_video|amplify_video)/(\d+)/")
+_GIF_SRC_RE = re.compile(r"^/tweet_video/([A-Za-z0-9_-]+)\.mp4")
+
+
+def canonical_image_url(media_key, fmt="jpg", size=MEDIA_IMAGE_SIZE):
+    return f"https://pbs.twimg.com/media/{media_key}?format={fmt}&name={size}"
+
+
+def resolve_image(src, size=MEDIA_IMAGE_SIZE):
+    """(media_key, canonical_url) for a tweet photo, or None for avatars, emoji and non-media images"""
+    if not src:
+        return None
+    parsed = urlparse(src)
+    if parsed.netloc != "pbs.twimg.com":
+        return None
+    match = _MEDIA_PATH_RE.match(parsed.path)
+    if not match:
+        # profile_images, hashflag emoji, card thumbnails etc. are not tweet media
+        return None
+    fmt = parse_qs(parsed.query).get("format", [match.group(2) or "jpg"])[0]
+    return match.group(1), canonical_image_url(match.group(1), fmt, size)
+
+
+def resolve_poster(poster):
+    """(media_key, canonical_poster_url) for a video/GIF thumbnail"""
+    if not poster:
+        return None
+    parsed = urlparse(poster)
+    if parsed.netloc != "pbs.twimg.com":
+        return None
+    canonical = f"https://pbs.twimg.com{parsed.path}"
+    match = _VIDEO_THUMB_RE.match(parsed.path)
+    if match:
+        return match.group(2), canonical
+    match = _GIF_THUMB_RE.match(parsed.path)
+    if match:
+        return f"gif:{match.group(1)}", canonical
+    return None
+
+
+def resolve_video_src(src):
+    """media_key for a direct video.twimg.com source (None for blob: and unknown URLs)"""
+    if not src or src.startswith("blob:"):
+        return None
+    parsed = urlparse(src)
+    if parsed.netloc != "video.twimg.com":
+        return None
+    match = _VIDEO_SRC_RE.match(parsed.path)
+    if match:
+        return match.group(1)
+    match = _GIF_SRC_RE.match(parsed.path)
+    if match:
+        return f"gif:{match.group(1)}"
+    return None
+
+
+class MediaCollector:
+    """Accumulates one tweet's media with set-based dedup; .result() is a MediaSet"""
+
+    def __init__(self, size=MEDIA_IMAGE_SIZE):
+        self.size = size
+        self.images = []
+        self.videos = []
+        self._seen = set()
+
+    def add_image(self, src, alt=''):
+        resolved = resolve_image(src, self.size)
+        if not resolved or resolved[0] in self._seen:
+            return False
+        self._seen.add(resolved[0])
+        self.images.append(Media(resolved[1], 'image', resolved[0], alt=alt or ''))
+        return True
+
+    def add_video(self, src, poster=None):
+        poster_info = resolve_poster(poster)
+        media_key = resolve_video_src(src) or (poster_info[0] if poster_info else None)
+        if media_key is None:
+            # Unrecognised source: fall back to the raw URL as its own key, but never a blob:
+            media_key = src if src and not src.startswith("blob:") else None
+        if media_key is None or media_key in self._seen:
+            return False
+        self._seen.add(media_key)
+        poster_url = poster_info[1] if poster_info else poster
+        url = src if src and not src.startswith("blob:") else poster_url
+        self.videos.append(Media(url, 'video', media_key, poster=poster_url))
+        return True
+
+    def add_embed(self, src):
+        if not src:
+            return False
+        parsed = urlparse(src)
+        key = f"embed:{parsed.netloc}{parsed.path}"
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        self.videos.append(Media(src, 'embed', key))
+        return True
+
+    def result(self):
+        return MediaSet(self.images, self.videos)
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Rotation and compaction for tweets_output_<keyword>.md files
+- Active file is sealed into a numbered segment once it passes a size or age limit
+- Sealed segments are gzip, which the Node consumer reads with zlib (src/app.js
+  readKeywordTweets); SCRAPER_ROTATE_COMPRESSION=zstd switches to zstd for archives
+  nothing else reads (needs the zstandard package)
+- A per-file manifest lists segments with their tweet-number ranges, so readers can
+  skip segments they already processed and writers never rescan the file to number tweets
+"""
+
+import gzip
+import json
+import os
+import pathlib
+import re
+import shutil
+import threading
+import time
+from datetime import datetime
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Rotation limits (override via environment)
+ROTATE_MAX_BYTES = int(os.environ.get("SCRAPER_ROTATE_MAX_BYTES", 5 * 1024 * 1024))
+ROTATE_MAX_AGE_SECONDS = float(os.environ.get("SCRAPER_ROTATE_MAX_AGE_HOURS", 24)) * 3600
+ROTATE_COMPRESSION = os.environ.get("SCRAPER_ROTATE_COMPRESSION", "gzip").strip().lower()
+# 0 keeps every sealed segment
+ROTATE_KEEP_SEGMENTS = int(os.environ.get("SCRAPER_ROTATE_KEEP_SEGMENTS", 0))
+
+SEGMENTS_DIRNAME = "segments"
+
+_file_locks = {}
+_file_locks_guard = threading.Lock()
+
+
+def file_lock(file_path):
+    """One lock per output file; appends and rotation of the same file never interleave"""
+    with _file_locks_guard:
+        return _file_locks.setdefault(os.path.abspath(file_path), threading.RLock())
+
+
+def segments_dir(file_path):
+    stem = pathlib.Path(file_path).stem
+    return os.path.join(os.path.dirname(file_path), SEGMENTS_DIRNAME, stem)
+
+
+def manifest_path(file_path):
+    return os.path.join(segments_dir(file_path), "manifest.json")
+
+
+def _count_tweets(file_path):
+    if not os.path.exists(file_path):
+        return 0
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return sum(1 for line in f if line.startswith('## Tweet'))
+
+
+def load_manifest(file_path):
+    """Read the manifest, bootstrapping one from an existing un-rotated file"""
+    path = manifest_path(file_path)
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    existing = _count_tweets(file_path)
+    return {
+        'file': os.path.basename(file_path),
+        'next_tweet_number': existing + 1,
+        'active': {
+            'first_tweet': 1,
+            'created_at': os.path.getmtime(file_path) if os.path.exists(file_path) else time.time(),
+        },
+        'segments': [],
+    }
+
+
+def save_manifest(file_path, manifest):
+    path = manifest_path(file_path)
+    pathlib.Path(path).parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _compress(src, dest_base):
+    if ROTATE_COMPRESSION == "zstd" and zstandard is not None:
+        dest = dest_base + ".zst"
+        with open(src, 'rb') as fin, open(dest, 'wb') as fout:
+            zstandard.ZstdCompressor(level=10).copy_stream(fin, fout)
+        return dest, "zstd"
+    dest = dest_base + ".gz"
+    with open(src, 'rb') as fin, gzip.open(dest, 'wb', compresslevel=6) as fout:
+        shutil.copyfileobj(fin, fout)
+    return dest, "gzip"
+
+
+def needs_rotation(file_path, manifest, max_bytes=ROTATE_MAX_BYTES, max_age=ROTATE_MAX_AGE_SECONDS):
+    if not os.path.exists(file_path):
+        return False
+    if manifest['next_tweet_number'] <= manifest['active']['first_tweet']:
+        return False
+    if max_bytes and os.path.getsize(file_path) >= max_bytes:
+        return True
+    return bool(max_age) and time.time() - manifest['active']['created_at'] >= max_age
+
+
+def seal_active_file(file_path, manifest, keep_segments=ROTATE_KEEP_SEGMENTS):
+    """Compress the active file into the next numbered segment and start a fresh one"""
+    seg_dir = segments_dir(file_path)
+    pathlib.Path(seg_dir).mkdir(parents=True, exist_ok=True)
+    number = (manifest['segments'][-1]['number'] + 1) if manifest['segments'] else 1
+    base = os.path.join(seg_dir, f"{pathlib.Path(file_path).stem}.{number:06d}.md")
+
+    dest, compression = _compress(file_path, base)
+    manifest['segments'].append({
+        'number': number,
+        'name': os.path.basename(dest),
+        'compression': compression,
+        'first_tweet': manifest['active']['first_tweet'],
+        'last_tweet': manifest['next_tweet_number'] - 1,
+        'bytes': os.path.getsize(dest),
+        'sealed_at': datetime.now().isoformat(),
+    })
+    manifest['active'] = {'first_tweet': manifest['next_tweet_number'], 'created_at': time.time()}
+
+    if keep_segments:
+        while len(manifest['segments']) > keep_segments:
+            pruned = manifest['segments'].pop(0)
+            try:
+                os.remove(os.path.join(seg_dir, pruned['name']))
+            except OSError:
+                pass
+
+    # Manifest first: a crash after this point leaves the tweets in both places, never in neither
+    save_manifest(file_path, manifest)
+    os.remove(file_path)
+    print(f"🗜️ Sealed {os.path.basename(file_path)} into {os.path.basename(dest)} "
+          f"(tweets {manifest['segments'][-1]['first_tweet']}-{manifest['segments'][-1]['last_tweet']})")
+    return dest
+
+
+def reserve_tweet_numbers(file_path, count):
+    """
+    Claim `count` sequential tweet numbers for an append, rotating first if needed.
+    Call while holding file_lock(file_path). Returns the first number.
+    """
+    manifest = load_manifest(file_path)
+    if needs_rotation(file_path, manifest):
+        seal_active_file(file_path, manifest)
+    first = manifest['next_tweet_number']
+    manifest['next_tweet_number'] = first + count
+    save_manifest(file_path, manifest)
+    return first
+
+
+_RUN_FILE_RE = re.compile(r"^tweets_output_.+_\d{8}_\d{6}_[0-9a-f]{8}\.md$")
+
+
+def compact_run_files(directory, max_age=ROTATE_MAX_AGE_SECONDS):
+    """Compress per-run timestamped outputs (scrape_tweets.py) older than max_age into segments/runs"""
+    if not os.path.isdir(directory):
+        return 0
+    runs_dir = os.path.join(directory, SEGMENTS_DIRNAME, "runs")
+    compacted = 0
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if not _RUN_FILE_RE.match(name) or time.time() - os.path.getmtime(path) < max_age:
+            continue
+        pathlib.Path(runs_dir).mkdir(parents=True, exist_ok=True)
+        _compress(path, os.path.join(runs_dir, name))
+        os.remove(path)
+        compacted += 1
+    if compacted:
+        print(f"🗜️ Compacted {compacted} old run files into {runs_dir}")
+    return compacted
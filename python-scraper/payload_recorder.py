@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Opt-in recorder of raw extraction inputs, for re-extracting history offline
+- Each scroll's article elements are captured as outerHTML in the same round trip,
+  with the page URL and time, before extraction/pruning touches them
+- Segments are gzip JSON-lines files; every scroll is appended as its own gzip member,
+  so a crash loses at most the scroll being written
+- Article HTML is stored once per segment (blake2b content hash); scroll entries refer
+  to it by hash, and every segment is self-contained so segments replay in parallel
+- Segments rotate at SCRAPER_RECORD_SEGMENT_MB; replay with replay_payloads.py
+Enable by setting SCRAPER_RECORD_DIR.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import pathlib
+import sys
+import threading
+import time
+import zlib
+
+RECORD_DIR = os.environ.get("SCRAPER_RECORD_DIR")
+RECORD_SEGMENT_BYTES = int(float(os.environ.get("SCRAPER_RECORD_SEGMENT_MB", 64)) * 1024 * 1024)
+
+SEGMENT_PREFIX = "payloads-"
+SEGMENT_SUFFIX = ".jsonl.gz"
+
+CAPTURE_JS = "return {url: location.href, html: arguments[0].map((el) => el.outerHTML)};"
+
+
+def content_hash(html):
+    return hashlib.blake2b(html.encode('utf-8'), digest_size=12).hexdigest()
+
+
+class PayloadRecorder:
+    """Appends captured scrolls to the current segment; thread-safe"""
+
+    def __init__(self, directory, segment_bytes=RECORD_SEGMENT_BYTES):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self._lock = threading.Lock()
+        self._path = None
+        self._written = 0
+        self._seen = set()  # content hashes already stored in the current segment
+        self._segments = 0
+        pathlib.Path(directory).mkdir(parents=True, exist_ok=True)
+
+    def capture(self, driver, elements):
+        """Record the outerHTML of article elements (one execute_script)"""
+        if not elements:
+            return
+        try:
+            snapshot = driver.execute_script(CAPTURE_JS, list(elements))
+            self.record(snapshot['url'], snapshot['html'])
+        except Exception as e:
+            print(f"⚠️ Could not record page payload: {e}")
+
+    def record(self, url, htmls, captured_at=None):
+        with self._lock:
+            if self._path is None or self._written >= self.segment_bytes:
+                self._rotate()
+            entries, hashes = [], []
+            for html in htmls:
+                if not html:
+                    continue
+                digest = content_hash(html)
+                hashes.append(digest)
+                if digest not in self._seen:
+                    self._seen.add(digest)
+                    entries.append({'type': 'article', 'hash': digest, 'html': html})
+            entries.append({'type': 'scroll', 'at': captured_at or time.time(), 'url': url, 'articles': hashes})
+            payload = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+            member = gzip.compress(payload.encode('utf-8'), compresslevel=6)
+            with open(self._path, 'ab') as f:
+                f.write(member)
+            self._written += len(member)
+
+    def _rotate(self):
+        self._segments += 1
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        name = f"{SEGMENT_PREFIX}{stamp}-{os.getpid()}-{self._segments:04d}{SEGMENT_SUFFIX}"
+        self._path = os.path.join(self.directory, name)
+        self._written = 0
+        self._seen = set()
+        print(f"🎞️ Recording page payloads to {self._path}")
+
+
+def list_segments(directory):
+    """Recorded segment paths, oldest first"""
+    if not os.path.isdir(directory):
+        return []
+    names = [n for n in os.listdir(directory) if n.startswith(SEGMENT_PREFIX) and n.endswith(SEGMENT_SUFFIX)]
+    return [os.path.join(directory, n) for n in sorted(names)]
+
+
+def read_segment(path):
+    """(url, captured_at, [article html]) per recorded scroll, in recording order"""
+    articles = {}
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        try:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # torn final line after a crash
+                if entry.get('type') == 'article':
+                    articles[entry['hash']] = entry['html']
+                elif entry.get('type') == 'scroll':
+                    yield entry.get('url'), entry.get('at'), [articles[h] for h in entry['articles'] if h in articles]
+        except (EOFError, gzip.BadGzipFile, zlib.error) as e:
+            # Torn gzip member after a crash: the scrolls read so far still count
+            print(f"⚠️ Segment {os.path.basename(path)} is truncated ({e}); stopping there", file=sys.stderr)
+
+
+def open_default_recorder():
+    """PayloadRecorder writing to SCRAPER_RECORD_DIR, or None when recording is off"""
+    if not RECORD_DIR:
+        return None
+    try:
+        recorder = PayloadRecorder(RECORD_DIR)
+        print(f"🎞️ Payload recording enabled ({RECORD_DIR})")
+        return recorder
+    except Exception as e:
+        print(f"❌ Could not start payload recorder: {e}")
+        return None
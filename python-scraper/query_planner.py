@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Query planner for batched multi-keyword searches
+- Packs keywords and handles into combined "(a OR b) (from:x OR from:y)" queries
+- Keeps every query under Twitter's search length limit
+- Maps returned tweets back to the handle they came from
+  (keyword attribution is done by keyword_matcher)
+- Handle-centric plans: one bare from: query per handle, every keyword matched locally
+"""
+
+from urllib.parse import quote
+
+# Twitter rejects search queries longer than ~512 characters
+MAX_QUERY_LENGTH = 500
+
+
+def format_keyword(keyword):
+    """Multi-word keywords keep their AND semantics inside a group"""
+    keyword = keyword.strip()
+    return f"({keyword})" if " " in keyword else keyword
+
+
+def format_handle(handle):
+    return f"from:{handle.strip().lstrip('@')}"
+
+
+def build_clause(terms):
+    if len(terms) == 1:
+        return terms[0]
+    return "(" + " OR ".join(terms) + ")"
+
+
+def pack_terms(terms, max_length):
+    """Greedily pack terms into OR clauses no longer than max_length"""
+    groups = []
+    current = []
+    for term in terms:
+        if current and len(build_clause(current + [term])) > max_length:
+            groups.append(current)
+            current = []
+        current.append(term)
+    if current:
+        groups.append(current)
+    return groups
+
+
+def plan_queries(keywords, handles=None, max_length=MAX_QUERY_LENGTH):
+    """
+    Build the list of combined searches for one scrape cycle.
+    Returns [{'query': str, 'keywords': [...], 'handles': [...]}, ...]
+    """
+    keywords = [k for k in keywords if k and k.strip()]
+    # Bare handles, so Handle lines and high-water keys agree whether '@x' or 'x' was passed
+    handles = list(dict.fromkeys(h.strip().lstrip('@') for h in (handles or []) if h and h.strip()))
+    if not keywords:
+        return []
+
+    handle_groups = [[]]
+    if handles:
+        # Handle clauses get at most half the budget, keywords take the rest
+        by_term = {format_handle(h): h for h in handles}
+        handle_groups = [[by_term[t] for t in group] for group in pack_terms(list(by_term), max_length // 2)]
+
+    plans = []
+    for handle_group in handle_groups:
+        handle_clause = build_clause([format_handle(h) for h in handle_group]) if handle_group else ""
+        budget = max_length - len(handle_clause) - (1 if handle_clause else 0)
+        by_term = {format_keyword(k): k for k in keywords}
+        for group in pack_terms(list(by_term), budget):
+            query = build_clause(group)
+            if handle_clause:
+                query = f"{query} {handle_clause}"
+            plans.append({'query': query, 'keywords': [by_term[t] for t in group], 'handles': handle_group})
+    return plans
+
+
+def plan_handle_queries(keywords, handles):
+    """
+    One "from:<handle>" search per handle, covering every keyword at once.
+    'strict' plans only keep tweets that keyword_matcher attributes to a keyword.
+    """
+    keywords = [k for k in keywords if k and k.strip()]
+    handles = [h.strip().lstrip('@') for h in (handles or []) if h and h.strip()]
+    if not keywords:
+        return []
+    return [{'query': format_handle(h), 'keywords': keywords, 'handles': [h], 'strict': True} for h in handles]
+
+
+def build_search_url(query):
+    return f"https://twitter.com/search?q={quote(query)}&src=typed_query&f=live"
+
+
+def match_handle(author, handles):
+    """Handle whose @name appears in the scraped User-Name block, if any"""
+    author = (author or "").casefold()
+    for handle in handles:
+        if f"@{handle.lstrip('@').casefold()}" in author:
+            return handle
+    return None
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Re-run the current tweet extractor over recorded page payloads (see payload_recorder)
+Usage: python replay_payloads.py [--dir DIR] [--workers N] [--output FILE] [--unique]
+- No browser and no Twitter: article HTML is parsed offline (html_snapshot) and fed to
+  the same extract_tweet() the live scraper uses
+- Segments are independent, so each one is replayed in its own worker process
+- Writes one JSON tweet per line (tweet fields plus page_url and captured_at)
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from html_snapshot import parse_html
+from payload_recorder import RECORD_DIR, list_segments, read_segment
+from tweet_extractor import extract_tweet
+
+
+def replay_segment(path):
+    """(path, scrolls, [tweet dicts], extraction errors) for one segment"""
+    scrolls, errors, tweets = 0, 0, []
+    for url, captured_at, htmls in read_segment(path):
+        scrolls += 1
+        for html in htmls:
+            try:
+                tweet = extract_tweet(parse_html(html, base_url=url))
+            except Exception:
+                errors += 1
+                continue
+            if tweet:
+                record = tweet.to_dict()
+                record['page_url'] = url
+                record['captured_at'] = captured_at
+                tweets.append(record)
+    return path, scrolls, tweets, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-extract tweets from recorded page payloads")
+    parser.add_argument("--dir", default=RECORD_DIR, help="segment directory (default: SCRAPER_RECORD_DIR)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--output", help="write JSON lines here instead of stdout")
+    parser.add_argument("--unique", action="store_true", help="emit each tweet ID once")
+    args = parser.parse_args()
+
+    if not args.dir:
+        parser.error("no segment directory (pass --dir or set SCRAPER_RECORD_DIR)")
+    segments = list_segments(args.dir)
+    if not segments:
+        print(f"⚠️ No recorded segments in {args.dir}", file=sys.stderr)
+        return 1
+
+    started = time.time()
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    seen = set()
+    totals = {'scrolls': 0, 'tweets': 0, 'errors': 0}
+    try:
+        with multiprocessing.Pool(max(1, min(args.workers, len(segments)))) as pool:
+            # imap keeps segment order, so output follows recording order
+            for path, scrolls, tweets, errors in pool.imap(replay_segment, segments):
+                for tweet in tweets:
+                    if args.unique and tweet['tweet_id']:
+                        if tweet['tweet_id'] in seen:
+                            continue
+                        seen.add(tweet['tweet_id'])
+                    out.write(json.dumps(tweet, ensure_ascii=False) + "\n")
+                    totals['tweets'] += 1
+                totals['scrolls'] += scrolls
+                totals['errors'] += errors
+                print(f"🎞️ {os.path.basename(path)}: {scrolls} scrolls, {len(tweets)} tweets, {errors} errors",
+                      file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"✅ Replayed {len(segments)} segments: {totals['scrolls']} scrolls, {totals['tweets']} tweets, "
+          f"{totals['errors']} errors in {time.time() - started:.1f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
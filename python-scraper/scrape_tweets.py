@@ -1,3 +1,4 @@
+import os
 import time
 import random
 from datetime import datetime
@@ -9,6 +10,8 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 
+from output_rotation import compact_run_files
+
 # ----------------------------------------------------------------------
 # Replace these with your actual Twitter credentials
 TWITTER_USERNAME = ""
@@ -263,6 +266,9 @@ def main():
         print("❌ No keywords provided")
         return
         
+    # Compress earlier runs' timestamped files so this directory stays small
+    compact_run_files(os.getcwd())
+
     # Generate unique filename for this run
     unique_filename = get_unique_filename(KEYWORDS, HANDLES)
     print(f"📁 Using output file: {unique_filename}")
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Client for scraper_server.py over one persistent, multiplexed connection
+- Every request gets an 'id'; the server answers with NDJSON lines carrying the same id,
+  so many requests can be pipelined on one socket and answered in any order
+- A reader thread matches replies to pending Futures; the connection is opened lazily
+  and re-opened on the next request after it drops
+- get_client() returns one shared client per process, so control paths pay for
+  connection setup once
+Server address: SCRAPER_HOST / SCRAPER_PORT (default localhost:9999)
+"""
+
+import itertools
+import json
+import os
+import socket
+import threading
+from concurrent.futures import Future, TimeoutError as ReplyTimeout  # raised by call() when no reply comes
+
+SCRAPER_HOST = os.environ.get("SCRAPER_HOST", "localhost")
+SCRAPER_PORT = int(os.environ.get("SCRAPER_PORT", 9999))
+CONNECT_TIMEOUT_SECONDS = 5
+REQUEST_TIMEOUT_SECONDS = 30
+
+__all__ = ['ScraperClient', 'ReplyTimeout', 'get_client', 'SCRAPER_HOST', 'SCRAPER_PORT']
+
+
+class ScraperClient:
+    def __init__(self, host=SCRAPER_HOST, port=SCRAPER_PORT, connect_timeout=CONNECT_TIMEOUT_SECONDS):
+        self.host = host
+        self.port = port
+        self.connect_timeout = connect_timeout
+        self._lock = threading.Lock()  # guards the socket, pending map and sends
+        self._sock = None
+        self._pending = {}  # request id -> Future
+        self._ids = itertools.count(1)
+
+    def send(self, action, **fields):
+        """Queue one request and return a Future for its reply dict (pipelining: don't wait in between)"""
+        future = Future()
+        with self._lock:
+            sock = self._connect()
+            request_id = next(self._ids)
+            future.request_id = request_id
+            self._pending[request_id] = future
+            request = dict(fields, action=action, id=request_id)
+            try:
+                sock.sendall((json.dumps(request, ensure_ascii=False) + "\n").encode('utf-8'))
+            except OSError as e:
+                self._pending.pop(request_id, None)
+                self._drop(sock, e)
+                raise
+        return future
+
+    def call(self, action, timeout=REQUEST_TIMEOUT_SECONDS, **fields):
+        """Send one request and wait for its reply"""
+        future = self.send(action, **fields)
+        try:
+            return future.result(timeout=timeout)
+        except ReplyTimeout:
+            # A late reply is dropped by _resolve instead of piling up in the pending map
+            with self._lock:
+                self._pending.pop(future.request_id, None)
+            raise
+
+    def close(self):
+        with self._lock:
+            if self._sock:
+                self._drop(self._sock, ConnectionError("client closed"))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _connect(self):
+        if self._sock is None:
+            sock = socket.create_connection((self.host, self.port), timeout=self.connect_timeout)
+            sock.settimeout(None)  # the reader blocks; callers time out on their Futures
+            self._sock = sock
+            threading.Thread(target=self._read_replies, args=(sock,), daemon=True,
+                             name=f"scraper-client-{self.port}").start()
+        return self._sock
+
+    def _drop(self, sock, error):
+        """Close sock and fail the requests still waiting on it (caller holds the lock)"""
+        if self._sock is sock:
+            self._sock = None
+            pending, self._pending = self._pending, {}
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(error)
+        try:
+            sock.close()
+        except OSError:
+            pass
+
+    def _read_replies(self, sock):
+        buffered = b""
+        error = ConnectionError("scraper server closed the connection")
+        try:
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                buffered += chunk
+                while b"\n" in buffered:
+                    line, buffered = buffered.split(b"\n", 1)
+                    if line.strip():
+                        self._resolve(json.loads(line.decode('utf-8')))
+        except (OSError, ValueError) as e:
+            error = ConnectionError(f"scraper connection lost: {e}")
+        with self._lock:
+            self._drop(sock, error)
+
+    def _resolve(self, reply):
+        with self._lock:
+            future = self._pending.pop(reply.pop('id', None), None)
+        if future and not future.done():
+            future.set_result(reply)
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def get_client(host=SCRAPER_HOST, port=SCRAPER_PORT):
+    """The process-wide client for host:port"""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None or (_shared_client.host, _shared_client.port) != (host, port):
+            _shared_client = ScraperClient(host, port)
+        return _shared_client
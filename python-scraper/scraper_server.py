@@ -5,6 +5,8 @@ Persistent Twitter Scraper Server (fixed)
 - Save/load cookies to avoid repeated manual logins
 - Fail-fast on repeated Chromedriver errors (no spam)
 - Chromedriver logs to /tmp/chromedriver.log
+- Control connections are one-shot JSON, or persistent NDJSON sessions when requests
+  carry an 'id' (pipelined, replies matched by id; see serve_session / scraper_client.py)
 """
 
 import json
@@ -13,17 +15,32 @@ import sys
 import time
 import threading
 import socket
-import pickle
 import pathlib
 import hashlib
-from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+from query_planner import plan_queries, plan_handle_queries, build_search_url, match_handle
+from keyword_matcher import KeywordMatcher, BLOCKED_KEYWORDS_PATH, normalize_text
+from dedup import NearDuplicateCollapser
+from output_rotation import file_lock, reserve_tweet_numbers
+from tweet_store import open_default_store, tweet_row, fallback_tweet_id
+from change_feed import ChangeFeed, encode_line
+from district_geo import (load_districts, DistrictIndex, plan_district_queries, districts_for, district_key, district_id_of,
+                          DISTRICTS_PATH, GEO_RADIUS_KM)
+from backfill import (plan_windows, backfill_query, split_window, parse_time, format_time,
+                      BACKFILL_WINDOW_HOURS, BACKFILL_MAX_BATCHES)
+from media_fetcher import open_default_fetcher
+from heavy_hitters import HeavyHitterStats, DIMENSIONS
+from lexicon_scorer import open_default_scorer
+from login_state import (probe_login_state, settled_login_state, click_button, fill_login_input, cached_logged_in,
+                         remember_logged_in, forget_login, redirected_to_login, USERNAME_SELECTORS, PASSWORD_SELECTORS,
+                         LOGIN_STEP_RETRY_SECONDS, LOGGED_IN, USERNAME, PASSWORD, CHALLENGE, CAPTCHA)
+from browser_backend import get_backend
+from dom_pruner import prune_articles, release_page, UNSCRAPED
+from tweet_extractor import extract_tweet, selector_cache
+from payload_recorder import open_default_recorder
+from adaptive_interval import IntervalController, ADAPTIVE_MIN_MINUTES, ADAPTIVE_MAX_MINUTES
 
 # Output directory for scraped tweets
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "output")
@@ -32,13 +49,55 @@ OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "output")
 driver_instance = None
 server_socket = None
 is_running = False
+tweet_store = None  # optional SQLite sink (SCRAPER_SQLITE_PATH)
+change_feed = ChangeFeed()  # pushes persisted tweets to 'subscribe' clients
+persist_lock = threading.Lock()  # keeps store seq order == feed publish order
+media_fetcher = None  # optional background media downloader (SCRAPER_FETCH_MEDIA)
+heavy_hitters = HeavyHitterStats()  # rolling top hashtags/mentions/authors per keyword ('stats' action)
+lexicon_scorer = None  # local sentiment/risk pre-score attached before persisting (SCRAPER_PRESCORE)
+payload_recorder = None  # raw article HTML kept for offline re-extraction (SCRAPER_RECORD_DIR)
 
-# Cookie path
-COOKIE_PATH = os.path.join(os.path.dirname(__file__), "twitter_cookies.pkl")
+# Serializes use of the shared browser; every scraping mode holds it while it drives a tab
+driver_lock = threading.RLock()
+
+# Persistent control sessions (see serve_session): requests run concurrently per connection
+SESSION_WORKERS = int(os.environ.get("SCRAPER_SESSION_WORKERS", 4))
+SESSION_IDLE_SECONDS = float(os.environ.get("SCRAPER_SESSION_IDLE_SECONDS", 600))
+
+# Default number of tabs for tab mode (request 'tabs' overrides)
+SCRAPER_TABS = int(os.environ.get("SCRAPER_TABS", 4))
+
+# Cookie path (JSON, never pickle)
+COOKIE_PATH = os.path.join(os.path.dirname(__file__), "twitter_cookies.json")
 
 # Keywords configuration path
 KEYWORDS_CONFIG_PATH = os.path.join(os.path.dirname(__file__), "scraper_keywords.txt")
 
+# Tags each tweet with every tracked keyword it mentions; recompiles when the keyword files change
+keyword_matcher = KeywordMatcher(KEYWORDS_CONFIG_PATH, BLOCKED_KEYWORDS_PATH)
+
+# Per-keyword near-duplicate state, kept across batches and cycles
+dedupers_by_keyword = {}
+dedupers_lock = threading.Lock()
+
+# Running continuous jobs and the state a restart needs to pick them back up
+CHECKPOINT_PATH = os.environ.get("SCRAPER_CHECKPOINT_PATH", os.path.join(os.path.dirname(__file__), "scraper_checkpoint.json"))
+SHUTDOWN_DRAIN_SECONDS = 30  # how long shutdown waits for jobs to finish their current batch
+scrape_jobs = {}  # job id -> job dict (see start_job)
+jobs_by_keyword = {}  # keyword -> ids of the jobs scraping it, for O(1) 'stop'
+keyword_totals = {}  # keyword -> tweets persisted since the server started
+jobs_lock = threading.RLock()
+high_water_marks = {}  # search key -> newest tweet ID persisted
+cycle_floors = {}  # search key -> high-water mark when the current cycle started
+server_started = False  # checkpoint only once jobs were actually resumed/started
+
+
+def get_deduper(keyword):
+    with dedupers_lock:
+        if keyword not in dedupers_by_keyword:
+            dedupers_by_keyword[keyword] = NearDuplicateCollapser()
+        return dedupers_by_keyword[keyword]
+
 def read_allowed_keywords():
     """Read allowed keywords from configuration file"""
     allowed_keywords = set()
@@ -91,11 +150,16 @@ TWITTER_PASSWORD = os.environ.get("TWITTER_PASSWORD")
 
 
 def save_cookies(driver, path=COOKIE_PATH):
+    """Persist session cookies as JSON, written atomically (tmp file + rename)"""
     try:
         cookies = driver.get_cookies()
         pathlib.Path(path).parent.mkdir(parents=True, exist_ok=True)
-        with open(path, "wb") as f:
-            pickle.dump(cookies, f)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cookies, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
         print(f"💾 Saved {len(cookies)} cookies to {path}")
         return True
     except Exception as e:
@@ -103,120 +167,58 @@ def save_cookies(driver, path=COOKIE_PATH):
         return False
 
 
+def read_cookie_file(path=COOKIE_PATH):
+    """Read saved cookies, dropping any that have already expired"""
+    with open(path, "r", encoding="utf-8") as f:
+        cookies = json.load(f)
+    now = time.time()
+    return [c for c in cookies if not c.get("expiry") or c["expiry"] > now]
+
+
+def to_cdp_cookie(cookie, domain=".twitter.com"):
+    """Convert a Selenium cookie dict into a CDP Network.CookieParam"""
+    param = {
+        "name": cookie["name"],
+        "value": cookie["value"],
+        "domain": cookie.get("domain") or domain,
+        "path": cookie.get("path", "/"),
+        "secure": cookie.get("secure", False),
+        "httpOnly": cookie.get("httpOnly", False),
+    }
+    if cookie.get("expiry"):
+        param["expires"] = cookie["expiry"]
+    if cookie.get("sameSite") in ("Strict", "Lax", "None"):
+        param["sameSite"] = cookie["sameSite"]
+    return param
+
+
 def load_cookies(driver, path=COOKIE_PATH, domain=".twitter.com"):
+    """
+    Inject saved cookies in one CDP Network.setCookies call.
+    Works before the first navigation, so no warm-up page load is needed.
+    """
     try:
         if not os.path.exists(path):
             print("⚠️ Cookies file not found:", path)
             return 0
-        with open(path, "rb") as f:
-            cookies = pickle.load(f)
-        loaded = 0
-        for c in cookies:
-            cookie = {k: v for k, v in c.items() if k not in ("sameSite",)}
-            if "domain" not in cookie:
-                cookie["domain"] = domain
-            try:
-                driver.add_cookie(cookie)
-                loaded += 1
-            except Exception:
-                cookie.pop("expiry", None)
-                try:
-                    driver.add_cookie(cookie)
-                    loaded += 1
-                except Exception:
-                    continue
-        print(f"🔁 Loaded {loaded} cookies from {path}")
-        return loaded
+        cookies = read_cookie_file(path)
+        if not cookies:
+            print(f"⚠️ All cookies in {path} have expired")
+            return 0
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": [to_cdp_cookie(c, domain) for c in cookies]})
+        print(f"🔁 Loaded {len(cookies)} cookies from {path}")
+        return len(cookies)
     except Exception as e:
         print(f"❌ Failed to load cookies: {e}")
         return 0
 
 
 def setup_driver(headless=True):
-    """Setup Chrome driver with sensible options. headless=True runs without UI."""
-    chrome_options = Options()
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--window-size=1920,1080")
-    chrome_options.add_argument("--remote-debugging-port=9222")
-    chrome_options.add_argument("--disable-extensions")
-    chrome_options.add_argument("--mute-audio")
-    chrome_options.add_argument("--hide-scrollbars")
-    chrome_options.add_argument("--disable-background-networking")
-    chrome_options.add_argument("--disable-background-timer-throttling")
-    chrome_options.add_argument("--disable-renderer-backgrounding")
-    chrome_options.add_argument("--disable-backgrounding-occluded-windows")
-    chrome_options.add_argument("--disable-client-side-phishing-detection")
-    # Additional flags for macOS compatibility
-    chrome_options.add_argument("--disable-web-security")
-    chrome_options.add_argument("--disable-features=VizDisplayCompositor")
-    chrome_options.add_argument("--disable-ipc-flooding-protection")
-    chrome_options.add_argument("--disable-hang-monitor")
-    chrome_options.add_argument("--disable-prompt-on-repost")
-    chrome_options.add_argument("--disable-sync")
-    chrome_options.add_argument("--disable-translate")
-    chrome_options.add_argument("--disable-logging")
-    chrome_options.add_argument("--disable-default-apps")
-    chrome_options.add_argument("--disable-component-extensions-with-background-pages")
-
-    if headless:
-        # modern headless flag
-        chrome_options.add_argument("--headless=new")
-
-    # Try common chrome paths (including macOS)
-    chrome_paths = [
-        "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",  # macOS Chrome
-        "/usr/bin/google-chrome-stable",
-        "/usr/bin/google-chrome",
-        "/snap/bin/chromium",
-        "/usr/bin/chromium-browser",
-        "/usr/bin/chromium"
-    ]
-    for p in chrome_paths:
-        if os.path.exists(p):
-            chrome_options.binary_location = p
-            print(f"🔧 Using Chrome at: {p}")
-            break
-
+    """Start Chrome through the configured backend (SCRAPER_BROWSER_BACKEND). headless=True runs without UI."""
     try:
-        # Clear corrupted wdm cache optional
-        wdm_cache = os.path.expanduser("~/.wdm")
-        if os.path.exists(wdm_cache):
-            # don't aggressively delete on every start in prod; helpful here
-            import shutil
-            shutil.rmtree(wdm_cache, ignore_errors=True)
-
-        print("🔧 Using WebDriver Manager to install/locate chromedriver...")
-        # Add chromedriver log path for debugging
-        try:
-            driver_path = ChromeDriverManager().install()
-        except Exception as e:
-            print(f"⚠️ WebDriver Manager failed: {e}")
-            # Fallback: try to use system chromedriver
-            driver_path = "/usr/local/bin/chromedriver"
-            if not os.path.exists(driver_path):
-                driver_path = "/opt/homebrew/bin/chromedriver"
-            if not os.path.exists(driver_path):
-                raise Exception("No chromedriver found")
-            print(f"🔧 Using system chromedriver: {driver_path}")
-        
-        # Fix: WebDriver Manager sometimes returns wrong file, find the actual chromedriver
-        if "THIRD_PARTY_NOTICES" in driver_path:
-            actual_driver_path = driver_path.replace("THIRD_PARTY_NOTICES.chromedriver", "chromedriver")
-            if os.path.exists(actual_driver_path):
-                driver_path = actual_driver_path
-                print(f"🔧 Fixed driver path to: {driver_path}")
-        
-        # Fix permissions for chromedriver
-        try:
-            os.chmod(driver_path, 0o755)
-            print(f"🔧 Fixed chromedriver permissions")
-        except Exception as e:
-            print(f"⚠️ Could not fix permissions: {e}")
-        
-        service = Service(driver_path, log_path="/tmp/chromedriver.log")
-        driver = webdriver.Chrome(service=service, options=chrome_options)
+        backend = get_backend()
+        print(f"🔧 Browser backend: {backend.name}")
+        driver = backend.start(headless=headless)
 
         # Try slight stealth
         try:
@@ -224,18 +226,17 @@ def setup_driver(headless=True):
         except Exception:
             pass
 
-        # Attempt to reuse saved cookies (safe if file exists)
+        # Attempt to reuse saved cookies (safe if file exists); twitter_login's
+        # first navigation to /home then validates the restored session
         try:
-            driver.get("https://twitter.com/")
             if os.path.exists(COOKIE_PATH):
                 load_cookies(driver)
-                driver.get("https://twitter.com/home")
-                time.sleep(2)
         except Exception as e:
             print("⚠️ Cookie load step failed (non-fatal):", e)
 
         driver.set_page_load_timeout(60)
-        driver.implicitly_wait(5)
+        # No implicit wait: fallback selectors that match nothing must fail fast (see selector_cache)
+        driver.implicitly_wait(0)
         print("✅ Browser started (headless=%s)." % ("True" if headless else "False"))
         return driver
 
@@ -253,6 +254,10 @@ def twitter_login(driver, timeout_seconds=60):
         print("❌ No browser available for login")
         return False
 
+    if cached_logged_in(driver):
+        print("✅ Session already verified as logged in.")
+        return True
+
     # Check if we have credentials
     if not TWITTER_USERNAME or not TWITTER_PASSWORD:
         print("❌ Missing TWITTER_USERNAME or TWITTER_PASSWORD environment variables")
@@ -261,9 +266,9 @@ def twitter_login(driver, timeout_seconds=60):
     # If cookies indicate logged-in state already, check quickly
     try:
         driver.get("https://twitter.com/home")
-        time.sleep(2)
-        if "login" not in driver.current_url and driver.find_elements(By.CSS_SELECTOR, '[data-testid="SideNav_AccountSwitcher_Button"]'):
+        if WebDriverWait(driver, 7, poll_frequency=0.25).until(settled_login_state) == LOGGED_IN:
             print("✅ Already logged in via cookies.")
+            remember_logged_in(driver)
             return True
     except Exception:
         pass
@@ -271,131 +276,44 @@ def twitter_login(driver, timeout_seconds=60):
     print("🌐 Opening Twitter login page...")
     try:
         driver.get("https://twitter.com/i/flow/login")
-        time.sleep(3)
     except Exception as e:
         print("⚠️ Could not open login page:", e)
         return False
 
     print("🔐 Attempting automatic login...")
     start_time = time.time()
-    step = 0  # 0 = enter username, 1 = enter password, 2 = submitted
+    acted_state, acted_at = None, 0.0  # last step we filled, so it is not refilled while the page moves on
 
     while time.time() - start_time < timeout_seconds:
         try:
-            current_url = driver.current_url
+            state = probe_login_state(driver)
 
-            # Quick check for already logged in
-            if ("home" in current_url and "login" not in current_url) or driver.find_elements(By.CSS_SELECTOR, '[data-testid="SideNav_AccountSwitcher_Button"]'):
+            if state == LOGGED_IN:
                 print("✅ Login successful!")
                 save_cookies(driver)
+                remember_logged_in(driver)
                 return True
 
-            # Step 0: Fill username
-            if step == 0:
-                username_selectors = [
-                    'input[name="text"]',
-                    'input[type="text"][autocomplete="username"]',
-                    'input[aria-label="Phone, email, or username"]',
-                    'input[placeholder*="phone"]',
-                    'input[placeholder*="email"]',
-                    'input[placeholder*="username"]',
-                ]
-                
-                filled = False
-                for sel in username_selectors:
-                    try:
-                        elems = driver.find_elements(By.CSS_SELECTOR, sel)
-                        if elems:
-                            for e in elems:
-                                if e.is_displayed() and e.is_enabled():
-                                    e.clear()
-                                    e.send_keys(TWITTER_USERNAME)
-                                    filled = True
-                                    break
-                        if filled:
-                            break
-                    except Exception:
-                        continue
+            if state == CHALLENGE:
+                print("⚠️ 2FA/challenge detected. Cannot bypass automatically.")
+                return False
 
-                if filled:
-                    # Click next button
-                    try:
-                        buttons = driver.find_elements(By.CSS_SELECTOR, 'div[role="button"], button')
-                        for b in buttons:
-                            try:
-                                if not b.is_displayed() or not b.is_enabled():
-                                    continue
-                                txt = (b.text or "").strip().lower()
-                                if txt and any(k in txt for k in ("next", "continue", "log in", "login", "confirm")):
-                                    b.click()
-                                    break
-                            except Exception:
-                                continue
-                    except Exception:
-                        pass
-                    step = 1
-                    time.sleep(2)
-                    continue
+            if state == CAPTCHA:
+                print("⚠️ CAPTCHA detected. Cannot bypass automatically.")
+                return False
 
-            # Step 1: Fill password
-            if step == 1:
-                pwd_selectors = [
-                    'input[name="password"]',
-                    'input[type="password"]',
-                    'input[autocomplete="current-password"]',
-                    'input[aria-label="Password"]'
-                ]
-                
-                found_pwd = False
-                for sel in pwd_selectors:
-                    try:
-                        elems = driver.find_elements(By.CSS_SELECTOR, sel)
-                        if elems:
-                            for e in elems:
-                                if e.is_displayed() and e.is_enabled():
-                                    e.clear()
-                                    e.send_keys(TWITTER_PASSWORD)
-                                    found_pwd = True
-                                    break
-                        if found_pwd:
-                            break
-                    except Exception:
-                        continue
-
-                if found_pwd:
-                    # Click login button
-                    try:
-                        buttons = driver.find_elements(By.CSS_SELECTOR, 'div[role="button"], button')
-                        for b in buttons:
-                            try:
-                                if not b.is_displayed() or not b.is_enabled():
-                                    continue
-                                txt = (b.text or "").strip().lower()
-                                if txt and any(k in txt for k in ("log in", "login", "submit", "continue")):
-                                    b.click()
-                                    break
-                            except Exception:
-                                continue
-                    except Exception:
-                        pass
-                    step = 2
-                    time.sleep(3)
-                    continue
-
-            # Check for 2FA or CAPTCHA
-            try:
-                if driver.find_elements(By.CSS_SELECTOR, 'input[name="challenge_response"]') or "challenge" in driver.current_url:
-                    print("⚠️ 2FA/challenge detected. Cannot bypass automatically.")
-                    return False
-
-                page_src = driver.page_source.lower()
-                if "captcha" in page_src or driver.find_elements(By.CSS_SELECTOR, 'iframe[src*="captcha"]'):
-                    print("⚠️ CAPTCHA detected. Cannot bypass automatically.")
-                    return False
-            except Exception:
-                pass
+            if state in (USERNAME, PASSWORD) and (state != acted_state or time.time() - acted_at > LOGIN_STEP_RETRY_SECONDS):
+                if state == USERNAME:
+                    filled = fill_login_input(driver, USERNAME_SELECTORS, TWITTER_USERNAME)
+                    words = ("next", "continue", "log in", "login", "confirm")
+                else:
+                    filled = fill_login_input(driver, PASSWORD_SELECTORS, TWITTER_PASSWORD)
+                    words = ("log in", "login", "submit", "continue")
+                if filled:
+                    click_button(driver, words)
+                    acted_state, acted_at = state, time.time()
 
-            time.sleep(1)
+            time.sleep(0.5)
 
         except Exception as e:
             print(f"⚠️ Login attempt error: {e}")
@@ -406,6 +324,19 @@ def twitter_login(driver, timeout_seconds=60):
     return False
 
 
+def recover_login(driver, url=None):
+    """After a redirect to the login flow: drop the stale verdict, log in again and reload url"""
+    print("🔐 Redirected to the login page; session expired, logging in again...")
+    forget_login(driver)
+    if not twitter_login(driver):
+        print("❌ Re-login failed")
+        return False
+    if url:
+        driver.get(url)
+        time.sleep(3)
+    return True
+
+
 def get_unique_filename(keywords, handles):
     content = f"{keywords}_{handles}_{time.time()}"
     hash_id = hashlib.md5(content.encode()).hexdigest()[:8]
@@ -414,360 +345,396 @@ def get_unique_filename(keywords, handles):
     return f"tweets_output_{clean_keywords}_{timestamp}_{hash_id}.md"
 
 
-def extract_media_from_tweet(tweet_element):
-    media_data = {'images': [], 'videos': []}
+def append_tweets_to_file(tweets, keyword, handle=None, file_name="tweets_output.md"):
     try:
-        image_selectors = [
-            'img[src*="pbs.twimg.com"]',
-            'img[alt*="Image"]',
-            'img[data-testid="tweetPhoto"]',
-            'div[data-testid="tweetPhoto"] img',
-            'img[src*="media"]'
-        ]
-        for selector in image_selectors:
-            try:
-                img_elements = tweet_element.find_elements(By.CSS_SELECTOR, selector)
-                for img in img_elements:
-                    src = img.get_attribute('src')
-                    alt = img.get_attribute('alt') or ''
-                    if src and 'pbs.twimg.com' in src and src not in [i['url'] for i in media_data['images']]:
-                        media_data['images'].append({'url': src, 'alt': alt, 'type': 'image'})
-            except:
-                continue
-
-        video_selectors = [
-            'video[src]',
-            'video source[src]',
-            'div[data-testid="videoPlayer"] video',
-            'div[data-testid="videoPlayer"] source',
-            'video[poster]'
-        ]
-        for selector in video_selectors:
-            try:
-                video_elements = tweet_element.find_elements(By.CSS_SELECTOR, selector)
-                for video in video_elements:
-                    src = video.get_attribute('src')
-                    poster = video.get_attribute('poster')
-                    if src and src not in [v['url'] for v in media_data['videos']]:
-                        media_data['videos'].append({'url': src, 'poster': poster, 'type': 'video'})
-                    elif poster and poster not in [v.get('poster') for v in media_data['videos']]:
-                        media_data['videos'].append({'url': poster, 'poster': poster, 'type': 'video'})
-            except:
-                continue
+        # Ensure the output directory exists
+        pathlib.Path(OUTPUT_DIR).mkdir(parents=True, exist_ok=True)
+        file_path = os.path.join(OUTPUT_DIR, file_name)
+        
+        # Numbering continues from the rotation manifest instead of rescanning the file;
+        # the active file may be sealed into a compressed segment here first
+        with file_lock(file_path):
+            existing_tweet_count = reserve_tweet_numbers(file_path, len(tweets)) - 1
+            with open(file_path, 'a', encoding='utf-8') as f:
+                for i, tweet in enumerate(tweets, existing_tweet_count + 1):
+                    f.write(f"## Tweet {i}\n")
+                    f.write(f"**Author:** {tweet['author']}\n")
+                    f.write(f"**Time:** {tweet['timestamp']}\n")
+                    f.write(f"**Text:** {tweet['text']}\n")
+                    f.write(f"**Keyword:** {keyword}\n")
+                    if tweet.get('duplicate_count', 1) > 1:
+                        f.write(f"**Duplicates:** {tweet['duplicate_count']}\n")
+                    if tweet.get('matched_keywords'):
+                        f.write(f"**Matched Keywords:** {', '.join(tweet['matched_keywords'])}\n")
+                    if tweet.get('districts'):
+                        f.write(f"**Districts:** {', '.join(tweet['districts'])}\n")
+                    if handle:
+                        f.write(f"**Handle:** {handle}\n")
+                    prescore = tweet.get('prescore')
+                    if prescore:
+                        f.write(f"**Pre-score:** {prescore['label']} ({prescore['score']:+.2f},"
+                                f" confidence {prescore['confidence']:.2f})\n")
+                        f.write(f"**Triage:** {prescore['triage']}\n")
+                        if prescore['risk_level']:
+                            f.write(f"**Risk:** {prescore['risk_level']} ({', '.join(prescore['risk_categories'])})\n")
+                    if 'media' in tweet and tweet['media']:
+                        media = tweet['media']
+                        if media['images']:
+                            f.write(f"**Images:** {len(media['images'])} found\n")
+                            for j, img in enumerate(media['images'], 1):
+                                f.write(f"  - Image {j}: {img['url']}\n")
+                        if media['videos']:
+                            f.write(f"**Videos:** {len(media['videos'])} found\n")
+                            for j, vid in enumerate(media['videos'], 1):
+                                f.write(f"  - Video {j}: {vid['url']}\n")
+                    f.write("\n")
+        print(f"💾 Appended {len(tweets)} tweets to {file_name} (starting from Tweet {existing_tweet_count + 1})")
+    except Exception as e:
+        print(f"❌ Error appending tweets to file: {e}")
 
-        embed_selectors = [
-            'iframe[src*="youtube"]',
-            'iframe[src*="vimeo"]',
-            'iframe[src*="twitch"]'
-        ]
-        for selector in embed_selectors:
-            try:
-                embed_elements = tweet_element.find_elements(By.CSS_SELECTOR, selector)
-                for embed in embed_elements:
-                    src = embed.get_attribute('src')
-                    if src and src not in [v['url'] for v in media_data['videos']]:
-                        media_data['videos'].append({'url': src, 'poster': None, 'type': 'embed'})
-            except:
-                continue
 
-    except Exception as e:
-        print(f"⚠️ Error extracting media: {e}")
-    return media_data
+def output_file_name(keyword):
+    """tweets_output_<keyword>.md; namespaced keys such as district:<id> become district_<id>"""
+    return f"tweets_output_{keyword.replace(':', '_')}.md"
 
 
-def search_and_scrape_tweets(driver, keyword, handle=None, max_scroll_attempts=10):
-    try:
-        if handle:
-            search_url = f"https://twitter.com/search?q=from:{handle}%20{keyword}&src=typed_query&f=live"
+def persist_tweets(tweets, keyword, handle=None, file_name=None):
+    """Pre-score a batch, write it to the keyword's Markdown file (and SQLite when enabled), then publish it to subscribers"""
+    if lexicon_scorer:
+        try:
+            triage = lexicon_scorer.score_tweets(tweets)
+            print(f"🧮 Pre-scored {len(tweets)} tweets for {keyword}: " + ", ".join(f"{n} {t}" for t, n in sorted(triage.items())))
+        except Exception as e:
+            print(f"⚠️ Lexicon pre-scoring failed: {e}")
+    append_tweets_to_file(tweets, keyword, handle=handle, file_name=file_name or output_file_name(keyword))
+    with persist_lock:
+        if tweet_store:
+            try:
+                rows = tweet_store.insert_tweets(tweets, keyword, handle=handle)
+                print(f"🗄️ Stored {len(rows)} new tweets for {keyword} in SQLite ({len(tweets) - len(rows)} already present)")
+            except Exception as e:
+                print(f"❌ Error storing tweets in SQLite: {e}")
+                return
         else:
-            search_url = f"https://twitter.com/search?q={keyword}&src=typed_query&f=live"
-
-        print(f"🔍 Searching: {search_url}")
-        driver.get(search_url)
-        time.sleep(5)
+            scraped_at = time.time()
+            rows = [tweet_row(t, keyword, handle, scraped_at) for t in tweets]
+        change_feed.publish(rows)
+    heavy_hitters.add_tweets(keyword, rows)
+    with jobs_lock:
+        keyword_totals[keyword] = keyword_totals.get(keyword, 0) + len(tweets)
+    if media_fetcher:
+        media_fetcher.submit_tweets(tweets)
+
+
+def persist_duplicate_counts(recounted, keyword):
+    """Raise the stored counts of tweets from earlier batches that were repeated again (SQLite + feed)"""
+    if not recounted:
+        return
+    counts = [(tweet.get('tweet_id') or fallback_tweet_id(tweet), count) for tweet, count in recounted]
+    with persist_lock:
+        if tweet_store:
+            try:
+                tweet_store.update_duplicate_counts(keyword, counts)
+            except Exception as e:
+                print(f"❌ Error updating duplicate counts in SQLite: {e}")
+        change_feed.publish_counts(keyword, counts)
 
-        tweets = []
-        scroll_attempts = 0
 
-        while scroll_attempts < max_scroll_attempts:
-            try:
-                WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, "body")))
-
-                tweet_selectors = [
-                    'article[data-testid="tweet"]',
-                    '[data-testid="tweet"]',
-                    'article[role="article"]',
-                    'div[data-testid="tweet"]',
-                    'article'
-                ]
-                tweet_elements = []
-                for selector in tweet_selectors:
-                    try:
-                        elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                        if elements and len(elements) > 0:
-                            tweet_elements = elements
-                            print(f"✅ Found {len(elements)} elements with selector: {selector}")
-                            break
-                    except Exception as e:
-                        print(f"⚠️ Selector {selector} failed: {e}")
-                        continue
+def high_water_key(keyword, handle=None):
+    return f"{keyword} from:{handle}" if handle else keyword
 
-                if not tweet_elements:
-                    print(f"⚠️ No tweets found with any selector, trying scroll {scroll_attempts + 1}")
-                    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                    time.sleep(3)
-                    scroll_attempts += 1
-                    continue
 
-                new_tweets_found = 0
-                for element in tweet_elements:
-                    try:
-                        author_selectors = [
-                            '[data-testid="User-Name"] span',
-                            '[data-testid="User-Name"] a',
-                            'a[role="link"] span',
-                            'a[href*="/"] span',
-                            'div[dir="ltr"] span'
-                        ]
-                        author = "Unknown"
-                        for selector in author_selectors:
-                            try:
-                                author_elem = element.find_elements(By.CSS_SELECTOR, selector)
-                                if author_elem and author_elem[0].text.strip():
-                                    author = author_elem[0].text.strip()
-                                    break
-                            except:
-                                continue
+def job_active(job):
+    """True while the server runs and the job has not been asked to stop"""
+    return is_running and not (job and job['stop_event'].is_set())
 
-                        text_selectors = [
-                            '[data-testid="tweetText"]',
-                            '[lang]',
-                            'div[data-testid="tweetText"]',
-                            'div[dir="ltr"]',
-                            'span[lang]'
-                        ]
-                        text = ""
-                        for selector in text_selectors:
-                            try:
-                                text_elem = element.find_elements(By.CSS_SELECTOR, selector)
-                                if text_elem and text_elem[0].text.strip():
-                                    text = text_elem[0].text.strip()
-                                    break
-                            except:
-                                continue
 
-                        if text and author != "Unknown" and len(text) > 10:
-                            media_data = extract_media_from_tweet(element)
-                            tweet_data = {'author': author, 'text': text, 'timestamp': datetime.now().isoformat(), 'media': media_data}
-                            if not any(t['text'] == text for t in tweets):
-                                tweets.append(tweet_data)
-                                new_tweets_found += 1
-                                media_info = f" (📷 {len(media_data['images'])} images, 🎥 {len(media_data['videos'])} videos)" if media_data['images'] or media_data['videos'] else ""
-                                print(f"✅ Found tweet: {author} - {text[:50]}...{media_info}")
-                    except Exception as e:
-                        print(f"⚠️ Error extracting tweet: {e}")
-                        continue
+def job_wait(job, seconds):
+    """Sleep between cycles, waking early when the job is stopped"""
+    if job:
+        job['stop_event'].wait(seconds)
+    else:
+        time.sleep(seconds)
 
-                if new_tweets_found > 0:
-                    print(f"📊 Found {new_tweets_found} new tweets (total: {len(tweets)})")
-                else:
-                    print(f"⚠️ No new tweets found in this scroll (attempt {scroll_attempts + 1})")
 
-                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(3)
-                scroll_attempts += 1
+def cycle_units(job, all_units):
+    """Work units for the next cycle: the checkpointed leftovers on a resumed first cycle, else all of them"""
+    if not job:
+        return list(all_units)
+    with jobs_lock:
+        resumed = job.pop('resume_pending', None)
+        job['pending'] = list(resumed) if resumed else list(all_units)
+        units = list(job['pending'])
+    save_checkpoint()
+    return units
 
-                if tweets and scroll_attempts >= 3:
-                    print(f"📊 Found {len(tweets)} tweets total, continuing to scroll...")
 
-            except Exception as e:
-                print(f"⚠️ Error in scroll attempt {scroll_attempts + 1}: {e}")
-                scroll_attempts += 1
-                continue
+def add_units(job, units):
+    """Append work discovered mid-cycle (e.g. subdivided backfill windows) to the job's pending list"""
+    if not job or not units:
+        return
+    with jobs_lock:
+        job['pending'].extend(units)
+    save_checkpoint()
 
-        print(f"🎯 Scraping completed. Found {len(tweets)} tweets total.")
-        return tweets
 
+def unit_done(job, unit):
+    """Mark one search of the current cycle finished so a restart does not repeat it"""
+    if not job:
+        return
+    with jobs_lock:
+        if unit in job['pending']:
+            job['pending'].remove(unit)
+    save_checkpoint()
+
+
+def save_checkpoint(path=CHECKPOINT_PATH):
+    """Write running jobs, their unfinished searches and the high-water marks (atomic replace)"""
+    with jobs_lock:
+        state = {
+            'saved_at': datetime.now().isoformat(),
+            'jobs': [{
+                'mode': job['mode'],
+                'keywords': job['keywords'],
+                'handles': job['handles'],
+                'options': job['options'],
+                'pending': list(job.get('resume_pending') or job['pending']),
+                'interval_state': job['interval'].state() if job.get('interval') else job.get('resume_interval'),
+            } for job in scrape_jobs.values()],
+            'high_water': dict(high_water_marks),
+        }
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
     except Exception as e:
-        print(f"❌ Error in search_and_scrape_tweets: {e}")
-        return []
+        print(f"⚠️ Could not write checkpoint {path}: {e}")
 
 
-def append_tweets_to_file(tweets, keyword, handle=None, file_name="tweets_output.md"):
+def load_checkpoint(path=CHECKPOINT_PATH):
+    if not os.path.exists(path):
+        return None
     try:
-        # Ensure the output directory exists
-        pathlib.Path(OUTPUT_DIR).mkdir(parents=True, exist_ok=True)
-        file_path = os.path.join(OUTPUT_DIR, file_name)
-        
-        # Count existing tweets to continue sequential numbering
-        existing_tweet_count = 0
-        if os.path.exists(file_path):
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                # Count existing "## Tweet" headers
-                existing_tweet_count = content.count('## Tweet')
-        
-        with open(file_path, 'a', encoding='utf-8') as f:
-            for i, tweet in enumerate(tweets, existing_tweet_count + 1):
-                f.write(f"## Tweet {i}\n")
-                f.write(f"**Author:** {tweet['author']}\n")
-                f.write(f"**Time:** {tweet['timestamp']}\n")
-                f.write(f"**Text:** {tweet['text']}\n")
-                f.write(f"**Keyword:** {keyword}\n")
-                if handle:
-                    f.write(f"**Handle:** {handle}\n")
-                if 'media' in tweet and tweet['media']:
-                    media = tweet['media']
-                    if media['images']:
-                        f.write(f"**Images:** {len(media['images'])} found\n")
-                        for j, img in enumerate(media['images'], 1):
-                            f.write(f"  - Image {j}: {img['url']}\n")
-                    if media['videos']:
-                        f.write(f"**Videos:** {len(media['videos'])} found\n")
-                        for j, vid in enumerate(media['videos'], 1):
-                            f.write(f"  - Video {j}: {vid['url']}\n")
-                f.write("\n")
-        print(f"💾 Appended {len(tweets)} tweets to {file_name} (starting from Tweet {existing_tweet_count + 1})")
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
     except Exception as e:
-        print(f"❌ Error appending tweets to file: {e}")
+        print(f"⚠️ Ignoring unreadable checkpoint {path}: {e}")
+        return None
+
+
+def tweet_number(tweet):
+    """Numeric tweet ID (snowflake, increases with time) or 0 when unknown"""
+    tweet_id = tweet.get('tweet_id')
+    return int(tweet_id) if tweet_id and str(tweet_id).isdigit() else 0
+
+
+def begin_cycle(keys):
+    """Freeze each search's high-water mark; tweets at or below it were saved in an earlier cycle"""
+    with jobs_lock:
+        for key in keys:
+            cycle_floors[key] = high_water_marks.get(key, 0)
+
+
+def above_floor(tweets, key):
+    """Drop tweets already persisted before this cycle (or before a restart)"""
+    floor = cycle_floors.get(key, 0)
+    if not floor:
+        return tweets
+    return [t for t in tweets if not tweet_number(t) or tweet_number(t) > floor]
+
+
+def note_high_water(tweets, key):
+    newest = max((tweet_number(t) for t in tweets), default=0)
+    if newest:
+        with jobs_lock:
+            if newest > high_water_marks.get(key, 0):
+                high_water_marks[key] = newest
+
+
+def save_batch(tweet_data, keyword, handle=None, use_floor=True):
+    """
+    Dedup, tag and persist one scraped batch for a keyword.
+    Returns (tweets_saved, caught_up); caught_up means the batch reached tweets saved in an earlier cycle.
+    Backfill passes use_floor=False: its tweets are older than the live high-water mark by design.
+    """
+    # Tweet records from scrape_tweet_batch are passed through as-is (no per-stage copies)
+    fresh = above_floor(tweet_data, high_water_key(keyword, handle)) if use_floor else tweet_data
+    caught_up = len(fresh) < len(tweet_data)
+    tweets, recounted = get_deduper(keyword).collapse(fresh)
+    keyword_matcher.tag(tweets)
+    if tweets:
+        persist_tweets(tweets, keyword, handle=handle)
+        note_high_water(tweets, high_water_key(keyword, handle))
+    persist_duplicate_counts(recounted, keyword)
+    return len(tweets), caught_up
+
+
+def build_keyword_search_url(keyword, handle=None):
+    if handle:
+        return f"https://twitter.com/search?q=from:{handle}%20{keyword}&src=typed_query&f=live"
+    return f"https://twitter.com/search?q={keyword}&src=typed_query&f=live"
 
 
 # Batch scraping function - saves tweets in batches of 5
-def scrape_tweets_in_batches(driver, keyword, handles=None, batch_size=5, max_batches=20):
-    """Scrape tweets in batches and save immediately"""
-    keyword_filename = f"tweets_output_{keyword}.md"
+def scrape_tweets_in_batches(driver, keyword, handles=None, batch_size=5, max_batches=20, job=None):
+    """
+    Scrape tweets in batches and save immediately.
+    With a job, each finished handle is checkpointed and an interrupted one stays pending.
+    """
     total_tweets_saved = 0
     
     try:
-        if handles:
-            for handle in handles:
+        for handle in (handles or [None]):
+            if not job_active(job):
+                break
+            if handle:
                 print(f"  -> Searching in handle: {handle}")
-                search_url = f"https://twitter.com/search?q=from:{handle}%20{keyword}&src=typed_query&f=live"
-                driver.get(search_url)
-                time.sleep(3)
-                
-                for batch_num in range(max_batches):
-                    tweet_data = scrape_tweet_batch(driver, batch_size)
-                    if tweet_data:
-                        # Convert tweet data to proper structure (maintaining original format)
-                        tweets = []
-                        for tweet_info in tweet_data:
-                            tweet_obj = {
-                                'author': tweet_info['author'],
-                                'timestamp': tweet_info['timestamp'],  # Use extracted timestamp
-                                'text': tweet_info['text'],
-                                'media': tweet_info['media']  # Use extracted media
-                            }
-                            tweets.append(tweet_obj)
-                        append_tweets_to_file(tweets, keyword, handle=handle, file_name=keyword_filename)
-                        total_tweets_saved += len(tweets)
-                        print(f"💾 Batch {batch_num + 1}: Saved {len(tweets)} tweets (total: {total_tweets_saved})")
-                        
-                        # Scroll for next batch
-                        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                        time.sleep(2)
-                    else:
-                        print(f"📊 No more tweets found in handle {handle}")
-                        break
-        else:
-            search_url = f"https://twitter.com/search?q={keyword}&src=typed_query&f=live"
+            search_url = build_keyword_search_url(keyword, handle)
             driver.get(search_url)
             time.sleep(3)
-            
+
+            interrupted = False
             for batch_num in range(max_batches):
-                tweet_data = scrape_tweet_batch(driver, batch_size)
+                if not job_active(job):
+                    interrupted = True
+                    break
+                tweet_data = scrape_tweet_batch(driver, batch_size, url=search_url)
                 if tweet_data:
-                    # Convert tweet data to proper structure (maintaining original format)
-                    tweets = []
-                    for tweet_info in tweet_data:
-                        tweet_obj = {
-                            'author': tweet_info['author'],
-                            'timestamp': tweet_info['timestamp'],  # Use extracted timestamp
-                            'text': tweet_info['text'],
-                            'media': tweet_info['media']  # Use extracted media
-                        }
-                        tweets.append(tweet_obj)
-                    append_tweets_to_file(tweets, keyword, file_name=keyword_filename)
-                    total_tweets_saved += len(tweets)
-                    print(f"💾 Batch {batch_num + 1}: Saved {len(tweets)} tweets (total: {total_tweets_saved})")
+                    saved, caught_up = save_batch(tweet_data, keyword, handle=handle)
+                    total_tweets_saved += saved
+                    print(f"💾 Batch {batch_num + 1}: Saved {saved} tweets (total: {total_tweets_saved})")
+                    if caught_up:
+                        print(f"📊 Reached tweets saved in an earlier cycle for {keyword}")
+                        break
                     
                     # Scroll for next batch
                     driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
                     time.sleep(2)
                 else:
-                    print(f"📊 No more tweets found for keyword {keyword}")
+                    print(f"📊 No more tweets found {f'in handle {handle}' if handle else f'for keyword {keyword}'}")
                     break
+            else:
+                # Every batch was new: more tweets arrived than one cycle can read
+                if job:
+                    job['overflowed'] = True
+
+            if not interrupted:
+                unit_done(job, handle)
                     
     except Exception as e:
         print(f"❌ Error in batch scraping for keyword {keyword}: {e}")
+    release_page(driver)
     
+    if job:
+        job['total_saved'] += total_tweets_saved
     return total_tweets_saved
 
+def scrape_planned_query(driver, plan, batch_size=5, max_batches=20, job=None):
+    """Run one combined query from the planner and file each tweet under every keyword it matches"""
+    totals = {keyword: 0 for keyword in plan['keywords']}
+    search_url = build_search_url(plan['query'])
+    print(f"🔍 Searching (batched): {plan['query']}")
+    try:
+        driver.get(search_url)
+        time.sleep(3)
+
+        interrupted = False
+        for batch_num in range(max_batches):
+            if not job_active(job):
+                interrupted = True
+                break
+            tweet_data = scrape_tweet_batch(driver, batch_size, url=search_url)
+            if not tweet_data:
+                print(f"📊 No more tweets found for query {plan['query']}")
+                break
+
+            # Group by (keyword, handle) so each keyword file keeps its usual layout
+            grouped = {}
+            unmatched = 0
+            keyword_matcher.refresh()
+            for tweet_info in tweet_data:
+                matched_all = keyword_matcher.match(tweet_info['text'])
+                if plan.get('district_index'):
+                    # Geo plans file tweets under district keys instead of tracked keywords
+                    tweet_info.districts = districts_for(plan, plan['district_index'], tweet_info['text'])
+                    matched = [district_key(d) for d in tweet_info.districts]
+                else:
+                    matched_set = {normalize_text(k) for k in matched_all}
+                    matched = [k for k in plan['keywords'] if normalize_text(k) in matched_set]
+                if not matched and len(plan['keywords']) == 1 and not plan.get('strict'):
+                    matched = plan['keywords']
+                if not matched:
+                    unmatched += 1
+                    continue
+                handle = None
+                if plan['handles']:
+                    handle = plan['handles'][0] if len(plan['handles']) == 1 else match_handle(tweet_info['author'], plan['handles'])
+                # The same record is filed under every matched keyword
+                tweet_info.matched_keywords = matched_all
+                for keyword in matched:
+                    grouped.setdefault((keyword, handle), []).append(tweet_info)
+
+            for (keyword, handle), tweets in grouped.items():
+                tweets, recounted = get_deduper(keyword).collapse(above_floor(tweets, high_water_key(keyword, handle)))
+                if tweets:
+                    persist_tweets(tweets, keyword, handle=handle)
+                    note_high_water(tweets, high_water_key(keyword, handle))
+                persist_duplicate_counts(recounted, keyword)
+                totals[keyword] = totals.get(keyword, 0) + len(tweets)
+            print(f"💾 Batch {batch_num + 1}: Filed {len(tweet_data) - unmatched} tweets across {len(grouped)} keyword files ({unmatched} unmatched)")
+
+            # The query itself also has a high-water mark, so a cycle stops once it scrolls into
+            # results it read last time even when none of them matched a keyword
+            floor = cycle_floors.get(plan['query'], 0)
+            note_high_water(tweet_data, plan['query'])
+            if floor and any(0 < tweet_number(t) <= floor for t in tweet_data):
+                print(f"📊 Reached results read in an earlier cycle for query {plan['query']}")
+                break
+
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            time.sleep(2)
+
+        if not interrupted:
+            unit_done(job, plan['query'])
+
+    except Exception as e:
+        print(f"❌ Error in batched scraping for query {plan['query']}: {e}")
+    release_page(driver)
+
+    if job:
+        job['total_saved'] += sum(totals.values())
+    return totals
+
 # Helper function to scrape a single batch of tweets
-def scrape_tweet_batch(driver, batch_size):
-    """Scrape a single batch of tweets (up to batch_size) with complete data like original"""
+def scrape_tweet_batch(driver, batch_size, wait_seconds=10, url=None):
+    """
+    Scrape a single batch of tweets (up to batch_size) with complete data like original.
+    A search redirected to the login flow logs in again and reloads url before reading.
+    """
     tweets = []
     try:
-        # Wait for tweets to load
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'article[data-testid="tweet"]'))
-        )
-        
-        # Get tweet elements
-        tweet_elements = driver.find_elements(By.CSS_SELECTOR, 'article[data-testid="tweet"]')
+        if redirected_to_login(driver) and not recover_login(driver, url):
+            return tweets
+        # Wait for tweets to load; extracted ones are marked, so only unread articles count
+        tweet_elements = WebDriverWait(driver, wait_seconds).until(
+            lambda d: selector_cache.find(d, 'tweet', suffix=UNSCRAPED)[0]
+        )[:batch_size]
+        if payload_recorder:
+            payload_recorder.capture(driver, tweet_elements)
         
-        for i, tweet_element in enumerate(tweet_elements[:batch_size]):
+        for i, tweet_element in enumerate(tweet_elements):
             try:
-                # Extract tweet text
-                text_element = tweet_element.find_element(By.CSS_SELECTOR, '[data-testid="tweetText"]')
-                tweet_text = text_element.text.strip()
-                
-                # Extract author name
-                try:
-                    author_element = tweet_element.find_element(By.CSS_SELECTOR, '[data-testid="User-Name"]')
-                    author_name = author_element.text.strip()
-                except:
-                    author_name = 'Unknown'
-                
-                # Extract timestamp (ISO format like original)
-                try:
-                    time_element = tweet_element.find_element(By.CSS_SELECTOR, 'time')
-                    timestamp = time_element.get_attribute('datetime')
-                    if not timestamp:
-                        timestamp = datetime.now().isoformat()
-                except:
-                    timestamp = datetime.now().isoformat()
-                
-                # Extract media (images and videos)
-                media = {'images': [], 'videos': []}
-                try:
-                    # Look for images
-                    image_elements = tweet_element.find_elements(By.CSS_SELECTOR, '[data-testid="tweetPhoto"] img')
-                    for img in image_elements:
-                        img_url = img.get_attribute('src')
-                        if img_url:
-                            media['images'].append({'url': img_url})
-                    
-                    # Look for videos
-                    video_elements = tweet_element.find_elements(By.CSS_SELECTOR, 'video')
-                    for vid in video_elements:
-                        video_src = vid.get_attribute('src')
-                        if video_src:
-                            media['videos'].append({'url': video_src})
-                except:
-                    pass
-                
-                if tweet_text:
-                    tweets.append({
-                        'text': tweet_text,
-                        'author': author_name,
-                        'timestamp': timestamp,
-                        'media': media
-                    })
-                    
+                tweet = extract_tweet(tweet_element)
+                if tweet:
+                    tweets.append(tweet)
             except Exception as e:
                 print(f"⚠️ Error extracting tweet {i + 1}: {e}")
                 continue
+
+        prune_articles(driver, tweet_elements)
                 
     except Exception as e:
         print(f"❌ Error in scrape_tweet_batch: {e}")
@@ -775,7 +742,7 @@ def scrape_tweet_batch(driver, batch_size):
     return tweets
 
 # Continuous scraping thread for each keyword
-def continuous_scrape_keyword(keyword, handles=None, interval_minutes=5):
+def continuous_scrape_keyword(keyword, handles=None, interval_minutes=5, job=None):
     """Continuously scrape tweets for a keyword and append to file in batches"""
     global driver_instance
     if not driver_instance:
@@ -785,25 +752,470 @@ def continuous_scrape_keyword(keyword, handles=None, interval_minutes=5):
     keyword_filename = f"tweets_output_{keyword}.md"
     print(f"🔄 Starting continuous batch scraping for keyword: {keyword}")
     print(f"📁 Output file: {keyword_filename}")
-    print(f"⏰ Scraping interval: {interval_minutes} minutes")
     print(f"📦 Batch size: 5 tweets per save")
+
+    # Next-cycle delay follows the keyword's tweet velocity instead of a fixed interval
+    options = job['options'] if job else {}
+    controller = IntervalController(
+        interval_minutes,
+        min_minutes=options.get('min_interval_minutes') or ADAPTIVE_MIN_MINUTES,
+        max_minutes=options.get('max_interval_minutes') or ADAPTIVE_MAX_MINUTES,
+    ).restore(job.pop('resume_interval', None) if job else None)
+    if job:
+        job['interval'] = controller
+    print(f"⏰ Adaptive interval: {controller.min_minutes}-{controller.max_minutes} minutes (starting at {controller.interval:.1f})")
     
-    while is_running:
+    while job_active(job):
         try:
             print(f"🔍 Starting batch scraping for keyword: {keyword}")
+            units = cycle_units(job, handles or [None])
+            begin_cycle([high_water_key(keyword, handle) for handle in units])
+            if job:
+                job['overflowed'] = False
             
             # Use batch processing
-            total_saved = scrape_tweets_in_batches(driver_instance, keyword, handles, batch_size=5, max_batches=20)
+            with driver_lock:
+                total_saved = scrape_tweets_in_batches(driver_instance, keyword, units, batch_size=5, max_batches=20, job=job)
             print(f"✅ Completed batch scraping for {keyword}: {total_saved} tweets saved")
             
-            print(f"⏳ Waiting {interval_minutes} minutes before next scrape for keyword: {keyword}")
-            time.sleep(interval_minutes * 60)  # Convert minutes to seconds
+            wait_minutes = controller.observe(total_saved, overflowed=bool(job and job.get('overflowed')))
+            rate = f"{controller.rate:.2f} tweets/min" if controller.rate is not None else "no rate yet"
+            print(f"⏳ Waiting {wait_minutes:.1f} minutes ({rate}) before next scrape for keyword: {keyword}")
+            job_wait(job, wait_minutes * 60)  # Convert minutes to seconds
             
         except Exception as e:
             print(f"❌ Error in continuous scraping for keyword {keyword}: {e}")
-            time.sleep(60)  # Wait 1 minute before retrying
+            job_wait(job, 60)  # Wait 1 minute before retrying
+
+# Continuous scraping thread for a group of keywords sharing combined queries
+def continuous_scrape_planned(keywords, handles=None, interval_minutes=5, job=None, handle_centric=False,
+                              districts=None, radius_km=GEO_RADIUS_KM, use_geocode=True):
+    """
+    Continuously scrape several keywords through OR-combined queries.
+    handle_centric: one from:<handle> search per handle instead, with keywords matched locally.
+    districts: geo mode; keywords are district IDs, searched by packed aliases plus one geocode: per district.
+    """
+    global driver_instance
+    if not driver_instance:
+        print(f"❌ No browser instance available for keywords: {keywords}")
+        return
+
+    if districts:
+        index = DistrictIndex(districts)
+        plans = plan_district_queries(districts, radius_km, use_geocode)
+        for plan in plans:
+            plan['district_index'] = index
+        print(f"🗺️ Starting district scraping for {len(districts)} districts in {len(plans)} queries per cycle")
+    elif handle_centric:
+        plans = plan_handle_queries(keywords, handles)
+        print(f"🔄 Starting handle-centric scraping for {len(keywords)} keywords across {len(plans)} handles per cycle")
+    else:
+        plans = plan_queries(keywords, handles)
+        print(f"🔄 Starting batched scraping for {len(keywords)} keywords in {len(plans)} queries per cycle")
+    floor_keys = {high_water_key(k, h) for plan in plans for k in plan['keywords'] for h in plan['handles'] + [None]}
+
+    while job_active(job):
+        try:
+            queries = set(cycle_units(job, [plan['query'] for plan in plans]))
+            begin_cycle(list(floor_keys) + list(queries))
+            cycle_totals = {}
+            for plan in plans:
+                if plan['query'] not in queries or not job_active(job):
+                    continue
+                with driver_lock:
+                    plan_totals = scrape_planned_query(driver_instance, plan, batch_size=5, max_batches=20, job=job)
+                for keyword, count in plan_totals.items():
+                    cycle_totals[keyword] = cycle_totals.get(keyword, 0) + count
+            print(f"✅ Completed batched cycle: {sum(cycle_totals.values())} tweets saved ({cycle_totals})")
+
+            print(f"⏳ Waiting {interval_minutes} minutes before next batched scrape")
+            job_wait(job, interval_minutes * 60)
+
+        except Exception as e:
+            print(f"❌ Error in batched continuous scraping: {e}")
+            job_wait(job, 60)
+
+class TabSlot:
+    """One browser tab working through a (keyword, handle[, since, until]) search"""
+
+    def __init__(self, window_handle):
+        self.window_handle = window_handle
+        self.task = None
+        self.url = None  # search URL of the current task
+        self.deadline = 0  # give up waiting for (more) results after this
+        self.batches = 0
+        self.saved = 0
+        self.oldest = None  # oldest tweet timestamp seen in the current search
 
-def process_scraping_request(keywords, handles):
+
+def open_tabs(driver, count, urls=()):
+    """
+    Open `count` extra tabs, the first ones loading urls, and return their window handles;
+    the caller's window stays current. Drivers with open_pages (CDP backend) load them all at once.
+    """
+    urls = list(urls) + ["about:blank"] * (count - len(urls))
+    if hasattr(driver, 'open_pages'):
+        return driver.open_pages(urls)
+    home = driver.current_window_handle
+    handles = []
+    for url in urls:
+        driver.switch_to.new_window('tab')
+        if url != "about:blank":
+            driver.execute_script("window.location.href = arguments[0];", url)
+        handles.append(driver.current_window_handle)
+    driver.switch_to.window(home)
+    return handles
+
+
+def close_tabs(driver, window_handles):
+    home = driver.current_window_handle
+    for handle in window_handles:
+        if handle == home:
+            continue
+        try:
+            driver.switch_to.window(handle)
+            driver.close()
+        except Exception:
+            pass
+    driver.switch_to.window(home)
+
+
+def scrape_tasks_in_tabs(driver, tasks, tab_count, batch_size=5, max_batches=20, load_timeout=20, scroll_timeout=10,
+                         job=None, url_for=None, use_floor=True, on_exhausted=None):
+    """
+    Run (keyword, handle) searches concurrently in tab_count tabs of one browser.
+    Searches start loading in the background (non-blocking location change) and
+    extraction round-robins across tabs, so page loads overlap instead of queueing.
+    url_for(task) overrides the search URL; on_exhausted(task, oldest_timestamp) is called
+    when a search still had results after max_batches and returns follow-up tasks.
+    A tab whose search shows no unread tweets load_timeout seconds after loading (or
+    scroll_timeout seconds after a scroll) counts as finished.
+    Returns {keyword: tweets_saved}.
+    """
+    pending = list(tasks)
+    totals = {}
+
+    def assign(slot, task):
+        slot.task = task
+        slot.batches = slot.saved = 0
+        slot.oldest = None
+        if task:
+            slot.url = url_for(task) if url_for else build_keyword_search_url(*task[:2])
+            slot.deadline = time.time() + load_timeout
+
+    print(f"🗂️ Tab mode: {len(pending)} searches across "
+          f"{tab_count if on_exhausted else min(tab_count, len(pending))} tabs")
+    with driver_lock:
+        home = driver.current_window_handle
+        # Tasks that spawn follow-ups (backfill) may need every tab even if they start with fewer
+        first, pending = pending[:tab_count], pending[tab_count:]
+        slots = [TabSlot(None) for _ in range(tab_count if on_exhausted else len(first))]
+        for slot, task in zip(slots, first):
+            assign(slot, task)
+        # The first searches start loading as their tabs open
+        for slot, handle in zip(slots, open_tabs(driver, len(slots), [slot.url for slot in slots if slot.task])):
+            slot.window_handle = handle
+            if slot.task:
+                slot.deadline = time.time() + load_timeout
+
+    def start_next(slot):
+        assign(slot, pending.pop(0) if pending else None)
+        if slot.task:
+            driver.switch_to.window(slot.window_handle)
+            driver.execute_script("window.location.href = arguments[0];", slot.url)
+        else:
+            # Nothing left for this tab; stop the finished search page from growing while others work
+            driver.switch_to.window(slot.window_handle)
+            driver.execute_script("window.location.href = 'about:blank';")
+
+    def finish(slot, exhausted=False):
+        if exhausted and on_exhausted:
+            # Queue the follow-ups before marking the task done so a checkpoint never loses them
+            pending.extend(on_exhausted(slot.task, slot.oldest))
+        unit_done(job, slot.task)
+        start_next(slot)
+
+    try:
+        while job_active(job) and (pending or any(slot.task for slot in slots)):
+            for slot in slots:
+                if not slot.task and pending and job_active(job):
+                    with driver_lock:
+                        start_next(slot)  # idle tab picks up follow-up work
+                        driver.switch_to.window(home)
+                    continue
+                if not slot.task or not job_active(job):
+                    continue
+                keyword, handle = slot.task[:2]
+                with driver_lock:
+                    try:
+                        driver.switch_to.window(slot.window_handle)
+                        if redirected_to_login(driver):
+                            if not recover_login(driver, slot.url):
+                                finish(slot)
+                                continue
+                            slot.deadline = time.time() + load_timeout
+                        if not selector_cache.find(driver, 'tweet', suffix=UNSCRAPED)[0]:
+                            if time.time() < slot.deadline:
+                                continue  # still loading in the background; visit the next tab
+                            tweet_data = []
+                        else:
+                            tweet_data = scrape_tweet_batch(driver, batch_size, wait_seconds=0)
+                        caught_up = False
+                        if tweet_data:
+                            saved, caught_up = save_batch(tweet_data, keyword, handle=handle, use_floor=use_floor)
+                            slot.saved += saved
+                            slot.batches += 1
+                            totals[keyword] = totals.get(keyword, 0) + saved
+                            stamps = [t.timestamp for t in tweet_data if t.timestamp]
+                            if stamps:
+                                slot.oldest = min([slot.oldest] + stamps) if slot.oldest else min(stamps)
+                            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                            slot.deadline = time.time() + scroll_timeout
+                        if not tweet_data or caught_up or slot.batches >= max_batches:
+                            print(f"✅ Tab finished {' '.join(str(part) for part in slot.task if part)}: {slot.saved} tweets")
+                            finish(slot, exhausted=bool(tweet_data) and not caught_up)
+                    except Exception as e:
+                        print(f"⚠️ Tab error for {keyword}: {e}")
+                        finish(slot)
+                    finally:
+                        try:
+                            driver.switch_to.window(home)
+                        except Exception:
+                            pass
+            # Give the background tabs time to render the next page of results
+            time.sleep(1)
+    finally:
+        with driver_lock:
+            close_tabs(driver, [slot.window_handle for slot in slots])
+    if job:
+        job['total_saved'] += sum(totals.values())
+    return totals
+
+
+# Continuous scraping thread that shares one browser across several tabs
+def continuous_scrape_tabs(keywords, handles=None, tab_count=SCRAPER_TABS, interval_minutes=5, job=None):
+    """Continuously scrape all keywords with concurrent searches in tabs of the shared browser"""
+    global driver_instance
+    if not driver_instance:
+        print(f"❌ No browser instance available for keywords: {keywords}")
+        return
+
+    # Lists rather than tuples so pending tasks round-trip through the JSON checkpoint
+    tasks = [[keyword, handle] for keyword in keywords for handle in (handles or [None])]
+    print(f"🔄 Starting tab-mode scraping for {len(keywords)} keywords with {tab_count} tabs")
+
+    while job_active(job):
+        try:
+            units = cycle_units(job, tasks)
+            begin_cycle([high_water_key(keyword, handle) for keyword, handle in units])
+            totals = scrape_tasks_in_tabs(driver_instance, units, tab_count, batch_size=5, max_batches=20, job=job)
+            print(f"✅ Completed tab-mode cycle: {sum(totals.values())} tweets saved ({totals})")
+
+            print(f"⏳ Waiting {interval_minutes} minutes before next tab-mode scrape")
+            job_wait(job, interval_minutes * 60)
+
+        except Exception as e:
+            print(f"❌ Error in tab-mode continuous scraping: {e}")
+            job_wait(job, 60)
+
+
+# Historical backfill: since:/until: windows searched in parallel tabs, run once
+def run_backfill(keywords, handles=None, since=None, until=None, window_hours=BACKFILL_WINDOW_HOURS,
+                 tab_count=SCRAPER_TABS, job=None):
+    """Load [since, until) for each keyword window by window; dense windows are subdivided"""
+    global driver_instance
+    if not driver_instance:
+        print(f"❌ No browser instance available for backfill: {keywords}")
+        return
+
+    windows = plan_windows(since, until, window_hours)
+    tasks = [[keyword, handle, start, end] for start, end in windows
+             for keyword in keywords for handle in (handles or [None])]
+    units = cycle_units(job, tasks)
+    print(f"⏮️ Backfill {since} -> {until}: {len(units)} windows across {tab_count} tabs")
+
+    def url_for(task):
+        return build_search_url(backfill_query(*task))
+
+    def on_exhausted(task, oldest):
+        keyword, handle, start, end = task
+        parts = [[keyword, handle, s, e] for s, e in split_window(start, end, oldest)]
+        if parts:
+            print(f"🔪 Window {start} -> {end} for {keyword} too dense; split unread part into {len(parts)}")
+        elif job:
+            print(f"⚠️ Window {start} -> {end} for {keyword} is at the minimum size; older results skipped")
+        add_units(job, parts)
+        return parts
+
+    totals = scrape_tasks_in_tabs(driver_instance, units, tab_count, batch_size=5, max_batches=BACKFILL_MAX_BATCHES,
+                                  job=job, url_for=url_for, use_floor=False, on_exhausted=on_exhausted)
+    print(f"✅ Backfill pass finished: {sum(totals.values())} tweets saved ({totals})")
+
+    if job and job_active(job):
+        with jobs_lock:
+            remaining = list(job['pending'])
+        if not remaining:
+            # Nothing left to resume; drop the finished job from the registry and checkpoint
+            remove_job(job)
+            save_checkpoint()
+
+
+def job_id_for(mode, keywords):
+    return keywords[0] if mode == 'keyword' else f"{mode}:{','.join(keywords)}"
+
+
+def run_job(job):
+    options = job['options']
+    try:
+        if job['mode'] == 'districts':
+            wanted = {district_id_of(k) for k in job['keywords']}
+            districts = [d for d in load_districts(options.get('districts_path') or DISTRICTS_PATH) if d['id'] in wanted]
+            continuous_scrape_planned(job['keywords'], None, options.get('interval_minutes', 5), job=job, districts=districts,
+                                      radius_km=options.get('radius_km', GEO_RADIUS_KM),
+                                      use_geocode=options.get('use_geocode', True))
+        elif job['mode'] == 'backfill':
+            run_backfill(job['keywords'], job['handles'], options['since'], options['until'],
+                         options.get('window_hours', BACKFILL_WINDOW_HOURS), options.get('tab_count', SCRAPER_TABS), job=job)
+        elif job['mode'] == 'tabs':
+            continuous_scrape_tabs(job['keywords'], job['handles'], options.get('tab_count', SCRAPER_TABS),
+                                   options.get('interval_minutes', 5), job=job)
+        elif job['mode'] in ('planned', 'handles'):
+            continuous_scrape_planned(job['keywords'], job['handles'], options.get('interval_minutes', 5), job=job,
+                                      handle_centric=job['mode'] == 'handles')
+        else:
+            continuous_scrape_keyword(job['keywords'][0], job['handles'], options.get('interval_minutes', 5), job=job)
+    finally:
+        print(f"🏁 Job {job['id']} stopped ({job['total_saved']} tweets saved)")
+
+
+def start_job(mode, keywords, handles=None, options=None, pending=None, interval_state=None):
+    """Start a continuous scraping thread, or return the live job already covering the same keywords"""
+    job_id = job_id_for(mode, keywords)
+    with jobs_lock:
+        existing = scrape_jobs.get(job_id)
+        if existing and existing['thread'].is_alive():
+            return existing
+        job = {
+            'id': job_id,
+            'mode': mode,
+            'keywords': list(keywords),
+            'handles': list(handles or []),
+            'options': dict(options or {}),
+            'pending': [],
+            'resume_pending': pending,
+            'resume_interval': interval_state,
+            'stop_event': threading.Event(),
+            'total_saved': 0,
+        }
+        job['thread'] = threading.Thread(target=run_job, args=(job,), daemon=True)
+        scrape_jobs[job_id] = job
+        for keyword in job['keywords']:
+            jobs_by_keyword.setdefault(keyword, set()).add(job_id)
+    job['thread'].start()
+    return job
+
+
+def remove_job(job):
+    """Drop a job from the registry (and the checkpoint) and signal its thread to stop"""
+    with jobs_lock:
+        if scrape_jobs.get(job['id']) is job:
+            del scrape_jobs[job['id']]
+        for keyword in job['keywords']:
+            ids = jobs_by_keyword.get(keyword)
+            if ids:
+                ids.discard(job['id'])
+                if not ids:
+                    del jobs_by_keyword[keyword]
+    job['stop_event'].set()
+
+
+def pending_tasks_for(job, keywords):
+    """
+    The job's unfinished [keyword, handle, ...] tasks (tab and backfill modes) for the given keywords.
+    Query-based modes replan their queries for a new keyword set, so their pending queries don't carry over.
+    """
+    if job['mode'] not in ('tabs', 'backfill'):
+        return []
+    keep = set(keywords)
+    with jobs_lock:
+        pending = list(job.get('resume_pending') or job['pending'])
+    return [task for task in pending if task[0] in keep]
+
+
+def stop_keywords(keywords, wait_seconds=5):
+    """
+    Cancel scraping for the named keywords. Keyword jobs are stopped outright; a group job
+    (batched, tab or handle mode) is restarted without the stopped keywords; tab and backfill
+    jobs keep their unfinished searches for the remaining keywords.
+    Returns per-keyword final counts.
+    """
+    wanted = set(keywords)
+    stopped = []
+    not_found = []
+    stopping = {}  # job id -> job; a group job covering several stopped keywords is handled once
+    # Resolve every keyword before removing anything: remove_job unregisters a job for all its keywords
+    with jobs_lock:
+        for keyword in dict.fromkeys(keywords):
+            jobs = [scrape_jobs[job_id] for job_id in jobs_by_keyword.get(keyword, ()) if job_id in scrape_jobs]
+            if not jobs:
+                not_found.append(keyword)
+                continue
+            stopped.append(keyword)
+            for job in jobs:
+                stopping[job['id']] = job
+    stopping = list(stopping.values())
+    for job in stopping:
+        remove_job(job)
+        remaining = [k for k in job['keywords'] if k not in wanted]
+        if job['mode'] == 'keyword' or not remaining:
+            continue
+        pending = pending_tasks_for(job, remaining)
+        if job['mode'] == 'backfill' and not pending:
+            continue  # every window of the remaining keywords is already done
+        start_job(job['mode'], remaining, job['handles'], job['options'], pending or None)
+
+    # Let the threads finish the batch they are writing so the counts are final
+    deadline = time.time() + wait_seconds
+    for job in stopping:
+        job['thread'].join(max(0, deadline - time.time()))
+    save_checkpoint()
+
+    with jobs_lock:
+        results = [{
+            'keyword': keyword,
+            'tweets_saved': keyword_totals.get(keyword, 0),
+        } for keyword in stopped]
+    for job in stopping:
+        print(f"🛑 Stopped job {job['id']} ({job['total_saved']} tweets saved)")
+    return {
+        'success': True,
+        'stopped': results,
+        'not_found': not_found,
+        'still_finishing': sorted({job['id'] for job in stopping if job['thread'].is_alive()}),
+    }
+
+
+def resume_from_checkpoint():
+    """Restart the jobs recorded at the last shutdown, picking up their unfinished searches first"""
+    checkpoint = load_checkpoint()
+    if not checkpoint:
+        return 0
+    with jobs_lock:
+        for key, mark in (checkpoint.get('high_water') or {}).items():
+            high_water_marks[key] = max(mark, high_water_marks.get(key, 0))
+    for saved in checkpoint.get('jobs', []):
+        if saved['mode'] == 'districts':
+            # Older checkpoints registered districts under their bare IDs
+            saved['keywords'] = [district_key(district_id_of(k)) for k in saved['keywords']]
+        start_job(saved['mode'], saved['keywords'], saved.get('handles'), saved.get('options'), saved.get('pending'),
+                  saved.get('interval_state'))
+    if checkpoint.get('jobs'):
+        print(f"♻️ Resumed {len(checkpoint['jobs'])} scraping jobs from checkpoint saved at {checkpoint.get('saved_at')}")
+    return len(checkpoint.get('jobs', []))
+
+
+def process_scraping_request(keywords, handles, batch_queries=False, tabs=None, min_interval=None, max_interval=None,
+                             handle_mode=False):
     global driver_instance
     if not driver_instance:
         print("❌ No browser instance available")
@@ -815,26 +1227,44 @@ def process_scraping_request(keywords, handles):
         total_tweets = 0
         processed_keywords = []
         skipped_keywords = []
-        
+
+        if tabs:
+            # One thread driving several tabs of the shared browser
+            tab_count = SCRAPER_TABS if tabs is True else int(tabs)
+            start_job('tabs', keywords, handles, {'tab_count': tab_count, 'interval_minutes': 5})
+            processed_keywords = list(keywords)
+            print(f"✅ Tab-mode continuous scraping started for {len(keywords)} keywords")
+            keywords = []
+
+        elif handle_mode and handles:
+            # One thread, one from:<handle> search per handle; page loads scale with handles, not handles x keywords
+            start_job('handles', keywords, handles, {'interval_minutes': 5})
+            processed_keywords = list(keywords)
+            print(f"✅ Handle-centric continuous scraping started for {len(handles)} handles, {len(keywords)} keywords")
+            keywords = []
+
+        elif batch_queries:
+            # One thread, a handful of OR-combined queries for all keywords
+            start_job('planned', keywords, handles, {'interval_minutes': 5})
+            processed_keywords = list(keywords)
+            print(f"✅ Batched continuous scraping started for {len(keywords)} keywords")
+            keywords = []
+
         for keyword in keywords:
             print(f"🔍 Starting continuous scraping for keyword: {keyword}")
             keyword_filename = f"tweets_output_{keyword}.md"
             print(f"📁 Using per-keyword file: {keyword_filename}")
             
-            # Start continuous scraping thread for this keyword
-            scrape_thread = threading.Thread(
-                target=continuous_scrape_keyword, 
-                args=(keyword, handles, 5),  # 5 minute interval
-                daemon=True
-            )
-            scrape_thread.start()
+            # Start continuous scraping thread for this keyword (5 minute first interval, then adaptive)
+            start_job('keyword', [keyword], handles, {'interval_minutes': 5, 'min_interval_minutes': min_interval,
+                                                      'max_interval_minutes': max_interval})
             
             processed_keywords.append(keyword)
             print(f"✅ Continuous scraping started for keyword: {keyword}")
         
         return {
             'success': True, 
-            'filename': f"continuous_scraping_{len(keywords)}_keywords", 
+            'filename': f"continuous_scraping_{len(processed_keywords)}_keywords", 
             'tweets_count': 0,  # Will be continuously updated
             'keywords': processed_keywords, 
             'skipped_keywords': skipped_keywords,
@@ -846,15 +1276,210 @@ def process_scraping_request(keywords, handles):
         return {'success': False, 'error': str(e)}
 
 
+def process_districts_request(district_ids=None, radius_km=None, use_geocode=True):
+    """Start (or return) the single batched job that scrapes every district in the district table"""
+    if not driver_instance:
+        print("❌ No browser instance available")
+        return None
+    try:
+        districts = load_districts()
+        if district_ids:
+            wanted = set(district_ids)
+            districts = [d for d in districts if d['id'] in wanted]
+        if not districts:
+            return {'success': False, 'error': 'No matching districts in the district table'}
+        ids = [d['id'] for d in districts]
+        options = {'interval_minutes': 5, 'radius_km': float(radius_km or GEO_RADIUS_KM), 'use_geocode': bool(use_geocode)}
+        job = start_job('districts', [district_key(i) for i in ids], None, options)
+        return {
+            'success': True,
+            'job': job['id'],
+            'districts': ids,
+            'message': f'District scraping started for {len(ids)} districts.'
+        }
+    except Exception as e:
+        print(f"❌ Error processing districts request: {e}")
+        return {'success': False, 'error': str(e)}
+
+
+def process_backfill_request(keywords, handles=None, since=None, until=None, days=7, window_hours=None, tabs=None):
+    """Start a one-off backfill job for [since, until) (default: the last `days` days)"""
+    if not driver_instance:
+        print("❌ No browser instance available")
+        return None
+    try:
+        end = parse_time(until) if until else datetime.now(timezone.utc)
+        start = parse_time(since) if since else end - timedelta(days=float(days))
+        options = {
+            'since': format_time(start),
+            'until': format_time(end),
+            'window_hours': float(window_hours or BACKFILL_WINDOW_HOURS),
+            'tab_count': SCRAPER_TABS if tabs in (None, True) else int(tabs),
+        }
+        add_keywords_to_file(keywords)
+        job = start_job('backfill', keywords, handles, options)
+        return {
+            'success': True,
+            'job': job['id'],
+            'keywords': keywords,
+            'handles': handles,
+            'since': options['since'],
+            'until': options['until'],
+            'message': f"Backfill started for {len(keywords)} keywords from {options['since']} to {options['until']}."
+        }
+    except Exception as e:
+        print(f"❌ Error processing backfill request: {e}")
+        return {'success': False, 'error': str(e)}
+
+
+def stream_subscription(client_socket, request):
+    """Keep the connection open and stream newly persisted tweets as NDJSON"""
+    keywords = request.get('keywords') or None
+    sub = change_feed.subscribe(keywords=keywords, cursor=request.get('cursor'))
+    print(f"📡 Subscriber {sub.id} attached (keywords: {keywords or 'all'}, cursor: {sub.cursor})")
+
+    def send_line(message):
+        client_socket.sendall(encode_line(message))
+
+    try:
+        send_line({'success': True, 'type': 'subscribed', 'subscriber_id': sub.id, 'cursor': sub.cursor})
+        change_feed.stream(sub, send_line, lambda: is_running)
+    except (BrokenPipeError, ConnectionResetError, OSError):
+        pass
+    print(f"📴 Subscriber {sub.id} detached at cursor {sub.cursor}")
+
+
+def health_status():
+    return {
+        'success': True,
+        'status': 'running',
+        'browser_ready': driver_instance is not None,
+        'logged_in': driver_instance is not None,
+        'timestamp': datetime.now().isoformat(),
+        'uptime': time.time() - start_time if 'start_time' in globals() else 0
+    }
+
+
+def dispatch_request(request):
+    """Run one control request and return its reply dict (shared by one-shot and session connections)"""
+    result = run_action(request)
+    # scrape/districts/backfill return None when there is no browser to run the job on
+    return result if result is not None else {'success': False, 'error': 'No browser instance available'}
+
+
+def run_action(request):
+    """The handler result for one control request (None when no browser is available)"""
+    action = request.get('action')
+    if action == 'scrape':
+        keywords = request.get('keywords', [])
+        handles = request.get('handles', [])
+        return process_scraping_request(keywords, handles, batch_queries=request.get('batch_queries', False),
+                                        tabs=request.get('tabs'),
+                                        min_interval=request.get('min_interval_minutes'),
+                                        max_interval=request.get('max_interval_minutes'),
+                                        handle_mode=request.get('handle_mode', False))
+    if action == 'districts':
+        return process_districts_request(request.get('districts'), radius_km=request.get('radius_km'),
+                                         use_geocode=request.get('use_geocode', True))
+    if action == 'backfill':
+        return process_backfill_request(request.get('keywords', []), request.get('handles', []),
+                                        since=request.get('since'), until=request.get('until'),
+                                        days=request.get('days', 7), window_hours=request.get('window_hours'),
+                                        tabs=request.get('tabs'))
+    if action == 'stats':
+        keyword = request.get('keyword')
+        if keyword:
+            dimensions = [d for d in (request.get('dimensions') or DIMENSIONS) if d in DIMENSIONS]
+            return dict(heavy_hitters.top(keyword, window_minutes=float(request.get('window_minutes', 60)),
+                                          limit=int(request.get('limit', 10)), dimensions=dimensions),
+                        success=True)
+        return {'success': True, 'keywords': heavy_hitters.keywords()}
+    if action == 'stop':
+        return stop_keywords(request.get('keywords', []), wait_seconds=request.get('wait_seconds', 5))
+    if action == 'status' or action == 'health':
+        return health_status()
+    return {'success': False, 'error': 'Unknown action'}
+
+
+def serve_session(client_socket, address, first_line, buffered):
+    """
+    Persistent connection: NDJSON requests, each with an 'id', answered by NDJSON replies
+    carrying the same 'id'. Requests may be pipelined; up to SESSION_WORKERS run at once,
+    so replies can arrive out of order.
+    """
+    send_lock = threading.Lock()
+    executor = ThreadPoolExecutor(max_workers=SESSION_WORKERS, thread_name_prefix="session")
+    handled = 0
+
+    def reply(request_id, result):
+        line = encode_line(dict(result, id=request_id))
+        with send_lock:
+            client_socket.sendall(line)
+
+    def run(request):
+        try:
+            result = dispatch_request(request)
+        except Exception as e:
+            print(f"❌ Error handling {request.get('action')} for {address}: {e}")
+            result = {'success': False, 'error': str(e)}
+        try:
+            reply(request.get('id'), result)
+        except OSError:
+            pass  # client went away; the reader notices on its next recv
+        except Exception as e:
+            # An unserializable result must still answer the request, or the client waits for its timeout
+            print(f"❌ Error replying to {request.get('action')} for {address}: {e}")
+            try:
+                reply(request.get('id'), {'success': False, 'error': f'Could not encode reply: {e}'})
+            except Exception:
+                pass
+
+    def submit(line):
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError:
+            reply(None, {'success': False, 'error': 'Invalid JSON request'})
+            return
+        if not isinstance(request, dict):
+            reply(None, {'success': False, 'error': 'Invalid JSON request'})
+        elif request.get('action') == 'subscribe':
+            reply(request.get('id'), {'success': False, 'error': 'subscribe needs its own connection'})
+        else:
+            executor.submit(run, request)
+
+    print(f"🔗 Persistent session opened by {address}")
+    client_socket.settimeout(SESSION_IDLE_SECONDS)
+    try:
+        submit(first_line)
+        handled += 1
+        while is_running:
+            while b"\n" in buffered:
+                line, buffered = buffered.split(b"\n", 1)
+                if line.strip():
+                    submit(line.decode('utf-8'))
+                    handled += 1
+            chunk = client_socket.recv(65536)
+            if not chunk:
+                break
+            buffered += chunk
+    except socket.timeout:
+        print(f"⌛ Session {address} idle for {SESSION_IDLE_SECONDS}s, closing")
+    except OSError:
+        pass
+    finally:
+        executor.shutdown(wait=True)  # in-flight replies still go out before the socket closes
+    print(f"🔌 Session {address} closed after {handled} requests")
+
+
 def handle_client(client_socket, address):
     try:
         print(f"📞 New connection from {address}")
-        data = client_socket.recv(4096).decode('utf-8')
+        data = client_socket.recv(4096)
         if not data:
             return
         
         # Handle HTTP-style health check requests
-        if data.startswith('GET /health'):
+        if data.startswith(b'GET /health'):
             health_response = {
                 'status': 'OK',
                 'timestamp': datetime.now().isoformat(),
@@ -866,31 +1491,28 @@ def handle_client(client_socket, address):
             http_response = f"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: {len(json.dumps(health_response))}\r\n\r\n{json.dumps(health_response)}"
             client_socket.send(http_response.encode('utf-8'))
             return
-        
+
+        # A first request line carrying an 'id' opens a persistent session; anything else is one-shot
+        first_line, rest = data, b""
         try:
-            request = json.loads(data)
-        except json.JSONDecodeError:
-            response = {'success': False, 'error': 'Invalid JSON request'}
-            client_socket.send(json.dumps(response).encode('utf-8'))
+            request = json.loads(data.decode('utf-8'))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            # Several pipelined request lines in the first read
+            first_line, _, rest = data.partition(b"\n")
+            try:
+                request = json.loads(first_line.decode('utf-8'))
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                response = {'success': False, 'error': 'Invalid JSON request'}
+                client_socket.send(json.dumps(response).encode('utf-8'))
+                return
+        if isinstance(request, dict) and 'id' in request:
+            serve_session(client_socket, address, first_line.decode('utf-8'), rest)
             return
         print(f"📥 Received request: {request}")
-        if request.get('action') == 'scrape':
-            keywords = request.get('keywords', [])
-            handles = request.get('handles', [])
-            result = process_scraping_request(keywords, handles)
-            response = json.dumps(result)
-        elif request.get('action') == 'status' or request.get('action') == 'health':
-            health_data = {
-                'success': True, 
-                'status': 'running', 
-                'browser_ready': driver_instance is not None,
-                'logged_in': driver_instance is not None,
-                'timestamp': datetime.now().isoformat(),
-                'uptime': time.time() - start_time if 'start_time' in globals() else 0
-            }
-            response = json.dumps(health_data)
-        else:
-            response = json.dumps({'success': False, 'error': 'Unknown action'})
+        if request.get('action') == 'subscribe':
+            stream_subscription(client_socket, request)
+            return
+        response = json.dumps(dispatch_request(request), ensure_ascii=False)
         client_socket.send(response.encode('utf-8'))
         print(f"📤 Sent response: {response[:100]}...")
     except Exception as e:
@@ -905,9 +1527,14 @@ def handle_client(client_socket, address):
 
 
 def start_server(port=9999, headless=True):
-    global server_socket, is_running, driver_instance, start_time
+    global server_socket, is_running, driver_instance, start_time, tweet_store, media_fetcher, server_started, lexicon_scorer, payload_recorder
     start_time = time.time()
     try:
+        tweet_store = open_default_store()
+        change_feed.attach_store(tweet_store)
+        media_fetcher = open_default_fetcher()
+        lexicon_scorer = open_default_scorer()
+        payload_recorder = open_default_recorder()
         print("🚀 Setting up browser...")
         driver_instance = setup_driver(headless=headless)
         if not driver_instance:
@@ -926,6 +1553,8 @@ def start_server(port=9999, headless=True):
         server_socket.listen(5)
         is_running = True
         print(f"🌐 Scraper server started on port {port}")
+        resume_from_checkpoint()
+        server_started = True
         while is_running:
             try:
                 client_socket, address = server_socket.accept()
@@ -936,6 +1565,8 @@ def start_server(port=9999, headless=True):
                 print("\n🛑 Shutting down server...")
                 break
             except Exception as e:
+                if not is_running:
+                    break  # socket closed by request_shutdown()
                 print(f"❌ Server error: {e}")
                 continue
     except Exception as e:
@@ -944,9 +1575,49 @@ def start_server(port=9999, headless=True):
         cleanup()
 
 
+def request_shutdown(signum=None, frame=None):
+    """SIGTERM/SIGINT: stop accepting work and wake every job; cleanup() drains and checkpoints"""
+    global is_running
+    if signum is not None:
+        print(f"\n🛑 Received signal {signum}, shutting down...")
+    is_running = False
+    with jobs_lock:
+        jobs = list(scrape_jobs.values())
+    for job in jobs:
+        job['stop_event'].set()
+    if server_socket:
+        try:
+            server_socket.close()  # unblocks accept() in the main loop
+        except Exception:
+            pass
+
+
+def drain_jobs(timeout=SHUTDOWN_DRAIN_SECONDS):
+    """Wait for job threads to finish the batch they are writing"""
+    deadline = time.time() + timeout
+    with jobs_lock:
+        jobs = list(scrape_jobs.values())
+    for job in jobs:
+        job['stop_event'].set()
+    for job in jobs:
+        if job['thread'] is threading.current_thread():
+            continue
+        job['thread'].join(max(0, deadline - time.time()))
+        if job['thread'].is_alive():
+            print(f"⚠️ Job {job['id']} still running after {timeout}s; its current search stays pending")
+
+
 def cleanup():
-    global driver_instance, server_socket, is_running
+    global driver_instance, server_socket, is_running, tweet_store, media_fetcher, server_started
     is_running = False
+    drain_jobs()
+    if server_started:
+        save_checkpoint()
+        server_started = False
+        print(f"💾 Checkpoint written to {CHECKPOINT_PATH}")
+    if media_fetcher:
+        media_fetcher.shutdown()
+        media_fetcher = None
     if driver_instance:
         print("🔄 Closing browser...")
         try:
@@ -960,11 +1631,19 @@ def cleanup():
         except:
             pass
         server_socket = None
+    if tweet_store:
+        try:
+            tweet_store.close()
+        except:
+            pass
+        tweet_store = None
 
 
 if __name__ == "__main__":
     import atexit
+    import signal
     atexit.register(cleanup)
+    signal.signal(signal.SIGTERM, request_shutdown)
     port = int(sys.argv[1]) if len(sys.argv) > 1 else 9999
     # default to headless for production; use headless=False for the one-time manual login inside VNC
     start_server(port, headless=True)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Learned selector cache for tweet extraction
+- Each field has an ordered list of fallback CSS selectors
+- The learned selector of a field is tried first; the others only run when it misses
+- A higher-priority selector replaces the learned one at once, a lower-priority one only
+  after the learned selector missed RELEARN_AFTER_MISSES lookups in a row, so one odd
+  article cannot demote the field to a generic fallback that matches everywhere
+- While a fallback is learned, every PROBE_EVERY lookups start from the top of the
+  list again, so the precise selector is re-learned once it matches again
+- "Collect everything" lookups such as media run as one grouped CSS query
+  instead of one round trip per selector
+- Meant for a driver with implicitly_wait(0), where a miss costs one round trip
+  instead of the implicit-wait timeout
+"""
+
+import os
+import threading
+
+from selenium.webdriver.common.by import By
+
+RELEARN_AFTER_MISSES = int(os.environ.get("SCRAPER_SELECTOR_RELEARN_AFTER_MISSES", 5))
+PROBE_EVERY = int(os.environ.get("SCRAPER_SELECTOR_PROBE_EVERY", 50))
+
+FIELD_SELECTORS = {
+    'tweet': [
+        'article[data-testid="tweet"]',
+        '[data-testid="tweet"]',
+        'article[role="article"]',
+        'div[data-testid="tweet"]',
+        'article',
+    ],
+    'author': [
+        '[data-testid="User-Name"]',
+        '[data-testid="User-Name"] span',
+        '[data-testid="User-Name"] a',
+        'a[role="link"] span',
+        'a[href*="/"] span',
+        'div[dir="ltr"] span',
+    ],
+    # Only selectors specific to tweet text: media-only tweets must match none of them,
+    # or the author line would be read (and learned) as the text
+    'text': [
+        '[data-testid="tweetText"]',
+        'div[lang]',
+        'span[lang]',
+    ],
+    'time': [
+        'time[datetime]',
+    ],
+    'status': [
+        'a[href*="/status/"]',
+    ],
+}
+
+MEDIA_SELECTORS = {
+    'images': [
+        'img[src*="pbs.twimg.com"]',
+        'img[alt*="Image"]',
+        'img[data-testid="tweetPhoto"]',
+        'div[data-testid="tweetPhoto"] img',
+        'img[src*="media"]',
+    ],
+    'videos': [
+        'video[src]',
+        'video source[src]',
+        'div[data-testid="videoPlayer"] video',
+        'div[data-testid="videoPlayer"] source',
+        'video[poster]',
+    ],
+    'embeds': [
+        'iframe[src*="youtube"]',
+        'iframe[src*="vimeo"]',
+        'iframe[src*="twitch"]',
+    ],
+}
+
+
+def first_text(elements):
+    return elements[0].text.strip()
+
+
+class SelectorCache:
+    """Remembers the winning selector per field and tries it first"""
+
+    def __init__(self, field_selectors=FIELD_SELECTORS):
+        self.field_selectors = {field: list(selectors) for field, selectors in field_selectors.items()}
+        self.learned = {}
+        self.relearned = 0
+        self._misses = {}  # field -> lookups in a row a lower-priority selector matched instead
+        self._lookups = {}  # field -> lookups since a fallback was learned
+        self._lock = threading.Lock()
+
+    def order(self, field):
+        selectors = self.field_selectors[field]
+        learned = self.learned.get(field)
+        if not learned:
+            return selectors
+        if learned != selectors[0]:
+            with self._lock:
+                self._lookups[field] = self._lookups.get(field, 0) + 1
+                if self._lookups[field] % PROBE_EVERY == 0:
+                    return selectors  # retry the precise selectors now and then
+        return [learned] + [s for s in selectors if s != learned]
+
+    def find(self, root, field, extract=None, suffix=""):
+        """
+        (value, selector) for the first selector whose match gives a truthy value;
+        value is the element list, or extract(elements) when given. ([], None) if none match.
+        suffix is appended to every selector (e.g. to skip already-extracted nodes).
+        """
+        for selector in self.order(field):
+            try:
+                elements = root.find_elements(By.CSS_SELECTOR, selector + suffix)
+                value = extract(elements) if (extract and elements) else elements
+            except Exception:
+                continue
+            if value:
+                self._learn(field, selector)
+                return value, selector
+        return [], None
+
+    def text(self, root, field):
+        """Stripped text of the first element matched for field, or ''"""
+        value, _ = self.find(root, field, extract=first_text)
+        return value or ""
+
+    def _learn(self, field, selector):
+        with self._lock:
+            previous = self.learned.get(field)
+            if previous == selector:
+                self._misses[field] = 0
+                return
+            selectors = self.field_selectors[field]
+            if previous and selectors.index(selector) > selectors.index(previous):
+                # A fallback matched: keep the precise selector unless it keeps missing
+                self._misses[field] = self._misses.get(field, 0) + 1
+                if self._misses[field] < RELEARN_AFTER_MISSES:
+                    return
+            self.learned[field] = selector
+            self._misses[field] = 0
+            self._lookups[field] = 0
+            if previous:
+                self.relearned += 1
+                print(f"🔁 Selector for {field} changed: {previous} -> {selector}")
+
+
+def find_grouped(root, selectors):
+    """All elements matching any of selectors, in document order, in one round trip"""
+    return root.find_elements(By.CSS_SELECTOR, ", ".join(selectors))
@@ -1,48 +1,47 @@
 #!/usr/bin/env python3
 """
 Script to stop Python scraper for specific keywords
+Sends a 'stop' request to the running scraper_server.py, which cancels the
+keyword jobs and reports how many tweets each keyword saved.
 Usage: python stop_keyword_scraping.py <keyword1> <keyword2> ...
+Server address: SCRAPER_HOST / SCRAPER_PORT (default localhost:9999)
 """
 
 import sys
-import os
-import signal
-import psutil
+
+from scraper_client import get_client, ReplyTimeout, SCRAPER_HOST, SCRAPER_PORT
+
 
 def stop_scraping_for_keywords(keywords):
-    """Stop Python scraper processes for specific keywords"""
-    stopped_count = 0
-    
-    for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-        try:
-            # Check if it's a Python process running scraper_server.py
-            if proc.info['name'] == 'python' or proc.info['name'] == 'python3':
-                cmdline = ' '.join(proc.info['cmdline']) if proc.info['cmdline'] else ''
-                
-                # Check if it's running scraper_server.py
-                if 'scraper_server.py' in cmdline:
-                    # Check if any of the keywords are being processed
-                    for keyword in keywords:
-                        if keyword in cmdline:
-                            print(f"🛑 Stopping scraper process (PID: {proc.info['pid']}) for keyword: {keyword}")
-                            proc.terminate()
-                            stopped_count += 1
-                            break
-                            
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-            pass
-    
-    if stopped_count == 0:
-        print("❌ No scraper processes found for the specified keywords")
-    else:
-        print(f"✅ Stopped {stopped_count} scraper process(es)")
+    """Ask the scraper server to stop the jobs for specific keywords"""
+    try:
+        response = get_client().call('stop', keywords=keywords)
+    except (OSError, ReplyTimeout) as e:
+        print(f"❌ Could not reach scraper server at {SCRAPER_HOST}:{SCRAPER_PORT}: {e}")
+        return False
+
+    if not response.get('success'):
+        print(f"❌ Server refused stop request: {response.get('error')}")
+        return False
+
+    for entry in response.get('stopped', []):
+        print(f"🛑 Stopped scraping for keyword: {entry['keyword']} ({entry['tweets_saved']} tweets saved)")
+    for keyword in response.get('not_found', []):
+        print(f"❌ No scraping job found for keyword: {keyword}")
+    if response.get('still_finishing'):
+        print(f"⏳ Still finishing current batch: {', '.join(response['still_finishing'])}")
+
+    if response.get('stopped'):
+        print(f"✅ Stopped {len(response['stopped'])} keyword(s)")
+    return bool(response.get('stopped'))
+
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print("Usage: python stop_keyword_scraping.py <keyword1> <keyword2> ...")
         print("Example: python stop_keyword_scraping.py 'abhishek sharma' cricket")
         sys.exit(1)
-    
+
     keywords = sys.argv[1:]
     print(f"🛑 Stopping scraping for keywords: {', '.join(keywords)}")
-    stop_scraping_for_keywords(keywords)
+    sys.exit(0 if stop_scraping_for_keywords(keywords) else 1)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Field extraction for one tweet article element
+- Shared by the live batch scraper (Selenium/CDP elements) and the offline replay of
+  recorded payloads (html_snapshot elements), so both always run the same extractor
+- Only needs find_elements by CSS selector, .text and get_attribute on the element
+- Fields go through the learned selector cache (selector_cache), so each lookup tries the
+  selector that matched last time first; media is one grouped query per kind
+"""
+
+import re
+from datetime import datetime
+
+from media_resolver import MediaCollector
+from selector_cache import SelectorCache, MEDIA_SELECTORS, find_grouped
+from tweet_record import Tweet
+
+STATUS_ID_RE = re.compile(r"/status/(\d+)")
+
+# Learned per-field selectors, shared by every scraping thread (each replay worker has its own)
+selector_cache = SelectorCache()
+
+
+def first_status_id(links):
+    for link in links:
+        match = STATUS_ID_RE.search(link.get_attribute('href') or '')
+        if match:
+            return match.group(1)
+    return None
+
+
+def extract_tweet(tweet_element, selectors=selector_cache):
+    """Tweet for an article element, or None when no text selector finds any text"""
+    tweet_text = selectors.text(tweet_element, 'text')
+    if not tweet_text:
+        return None
+    author_name = selectors.text(tweet_element, 'author') or 'Unknown'
+
+    # Timestamp in ISO format; scrape time when the article has none
+    timestamp, _ = selectors.find(tweet_element, 'time', extract=lambda els: els[0].get_attribute('datetime'))
+    timestamp = timestamp or datetime.now().isoformat()
+
+    # Tweet ID from the status permalink
+    tweet_id, _ = selectors.find(tweet_element, 'status', extract=first_status_id)
+
+    # Media: one grouped query per kind; MediaCollector canonicalizes and drops repeats and avatars
+    collector = MediaCollector()
+    try:
+        for img in find_grouped(tweet_element, MEDIA_SELECTORS['images']):
+            collector.add_image(img.get_attribute('src'), img.get_attribute('alt'))
+        for video in find_grouped(tweet_element, MEDIA_SELECTORS['videos']):
+            collector.add_video(video.get_attribute('src'), video.get_attribute('poster'))
+        for embed in find_grouped(tweet_element, MEDIA_SELECTORS['embeds']):
+            collector.add_embed(embed.get_attribute('src'))
+    except Exception as e:
+        print(f"⚠️ Error extracting media: {e}")
+
+    return Tweet(author_name, timestamp, tweet_text, collector.result(), tweet_id or None)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Compact in-memory records for scraped tweets and their media
+- __slots__ classes instead of per-tweet dicts (no per-instance __dict__), so the
+  thousands of tweets held by dedupers across keywords cost far less memory
+- One Tweet object is created at extraction and handed through dedup, tagging,
+  the file/SQLite writers and the change feed without being copied
+- Records also answer record['field'] / record.get('field'), so code written
+  against the old dict shape keeps working; to_dict() gives the JSON shape
+"""
+
+
+class Record:
+    """Dict-style access over __slots__ fields"""
+
+    __slots__ = ()
+
+    def __getitem__(self, name):
+        if name not in self.__slots__:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def __setitem__(self, name, value):
+        if name not in self.__slots__:
+            raise KeyError(name)
+        setattr(self, name, value)
+
+    def __contains__(self, name):
+        return name in self.__slots__
+
+    def get(self, name, default=None):
+        if name not in self.__slots__:
+            return default
+        value = getattr(self, name)
+        return default if value is None else value
+
+
+class Media(Record):
+    """One image, video or embed attached to a tweet"""
+
+    __slots__ = ('url', 'type', 'media_key', 'alt', 'poster')
+
+    def __init__(self, url, type='image', media_key=None, alt='', poster=None):
+        self.url = url
+        self.type = type
+        self.media_key = media_key
+        self.alt = alt
+        self.poster = poster
+
+    def to_dict(self):
+        if self.type == 'image':
+            return {'url': self.url, 'alt': self.alt or '', 'type': self.type, 'media_key': self.media_key}
+        return {'url': self.url, 'poster': self.poster, 'type': self.type, 'media_key': self.media_key}
+
+
+class MediaSet(Record):
+    """A tweet's images and videos (the old {'images': [...], 'videos': [...]} shape)"""
+
+    __slots__ = ('images', 'videos')
+
+    def __init__(self, images=None, videos=None):
+        self.images = images if images is not None else []
+        self.videos = videos if videos is not None else []
+
+    def to_dict(self):
+        return {'images': [m.to_dict() for m in self.images], 'videos': [m.to_dict() for m in self.videos]}
+
+
+class PreScore(Record):
+    """Local lexicon verdict for a tweet (see lexicon_scorer)"""
+
+    __slots__ = ('score', 'label', 'confidence', 'triage', 'risk_level', 'risk_categories')
+
+    def __init__(self, score, label, confidence, triage, risk_level=None, risk_categories=None):
+        self.score = score
+        self.label = label
+        self.confidence = confidence
+        self.triage = triage
+        self.risk_level = risk_level
+        self.risk_categories = risk_categories if risk_categories is not None else []
+
+    def to_dict(self):
+        return {'score': self.score, 'label': self.label, 'confidence': self.confidence, 'triage': self.triage,
+                'risk_level': self.risk_level, 'risk_categories': list(self.risk_categories)}
+
+
+class Tweet(Record):
+    """One scraped tweet as it moves from extraction to the writers"""
+
+    __slots__ = ('author', 'timestamp', 'text', 'media', 'tweet_id', 'duplicate_count', 'matched_keywords', 'districts',
+                 'prescore')
+
+    def __init__(self, author, timestamp, text, media=None, tweet_id=None):
+        self.author = author
+        self.timestamp = timestamp
+        self.text = text
+        self.media = media if media is not None else MediaSet()
+        self.tweet_id = tweet_id
+        self.duplicate_count = 1
+        self.matched_keywords = None
+        self.districts = None  # district IDs, set by geo-partitioned scraping
+        self.prescore = None  # PreScore, set just before the batch is persisted
+
+    def to_dict(self):
+        return {
+            'author': self.author,
+            'timestamp': self.timestamp,
+            'text': self.text,
+            'media': self.media.to_dict(),
+            'tweet_id': self.tweet_id,
+            'duplicate_count': self.duplicate_count,
+            'matched_keywords': list(self.matched_keywords or []),
+            'districts': list(self.districts or []),
+            'prescore': prescore_dict(self.prescore),
+        }
+
+
+def media_dict(media):
+    """Plain-dict form of a tweet's media, whether it is a MediaSet or an old-style dict"""
+    if media is None:
+        return {}
+    return media.to_dict() if isinstance(media, MediaSet) else media
+
+
+def prescore_dict(prescore):
+    """Plain-dict form of a tweet's PreScore, or None when it was not scored"""
+    if prescore is None:
+        return None
+    return prescore.to_dict() if isinstance(prescore, PreScore) else prescore
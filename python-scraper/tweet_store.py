@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Optional SQLite sink for scraped tweets
+- WAL journal so readers (Node side, change feed) never block the scraper's writes
+- One transaction per persisted batch
+- Dedup enforced by a unique index on (tweet_id, keyword)
+- "New since cursor" reads hit the (keyword, seq) index instead of rescanning files
+- The lexicon pre-score's triage verdict has its own column, so the sentiment stage
+  can select just the 'llm' and 'risk' rows
+Enable by setting SCRAPER_SQLITE_PATH.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from tweet_record import media_dict, prescore_dict
+
+SQLITE_PATH = os.environ.get("SCRAPER_SQLITE_PATH")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tweets (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    tweet_id TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    handle TEXT,
+    author TEXT,
+    text TEXT NOT NULL,
+    tweet_time TEXT,
+    scraped_at REAL NOT NULL,
+    duplicate_count INTEGER NOT NULL DEFAULT 1,
+    matched_keywords TEXT,
+    media TEXT,
+    districts TEXT,
+    prescore TEXT,
+    triage TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_tweets_tweet_id_keyword ON tweets (tweet_id, keyword);
+CREATE INDEX IF NOT EXISTS idx_tweets_keyword_scraped_at ON tweets (keyword, scraped_at);
+CREATE INDEX IF NOT EXISTS idx_tweets_keyword_seq ON tweets (keyword, seq);
+"""
+
+
+def fallback_tweet_id(tweet):
+    """Stable ID for tweets whose status link could not be read"""
+    content = f"{tweet.get('author', '')}|{tweet.get('timestamp', '')}|{tweet.get('text', '')}"
+    return "h:" + hashlib.sha1(content.encode('utf-8')).hexdigest()[:16]
+
+
+def tweet_row(tweet, keyword, handle=None, scraped_at=None):
+    """Flat record for one persisted tweet (the shape stored in SQLite and sent on the change feed)"""
+    return {
+        'tweet_id': tweet.get('tweet_id') or fallback_tweet_id(tweet),
+        'keyword': keyword,
+        'handle': handle,
+        'author': tweet.get('author'),
+        'text': tweet.get('text', ''),
+        'tweet_time': tweet.get('timestamp'),
+        'scraped_at': scraped_at or time.time(),
+        'duplicate_count': tweet.get('duplicate_count', 1),
+        'matched_keywords': list(tweet.get('matched_keywords') or []),
+        'media': media_dict(tweet.get('media')),
+        'districts': list(tweet.get('districts') or []),
+        'prescore': prescore_dict(tweet.get('prescore')),
+    }
+
+
+class TweetStore:
+    """Thread-safe wrapper around one SQLite connection"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+        print(f"🗄️ SQLite tweet store ready at {path}")
+
+    def _migrate(self):
+        """Add columns introduced after a database was created"""
+        columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(tweets)")}
+        if 'districts' not in columns:
+            self._conn.execute("ALTER TABLE tweets ADD COLUMN districts TEXT")
+        if 'prescore' not in columns:
+            self._conn.execute("ALTER TABLE tweets ADD COLUMN prescore TEXT")
+            self._conn.execute("ALTER TABLE tweets ADD COLUMN triage TEXT")
+
+    def insert_tweets(self, tweets, keyword, handle=None):
+        """
+        Insert a batch in one transaction, skipping tweets already stored for this keyword.
+        Returns the inserted rows (with their 'seq' cursor) in insert order.
+        """
+        scraped_at = time.time()
+        inserted = []
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                for tweet in tweets:
+                    row = tweet_row(tweet, keyword, handle, scraped_at)
+                    params = dict(row,
+                                  matched_keywords=json.dumps(row['matched_keywords'], ensure_ascii=False),
+                                  media=json.dumps(row['media'], ensure_ascii=False),
+                                  districts=json.dumps(row['districts'], ensure_ascii=False),
+                                  prescore=json.dumps(row['prescore'], ensure_ascii=False) if row['prescore'] else None,
+                                  triage=(row['prescore'] or {}).get('triage'))
+                    cur.execute(
+                        "INSERT OR IGNORE INTO tweets (tweet_id, keyword, handle, author, text, tweet_time, scraped_at,"
+                        " duplicate_count, matched_keywords, media, districts, prescore, triage) VALUES (:tweet_id, :keyword,"
+                        " :handle, :author, :text, :tweet_time, :scraped_at, :duplicate_count, :matched_keywords, :media,"
+                        " :districts, :prescore, :triage)",
+                        params,
+                    )
+                    if cur.rowcount:
+                        row['seq'] = cur.lastrowid
+                        inserted.append(row)
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+        return inserted
+
+    def update_duplicate_counts(self, keyword, counts):
+        """Raise stored near-duplicate counts for keyword; counts is [(tweet_id, duplicate_count)]"""
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                cur.executemany(
+                    "UPDATE tweets SET duplicate_count = ? WHERE tweet_id = ? AND keyword = ? AND duplicate_count < ?",
+                    [(count, tweet_id, keyword, count) for tweet_id, count in counts],
+                )
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+
+    def fetch_since(self, keyword, cursor=0, limit=500):
+        """Tweets for keyword stored after cursor (a seq value), oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM tweets WHERE keyword = ? AND seq > ? ORDER BY seq LIMIT ?",
+                (keyword, cursor, limit),
+            ).fetchall()
+        return [self._decode(r) for r in rows]
+
+    def fetch_all_since(self, cursor=0, limit=500, keywords=None):
+        """Tweets stored after cursor, oldest first (every keyword, or just the given ones)"""
+        query, params = "SELECT * FROM tweets WHERE seq > ?", [cursor]
+        if keywords:
+            query += f" AND keyword IN ({', '.join('?' * len(keywords))})"
+            params.extend(keywords)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY seq LIMIT ?", params + [limit]).fetchall()
+        return [self._decode(r) for r in rows]
+
+    def max_seq(self):
+        """Newest seq in the table (0 when empty)"""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM tweets").fetchone()[0]
+
+    @staticmethod
+    def _decode(row):
+        record = dict(row)
+        record['matched_keywords'] = json.loads(record['matched_keywords'] or "[]")
+        record['media'] = json.loads(record['media'] or "{}")
+        record['districts'] = json.loads(record['districts'] or "[]")
+        record['prescore'] = json.loads(record['prescore']) if record.get('prescore') else None
+        record.pop('triage', None)  # queryable copy of prescore['triage']
+        return record
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_default_store():
+    """TweetStore at SCRAPER_SQLITE_PATH, or None when the sink is disabled"""
+    if not SQLITE_PATH:
+        return None
+    try:
+        return TweetStore(SQLITE_PATH)
+    except Exception as e:
+        print(f"❌ Could not open SQLite tweet store at {SQLITE_PATH}: {e}")
+        return None
@@ -3,6 +3,7 @@ const express = require('express');
 const bodyParser = require('body-parser');
 const cors = require('cors');
 const fs = require('fs');
+const zlib = require('zlib');
 const path = require('path');
 const axios = require('axios');
 const xml2js = require('xml2js');
@@ -10,6 +11,7 @@ const https = require('https');
 const http = require('http');
 const { Team, Keyword, Tweet, Topic, Sentiment, Result, Company, News } = require('./models');
 const DbService = require('./services/dbService');
+const { sendScraperCommand } = require('./services/scraperClient');
 
 const app = express();
 const PORT = process.env.PORT || 9000;
@@ -128,7 +130,7 @@ app.get('/health', async (req, res) => {
     
     // Test scraper server connection
     try {
-        const scraperResponse = await axios.get('http://localhost:9999/health', { timeout: 2000 });
+        await sendScraperCommand({ action: 'status' }, 2000);
         healthCheck.services.scraper = 'OK';
     } catch (error) {
         healthCheck.services.scraper = 'ERROR';
@@ -266,7 +268,12 @@ function readTweetsFromFile(filePath) {
         return [];
     }
     console.log(`[DEBUG] Reading tweets from: ${filePath}`);
-    const lines = fs.readFileSync(filePath, 'utf-8').split('\n');
+    return parseTweets(fs.readFileSync(filePath, 'utf-8'), filePath);
+}
+
+// Helper function to parse the scraper's Markdown tweet blocks
+function parseTweets(text, source) {
+    const lines = text.split('\n');
     const tweets = [];
     let currentTweet = { content: '', keyword: '', author: 'Unknown', timestamp: '', media: { images: [], videos: [] } };
     let inTweet = false;
@@ -287,6 +294,8 @@ function readTweetsFromFile(filePath) {
             
             // Start new tweet
             currentTweet = { content: '', keyword: '', author: 'Unknown', timestamp: '', media: { images: [], videos: [] } };
+            const numberMatch = trimmed.match(/^## Tweet (\d+)/);
+            currentTweet.number = numberMatch ? parseInt(numberMatch[1], 10) : 0;
             inTweet = true;
             inTextSection = false;
             continue;
@@ -311,6 +320,21 @@ function readTweetsFromFile(filePath) {
         } else if (trimmed.startsWith('**Keyword:**')) {
             inTextSection = false;
             currentTweet.keyword = trimmed.replace('**Keyword:**', '').trim();
+        } else if (trimmed.startsWith('**Pre-score:**')) {
+            // Local lexicon verdict from the scraper: "<label> (<score>, confidence <c>)"
+            inTextSection = false;
+            const prescoreMatch = trimmed.match(/^\*\*Pre-score:\*\*\s*(\w+)\s*\(([-+\d.]+),\s*confidence\s*([\d.]+)\)/);
+            if (prescoreMatch) {
+                currentTweet.prescore = {
+                    label: prescoreMatch[1],
+                    score: parseFloat(prescoreMatch[2]),
+                    confidence: parseFloat(prescoreMatch[3])
+                };
+            }
+        } else if (trimmed.startsWith('**Triage:**')) {
+            // local: settled by the lexicon, llm/risk: needs the remote sentiment APIs
+            inTextSection = false;
+            currentTweet.triage = trimmed.replace('**Triage:**', '').trim();
         } else if (trimmed.startsWith('**Images:**')) {
             inTextSection = false;
             // Just note that images are coming, don't create placeholders
@@ -342,10 +366,68 @@ function readTweetsFromFile(filePath) {
         tweets.push(currentTweet);
     }
     
-    console.log(`[DEBUG] Found ${tweets.length} tweet lines in ${filePath}`);
+    console.log(`[DEBUG] Found ${tweets.length} tweet lines in ${source}`);
     return tweets;
 }
 
+// Helper function to read one sealed segment (see python-scraper/output_rotation.py)
+function readSegment(filePath, compression) {
+    try {
+        const data = fs.readFileSync(filePath);
+        if (compression === 'gzip') {
+            return zlib.gunzipSync(data).toString('utf-8');
+        }
+        if (compression === 'zstd' && zlib.zstdDecompressSync) {
+            return zlib.zstdDecompressSync(data).toString('utf-8');
+        }
+        console.log(`[DEBUG] Cannot read ${compression} segment ${filePath} (set SCRAPER_ROTATE_COMPRESSION=gzip on the scraper)`);
+    } catch (err) {
+        console.log(`[DEBUG] Could not read segment ${filePath}: ${err}`);
+    }
+    return null;
+}
+
+// Helper function to read a keyword's tweets: sealed segments holding tweets numbered above
+// processedThrough (the scraper rotates the active file into them), then the active file
+function readKeywordTweets(keyword, processedThrough = 0) {
+    const stem = `tweets_output_${keyword}`;
+    const segmentDir = path.join(TWEETS_INPUT_DIR, 'segments', stem);
+    const manifestFile = path.join(segmentDir, 'manifest.json');
+    const tweets = [];
+    if (fs.existsSync(manifestFile)) {
+        let segments = [];
+        try {
+            segments = JSON.parse(fs.readFileSync(manifestFile, 'utf-8')).segments || [];
+        } catch (err) {
+            console.log(`[DEBUG] Could not read ${manifestFile}: ${err}`);
+        }
+        for (const segment of segments) {
+            if (segment.last_tweet <= processedThrough) {
+                continue;
+            }
+            const text = readSegment(path.join(segmentDir, segment.name), segment.compression);
+            if (text !== null) {
+                tweets.push(...parseTweets(text, segment.name));
+            }
+        }
+    }
+    tweets.push(...readTweetsFromFile(path.join(TWEETS_INPUT_DIR, `${stem}.md`)));
+    return tweets;
+}
+
+// Helper functions for the highest tweet number already processed (per keyword)
+function getProcessedThrough(keyword) {
+    const numberFile = `processed_through_${keyword}.txt`;
+    if (fs.existsSync(numberFile)) {
+        return parseInt(fs.readFileSync(numberFile, 'utf-8'), 10) || 0;
+    }
+    return 0;
+}
+
+function saveProcessedThrough(number, keyword) {
+    fs.writeFileSync(`processed_through_${keyword}.txt`, String(number), 'utf-8');
+}
+
 // Helper function to read existing topics
 function readExistingTopics() {
     try {
@@ -529,6 +611,88 @@ function appendResultsToJson(results) {
     }
 }
 
+// Geo-sentiment (district) analysis for one tweet; null when it fails or finds nothing
+async function analyzeGeoSentiment(tweet, author) {
+    let geoAnalysisResult = null;
+    try {
+        const GeoSentimentService = require('./services/geoSentimentService');
+        const geoSentimentService = new GeoSentimentService();
+        
+        console.log(`[GEO] Processing geo-sentiment analysis for tweet: ${tweet.substring(0, 50)}...`);
+        
+        geoAnalysisResult = await geoSentimentService.processTweet({
+            text: tweet,
+            author: author,
+            timestamp: new Date(),
+            location: '' // Let Gemini AI determine location from tweet content intelligently
+        });
+        
+        if (geoAnalysisResult) {
+            console.log(`[GEO] Analysis complete - District: ${geoAnalysisResult.district}, Sentiment: ${geoAnalysisResult.sentiment}, Threat: ${geoAnalysisResult.threatLevel}`);
+        } else {
+            console.log(`[GEO] No geo-analysis result (likely no district identified)`);
+        }
+    } catch (geoError) {
+        console.error(`[GEO] Error in geo-sentiment analysis:`, geoError.message);
+        // Continue processing even if geo-analysis fails
+    }
+    return geoAnalysisResult;
+}
+
+// Tweets the scraper's lexicon settled (**Triage:** local); tweets with media still need the media analysis
+function isLocallyTriaged(tweetData) {
+    if (typeof tweetData !== 'object' || tweetData.triage !== 'local' || !tweetData.prescore) {
+        return false;
+    }
+    const media = tweetData.media || { images: [], videos: [] };
+    return !(media.images && media.images.length > 0) && !(media.videos && media.videos.length > 0);
+}
+
+// Store a tweet the scraper's lexicon already settled without calling Gemini/Grok for sentiment
+async function storeLocallyScoredTweet(tweetData, keyword, defaultTeam, defaultCompany, geoAnalysisResult = null) {
+    let sentimentLabel = mapSentimentToValidEnum(tweetData.prescore.label);
+    // Same override as the LLM path: anti-national content is stored as NEGATIVE
+    if (geoAnalysisResult && geoAnalysisResult.sentiment === 'anti_national') {
+        sentimentLabel = 'NEGATIVE';
+    }
+    const [topicRecord] = await Topic.findOrCreate({
+        where: { name: 'Unknown' },
+        defaults: { description: 'Topic: Unknown' }
+    });
+    const [sentimentRecord] = await Sentiment.findOrCreate({
+        where: { label: sentimentLabel },
+        defaults: {
+            score: 0,
+            confidence: 0.5,
+            label: sentimentLabel
+        }
+    });
+    const media = tweetData.media || { images: [], videos: [] };
+    const tweetRecord = await Tweet.create({
+        tweetId: `tweet_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`,
+        content: tweetData.content,
+        author: tweetData.author,
+        keyword: keyword,
+        mediaImages: media.images || [],
+        mediaVideos: media.videos || [],
+        analysisConfidence: String(tweetData.prescore.confidence),
+        consensusResult: 'local-lexicon',
+        geoAnalysis: geoAnalysisResult ? JSON.stringify(geoAnalysisResult) : null,
+        district: geoAnalysisResult?.district || null,
+        threatLevel: geoAnalysisResult?.threatLevel || null,
+        isAntiNational: geoAnalysisResult?.sentiment === 'anti_national' || false,
+        createdAt: new Date(),
+        topicId: topicRecord.id,
+        sentimentId: sentimentRecord.id
+    });
+    await Result.create({
+        tweetId: tweetRecord.id,
+        teamId: defaultTeam.id,
+        companyId: defaultCompany.id
+    });
+    return sentimentLabel;
+}
+
 // Process new tweets for a specific keyword
 async function processNewTweets(newTweets, keyword) {
     // Get default team and company
@@ -557,6 +721,20 @@ async function processNewTweets(newTweets, keyword) {
         const tweet = typeof tweetData === 'string' ? tweetData : tweetData.content;
         const media = typeof tweetData === 'object' ? tweetData.media : { images: [], videos: [] };
         const author = typeof tweetData === 'object' ? tweetData.author : 'Unknown';
+
+        // Confident, risk-free lexicon verdicts skip the sentiment and news APIs (and their delays);
+        // the geo/district analysis still runs so the district dashboards see every tweet
+        if (isLocallyTriaged(tweetData)) {
+            try {
+                const geoAnalysisResult = await analyzeGeoSentiment(tweet, author);
+                const localSentiment = await storeLocallyScoredTweet(tweetData, keyword, defaultTeam, defaultCompany, geoAnalysisResult);
+                console.log(`[TRIAGE] Stored locally scored tweet (${localSentiment}) without remote sentiment analysis`);
+                results.push([tweet, localSentiment, 'Unknown', []]);
+            } catch (error) {
+                console.log(`[DEBUG] Error saving locally scored tweet: ${error.message}`);
+            }
+            continue;
+        }
         
         // Enhanced analysis with Grok validation
         const GeminiService = require('./services/geminiService');
@@ -586,29 +764,7 @@ async function processNewTweets(newTweets, keyword) {
         const newsValidation = await GeminiService.fetchAndValidateNewsWithGrok(enhancedAnalysis.finalTopic, tweet);
 
         // Geo-sentiment analysis (NEW)
-        let geoAnalysisResult = null;
-        try {
-            const GeoSentimentService = require('./services/geoSentimentService');
-            const geoSentimentService = new GeoSentimentService();
-            
-            console.log(`[GEO] Processing geo-sentiment analysis for tweet: ${tweet.substring(0, 50)}...`);
-            
-            geoAnalysisResult = await geoSentimentService.processTweet({
-                text: tweet,
-                author: author,
-                timestamp: new Date(),
-                location: '' // Let Gemini AI determine location from tweet content intelligently
-            });
-            
-            if (geoAnalysisResult) {
-                console.log(`[GEO] Analysis complete - District: ${geoAnalysisResult.district}, Sentiment: ${geoAnalysisResult.sentiment}, Threat: ${geoAnalysisResult.threatLevel}`);
-            } else {
-                console.log(`[GEO] No geo-analysis result (likely no district identified)`);
-            }
-        } catch (geoError) {
-            console.error(`[GEO] Error in geo-sentiment analysis:`, geoError.message);
-            // Continue processing even if geo-analysis fails
-        }
+        const geoAnalysisResult = await analyzeGeoSentiment(tweet, author);
 
         // Map sentiment to database format (consider geo-sentiment override)
         const validSentiments = ['POSITIVE', 'NEGATIVE', 'NEUTRAL', 'SARCASTIC', 'RELIGIOUS', 'FUNNY', 'PROVOCATIVE'];
@@ -714,16 +870,16 @@ async function processTweetsForKeyword(keyword) {
         isProcessingTweets = true;
         console.log(`Starting tweet processing for keyword: ${keyword}`);
         
-        const keywordFile = path.join(TWEETS_INPUT_DIR, `tweets_output_${keyword}.md`);
-        
-        if (!fs.existsSync(keywordFile)) {
-            console.log(`No tweets file found for keyword ${keyword}: ${keywordFile}`);
-            return;
-        }
-
         // Get processed tweet IDs to avoid duplicates
         const processedIds = getProcessedTweetIds(keyword);
-        const allTweets = readTweetsFromFile(keywordFile); // Pass the full file path
+        const processedThrough = getProcessedThrough(keyword);
+        // Active file plus any sealed segments it was rotated into since the last pass
+        const allTweets = readKeywordTweets(keyword, processedThrough);
+        if (allTweets.length === 0) {
+            console.log(`No tweets found for keyword ${keyword}`);
+            return;
+        }
+        const lastNumber = allTweets.reduce((max, tweet) => Math.max(max, tweet.number || 0), processedThrough);
         
         // Filter out already processed tweets
         const newTweets = [];
@@ -746,8 +902,10 @@ async function processTweetsForKeyword(keyword) {
             
             // Save updated processed IDs
             saveProcessedTweetIds(newProcessedIds, keyword);
+            saveProcessedThrough(lastNumber, keyword);
         } else {
             console.log(`[DEBUG] No new tweets for keyword ${keyword}. All ${allTweets.length} tweets already processed.`);
+            saveProcessedThrough(lastNumber, keyword);
         }
     } catch (error) {
         console.error(`Error processing tweets for keyword ${keyword}:`, error);
@@ -821,6 +979,17 @@ async function processTweets_LEGACY_REMOVED(tweetsToProcess = null, requestedKey
                     ? requestedKeywords.join(', ')
                     : tweetKeyword;
 
+                // Confident, risk-free lexicon verdicts skip the paid sentiment APIs
+                if (isLocallyTriaged(tweetData)) {
+                    try {
+                        const localSentiment = await storeLocallyScoredTweet(tweetData, keywordToStore, defaultTeam, defaultCompany);
+                        results.push([tweet, localSentiment, 'Unknown', null, keywordToStore, media, null]);
+                    } catch (error) {
+                        console.log(`[DEBUG] Error saving locally scored tweet: ${error.message}`);
+                    }
+                    continue;
+                }
+
                 // Enhanced analysis with Grok validation
                 const GeminiService = require('./services/geminiService');
                 const enhancedAnalysis = await GeminiService.analyzeSentimentWithGrokValidation(tweet);
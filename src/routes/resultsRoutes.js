@@ -3,7 +3,6 @@ const router = express.Router();
 const { spawn } = require('child_process');
 const path = require('path');
 const fs = require('fs');
-const net = require('net');
 const axios = require('axios');
 const { Op } = require('sequelize');
 const { Tweet, Topic, Sentiment, Result, Team, Company, News } = require('../models');
@@ -11,6 +10,7 @@ const { authenticateToken } = require('../middleware/auth');
 const youtubeService = require('../services/youtubeService');
 const instagramService = require('../services/instagramService');
 const googleReviewService = require('../services/googleReviewService');
+const { sendScraperCommand } = require('../services/scraperClient');
 
 // Welcome message
 router.get('/', (req, res) => {
@@ -661,40 +661,15 @@ function startScraperServer() {
     });
 }
 
-// Function to send request to scraper server
-function sendScraperRequest(keywords, handles) {
-    return new Promise((resolve, reject) => {
-        const client = new net.Socket();
-        
-        client.connect(9999, 'localhost', () => {
-            const request = {
-                action: 'scrape',
-                keywords: keywords,
-                handles: handles
-            };
-            
-            client.write(JSON.stringify(request));
-        });
-        
-        // No timeout for continuous mode - just get confirmation
-        client.on('data', (data) => {
-            try {
-                const response = JSON.parse(data.toString());
-                console.log('📡 [SCRAPER] Received response:', response.message || 'Continuous scraping started');
-                resolve(response);
-            } catch (error) {
-                console.log('❌ [SCRAPER] Error parsing response:', error.message);
-                reject(error);
-            }
-            
-            client.destroy();
-        });
-        
-        client.on('error', (error) => {
-            console.log('❌ [SCRAPER] Connection error:', error.message);
-            reject(error);
-        });
-    });
+// Function to send request to scraper server (over the shared persistent connection)
+async function sendScraperRequest(keywords, handles) {
+    const response = await sendScraperCommand({
+        action: 'scrape',
+        keywords: keywords,
+        handles: handles
+    }, 120000); // continuous mode replies once the jobs are started
+    console.log('📡 [SCRAPER] Received response:', response.message || 'Continuous scraping started');
+    return response;
 }
 
 // Function to start scraper in background (now uses server)
@@ -0,0 +1,93 @@
+const net = require('net');
+
+// Persistent, multiplexed connection to the Python scraper server (python-scraper/scraper_server.py).
+// Every request carries an id and the server answers with newline-delimited JSON carrying the same
+// id, so requests can be pipelined on one socket and answered in any order.
+
+const SCRAPER_HOST = process.env.SCRAPER_HOST || 'localhost';
+const SCRAPER_PORT = parseInt(process.env.SCRAPER_PORT || '9999', 10);
+
+let socket = null;
+let connecting = null;
+let buffer = '';
+let nextId = 1;
+const pending = new Map(); // request id -> { resolve, reject, timer }
+
+function failPending(error) {
+    for (const { reject, timer } of pending.values()) {
+        clearTimeout(timer);
+        reject(error);
+    }
+    pending.clear();
+}
+
+function handleData(chunk) {
+    buffer += chunk;
+    let newline;
+    while ((newline = buffer.indexOf('\n')) !== -1) {
+        const line = buffer.slice(0, newline).trim();
+        buffer = buffer.slice(newline + 1);
+        if (!line) continue;
+        let reply;
+        try {
+            reply = JSON.parse(line);
+        } catch (error) {
+            console.log('❌ [SCRAPER] Error parsing response:', error.message);
+            continue;
+        }
+        const entry = pending.get(reply.id);
+        if (!entry) continue;
+        pending.delete(reply.id);
+        clearTimeout(entry.timer);
+        delete reply.id;
+        entry.resolve(reply);
+    }
+}
+
+function connect() {
+    if (socket) return Promise.resolve(socket);
+    if (connecting) return connecting;
+    connecting = new Promise((resolve, reject) => {
+        const client = net.createConnection(SCRAPER_PORT, SCRAPER_HOST);
+        client.setEncoding('utf8');
+        client.setKeepAlive(true);
+        client.once('connect', () => {
+            socket = client;
+            connecting = null;
+            resolve(client);
+        });
+        client.on('data', handleData);
+        client.on('error', (error) => {
+            if (connecting) {
+                connecting = null;
+                reject(error);
+            }
+        });
+        client.on('close', () => {
+            if (socket === client) {
+                socket = null;
+                buffer = '';
+                failPending(new Error('Scraper server connection closed'));
+            }
+        });
+    });
+    return connecting;
+}
+
+// Send one request over the shared connection; resolves with the server's reply
+async function sendScraperCommand(request, timeoutMs = 30000) {
+    const client = await connect();
+    const id = nextId++;
+    return new Promise((resolve, reject) => {
+        const timer = setTimeout(() => {
+            pending.delete(id);
+            reject(new Error(`Scraper request '${request.action}' timed out`));
+        }, timeoutMs);
+        pending.set(id, { resolve, reject, timer });
+        client.write(JSON.stringify({ ...request, id }) + '\n');
+    });
+}
+
+module.exports = {
+    sendScraperCommand
+};